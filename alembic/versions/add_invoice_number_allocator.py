@@ -0,0 +1,38 @@
+"""add invoice_number_seq and invoice_number_counter for allocated invoice numbers
+
+Revision ID: d5e6f7a8b9c0
+Revises: c4d5e6f7a8b9
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = 'd5e6f7a8b9c0'
+down_revision = 'c4d5e6f7a8b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE SEQUENCE IF NOT EXISTS invoice_number_seq')
+    op.create_table('invoice_number_counter',
+    sa.Column('period', sa.String(length=20), nullable=False),
+    sa.Column('last_value', sa.Integer(), nullable=False),
+    sa.Column('id', postgresql.UUID(as_uuid=False), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('created_by', sa.String(), nullable=True),
+    sa.Column('updated_by', sa.String(), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id'),
+    sa.UniqueConstraint('period')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('invoice_number_counter')
+    op.execute('DROP SEQUENCE IF EXISTS invoice_number_seq')
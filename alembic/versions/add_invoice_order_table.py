@@ -0,0 +1,109 @@
+"""add invoice_order link table and backfill it from invoice.order_id/order_ids
+
+Revision ID: c4d5e6f7a8b9
+Revises: b3c4d5e6f7a8
+Create Date: 2026-10-17
+
+Links come from every live invoice's order_id plus its order_ids JSON, oldest invoice
+first. An order found on more than one live invoice keeps its link to the oldest one
+(the unique index admits one); the later invoices still list it in order_ids.
+"""
+import json
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = 'c4d5e6f7a8b9'
+down_revision = 'b3c4d5e6f7a8'
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 1000
+
+INSERT_LINK = sa.text(
+    """
+    INSERT INTO invoice_order (id, invoice_id, order_id, is_deleted)
+    SELECT CAST(:id AS uuid), CAST(:invoice_id AS uuid), o.id, false
+    FROM "order" o WHERE o.id = CAST(:order_id AS uuid)
+    ON CONFLICT (order_id) WHERE is_deleted = false DO NOTHING
+    """
+)
+
+
+def _order_ids(order_id, order_ids):
+    ids = [str(order_id)] if order_id else []
+    try:
+        parsed = json.loads(order_ids) if order_ids else []
+    except (TypeError, ValueError):
+        parsed = []
+    if isinstance(parsed, list):
+        ids.extend(str(x) for x in parsed)
+    valid = []
+    for oid in ids:
+        try:
+            oid = str(uuid.UUID(oid))
+        except ValueError:
+            continue
+        if oid not in valid:
+            valid.append(oid)
+    return valid
+
+
+def upgrade() -> None:
+    op.create_table('invoice_order',
+    sa.Column('invoice_id', postgresql.UUID(as_uuid=False), nullable=False),
+    sa.Column('order_id', postgresql.UUID(as_uuid=False), nullable=False),
+    sa.Column('id', postgresql.UUID(as_uuid=False), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('created_by', sa.String(), nullable=True),
+    sa.Column('updated_by', sa.String(), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['invoice_id'], ['invoice.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['order.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    # the backfill's ON CONFLICT needs the unique index to exist already
+    op.create_index(
+        'uq_invoice_order_order_id',
+        'invoice_order',
+        ['order_id'],
+        unique=True,
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+    op.create_index(
+        'ix_invoice_order_invoice_id_not_deleted',
+        'invoice_order',
+        ['invoice_id'],
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+
+    bind = op.get_bind()
+    # statement-level option: Connection.execution_options() would switch every later
+    # statement on this connection (the inserts, the version stamp) to a server-side cursor
+    invoices = bind.execute(
+        sa.text(
+            'SELECT id, order_id, order_ids FROM invoice '
+            'WHERE is_deleted IS NOT TRUE ORDER BY created_at, id'
+        ).execution_options(yield_per=BATCH_SIZE)
+    )
+    batch = []
+    for invoice_id, order_id, order_ids in invoices:
+        for oid in _order_ids(order_id, order_ids):
+            batch.append({'id': str(uuid.uuid4()), 'invoice_id': str(invoice_id), 'order_id': oid})
+        if len(batch) >= BATCH_SIZE:
+            bind.execute(INSERT_LINK, batch)
+            batch = []
+    if batch:
+        bind.execute(INSERT_LINK, batch)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_invoice_order_invoice_id_not_deleted', table_name='invoice_order')
+    op.drop_index('uq_invoice_order_order_id', table_name='invoice_order')
+    op.drop_table('invoice_order')
@@ -0,0 +1,27 @@
+"""add (created_at, id) indexes for keyset pagination
+
+Revision ID: f5a6b7c8d9e0
+Revises: e4f5a6b7c8d9
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+revision = 'f5a6b7c8d9e0'
+down_revision = 'e4f5a6b7c8d9'
+branch_labels = None
+depends_on = None
+
+
+KEYSET_TABLES = ('order', 'invoice', 'stock', 'menu')
+
+
+def upgrade() -> None:
+    for table in KEYSET_TABLES:
+        op.create_index(f'ix_{table}_created_at_id', table, ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    for table in KEYSET_TABLES:
+        op.drop_index(f'ix_{table}_created_at_id', table_name=table)
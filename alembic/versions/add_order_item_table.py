@@ -0,0 +1,110 @@
+"""add order_item table and backfill it from order.item_list
+
+Revision ID: a2b3c4d5e6f7
+Revises: f1a2b3c4d5e6
+Create Date: 2026-10-17
+
+The backfill parses item_list in Python with the same rules the API used for invoices
+(name/item_name/description, qty/quantity defaulting to 1, price defaulting to 0), so
+unparseable JSON is skipped instead of aborting the migration.
+"""
+import json
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = 'a2b3c4d5e6f7'
+down_revision = 'f1a2b3c4d5e6'
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 1000
+
+
+def _parse_items(item_list):
+    try:
+        raw = json.loads(item_list)
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(raw, list):
+        return []
+    rows = []
+    for i, el in enumerate(raw):
+        if not isinstance(el, dict):
+            continue
+        name = el.get('name') or el.get('item_name') or el.get('description') or f'Item {i + 1}'
+        try:
+            qty = int(el.get('qty') or el.get('quantity') or 1)
+            price = float(el.get('price') or 0)
+        except (TypeError, ValueError):
+            continue
+        rows.append((str(name), qty, price))
+    return rows
+
+
+def upgrade() -> None:
+    op.create_table('order_item',
+    sa.Column('order_id', postgresql.UUID(as_uuid=False), nullable=False),
+    sa.Column('line_no', sa.Integer(), nullable=False),
+    sa.Column('menu_item_id', postgresql.UUID(as_uuid=False), nullable=True),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('qty', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Float(), nullable=False),
+    sa.Column('id', postgresql.UUID(as_uuid=False), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('created_by', sa.String(), nullable=True),
+    sa.Column('updated_by', sa.String(), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['order.id'], ),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_item.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+
+    bind = op.get_bind()
+    order_item = sa.table(
+        'order_item',
+        sa.column('id'), sa.column('order_id'), sa.column('line_no'), sa.column('name'),
+        sa.column('qty'), sa.column('unit_price'), sa.column('is_deleted'),
+    )
+    batch = []
+    # statement-level option: Connection.execution_options() would switch every later
+    # statement on this connection (the inserts, create_index) to a server-side cursor
+    orders = bind.execute(
+        sa.text('SELECT id, item_list FROM "order" WHERE item_list IS NOT NULL')
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    for order_id, item_list in orders:
+        for line_no, (name, qty, price) in enumerate(_parse_items(item_list), start=1):
+            batch.append({
+                'id': str(uuid.uuid4()),
+                'order_id': str(order_id),
+                'line_no': line_no,
+                'name': name,
+                'qty': qty,
+                'unit_price': price,
+                'is_deleted': False,
+            })
+        if len(batch) >= BATCH_SIZE:
+            bind.execute(order_item.insert(), batch)
+            batch = []
+    if batch:
+        bind.execute(order_item.insert(), batch)
+
+    # built after the backfill so the bulk insert does not maintain it row by row
+    op.create_index(
+        'ix_order_item_order_id_line_no_not_deleted',
+        'order_item',
+        ['order_id', 'line_no'],
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_item_order_id_line_no_not_deleted', table_name='order_item')
+    op.drop_table('order_item')
@@ -0,0 +1,66 @@
+"""add denormalised order.status column and backfill it
+
+Revision ID: f1a2b3c4d5e6
+Revises: e0f1a2b3c4d5
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = 'f1a2b3c4d5e6'
+down_revision = 'e0f1a2b3c4d5'
+branch_labels = None
+depends_on = None
+
+
+orderstate = postgresql.ENUM(
+    'PENDING', 'PREPARING', 'READY', 'CANCELLED', name='orderstate', create_type=False
+)
+
+
+def upgrade() -> None:
+    orderstate.create(op.get_bind(), checkfirst=True)
+    # A constant default makes this a catalog-only change; the backfill fixes the values
+    op.add_column(
+        'order',
+        sa.Column('status', orderstate, server_default='PENDING', nullable=False),
+    )
+
+    # Orders without a usable order_status row: derive from the legacy flags, with the
+    # same precedence the API used (cancel, then done, then pending, else preparing).
+    op.execute(
+        """
+        UPDATE "order" SET status = CASE
+            WHEN lower(order_cancel) = 'true' THEN 'CANCELLED'
+            WHEN lower(order_done) = 'true' THEN 'READY'
+            WHEN lower(order_pending) = 'true' THEN 'PENDING'
+            ELSE 'PREPARING'
+        END::orderstate
+        """
+    )
+    # A live order_status row wins when its value is one of the enum's labels
+    op.execute(
+        """
+        UPDATE "order" o SET status = upper(trim(os.status))::orderstate
+        FROM order_status os
+        WHERE os.order_id = o.id
+          AND os.is_deleted = false
+          AND upper(trim(os.status)) IN ('PENDING', 'PREPARING', 'READY', 'CANCELLED')
+        """
+    )
+
+    op.create_index(
+        'ix_order_status_created_at_not_deleted',
+        'order',
+        ['status', 'created_at'],
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_status_created_at_not_deleted', table_name='order')
+    op.drop_column('order', 'status')
+    orderstate.drop(op.get_bind(), checkfirst=True)
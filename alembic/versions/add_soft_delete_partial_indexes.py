@@ -0,0 +1,39 @@
+"""add partial indexes on live rows for the main lookup keys
+
+Revision ID: b7c8d9e0f1a2
+Revises: a6b7c8d9e0f1
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b7c8d9e0f1a2'
+down_revision = 'a6b7c8d9e0f1'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns, predicate); order_status(order_id) is already covered by
+# uq_order_status_order_id
+PARTIAL_INDEXES = (
+    ('ix_order_table_no_created_at_not_deleted', 'order', ['table_no', 'created_at'],
+     'is_deleted = false'),
+    ('ix_menu_menu_id_not_deleted', 'menu', ['menu_id'], 'is_deleted = false'),
+    ('ix_qr_code_payment_id_created_at_active', 'qr_code', ['payment_id', 'created_at'],
+     'is_active = true AND is_deleted = false'),
+)
+
+
+def upgrade() -> None:
+    # Rows with NULL is_deleted would be hidden by the partial indexes and the ORM filter
+    for table in ('order', 'menu', 'qr_code'):
+        op.execute(f'UPDATE "{table}" SET is_deleted = false WHERE is_deleted IS NULL')
+    for name, table, columns, predicate in PARTIAL_INDEXES:
+        op.create_index(name, table, columns, unique=False, postgresql_where=sa.text(predicate))
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(PARTIAL_INDEXES):
+        op.drop_index(name, table_name=table)
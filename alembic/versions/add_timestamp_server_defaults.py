@@ -0,0 +1,39 @@
+"""server-side now() defaults for created_at / updated_at and invoice.invoice_date
+
+Revision ID: e0f1a2b3c4d5
+Revises: d9e0f1a2b3c4
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+revision = 'e0f1a2b3c4d5'
+down_revision = 'd9e0f1a2b3c4'
+branch_labels = None
+depends_on = None
+
+
+TABLES = (
+    'user', 'restaurant', 'table', 'category', 'menu', 'menu_item', 'order',
+    'order_status', 'invoice', 'stock', 'payment', 'qr_code',
+)
+
+
+def upgrade() -> None:
+    # SET DEFAULT only touches the catalog; existing rows are not rewritten
+    for table in TABLES:
+        op.execute(
+            f'ALTER TABLE "{table}" ALTER COLUMN created_at SET DEFAULT now(), '
+            f'ALTER COLUMN updated_at SET DEFAULT now()'
+        )
+    op.execute('ALTER TABLE invoice ALTER COLUMN invoice_date SET DEFAULT now()')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE invoice ALTER COLUMN invoice_date DROP DEFAULT')
+    for table in TABLES:
+        op.execute(
+            f'ALTER TABLE "{table}" ALTER COLUMN created_at DROP DEFAULT, '
+            f'ALTER COLUMN updated_at DROP DEFAULT'
+        )
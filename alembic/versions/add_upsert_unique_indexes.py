@@ -0,0 +1,72 @@
+"""add partial unique indexes used as upsert conflict targets
+
+Revision ID: a6b7c8d9e0f1
+Revises: f5a6b7c8d9e0
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'a6b7c8d9e0f1'
+down_revision = 'f5a6b7c8d9e0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows with NULL is_deleted would sit outside the partial indexes
+    op.execute('UPDATE order_status SET is_deleted = false WHERE is_deleted IS NULL')
+    op.execute('UPDATE payment SET is_deleted = false WHERE is_deleted IS NULL')
+
+    # Check-then-insert races may have left duplicates; keep the newest status row and the
+    # paid (else newest) payment per order, soft-deleting the rest so no history is lost.
+    op.execute(
+        """
+        UPDATE order_status SET is_deleted = true
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY order_id
+                    ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST
+                ) AS rn
+                FROM order_status WHERE is_deleted = false
+            ) d WHERE d.rn > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE payment SET is_deleted = true
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY order_id
+                    ORDER BY (status = 'PAID') DESC, created_at DESC NULLS LAST
+                ) AS rn
+                FROM payment WHERE is_deleted = false
+            ) d WHERE d.rn > 1
+        )
+        """
+    )
+
+    op.create_index(
+        'uq_order_status_order_id',
+        'order_status',
+        ['order_id'],
+        unique=True,
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+    op.create_index(
+        'uq_payment_order_id',
+        'payment',
+        ['order_id'],
+        unique=True,
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_payment_order_id', table_name='payment')
+    op.drop_index('uq_order_status_order_id', table_name='order_status')
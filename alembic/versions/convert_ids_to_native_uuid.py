@@ -0,0 +1,373 @@
+"""convert varchar id / foreign key columns to native uuid
+
+Revision ID: d9e0f1a2b3c4
+Revises: c8d9e0f1a2b3
+Create Date: 2026-10-17
+
+Two ways to run this, chosen with an -x argument:
+
+online (default), safe while the app keeps serving traffic:
+
+    alembic upgrade head
+
+1. add a nullable uuid shadow column next to every id / foreign key column, plus a
+   BEFORE INSERT OR UPDATE trigger that fills it from the varchar value (dual write);
+2. backfill the shadow columns in committed batches, walking the primary key;
+3. build copies of the affected indexes CONCURRENTLY, NOT NULL as validated CHECK
+   constraints and the foreign keys NOT VALID + VALIDATE, all on the shadow columns;
+4. swap in one short transaction: drop the varchar columns, rename the shadows into
+   place and attach the prebuilt indexes as the primary key / unique constraints.
+
+Only the swap takes ACCESS EXCLUSIVE locks and it rewrites nothing, so they are held for
+milliseconds; lock_timeout makes it fail fast instead of queueing behind traffic. Every
+step checks what already exists, so rerunning after a failure picks up where it stopped.
+
+in-place, a downtime migration for small databases or a maintenance window:
+
+    alembic -x uuid_conversion=in-place upgrade head
+
+Each ALTER ... TYPE rewrites its table under an ACCESS EXCLUSIVE lock that blocks reads
+and writes for the whole rewrite; stop the app first. downgrade() always converts back
+in place, so it needs the same window.
+
+Either way, existing ids are uuid4 strings and cast directly; the migration aborts before
+changing anything if some value does not parse as a uuid.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = 'd9e0f1a2b3c4'
+down_revision = 'c8d9e0f1a2b3'
+branch_labels = None
+depends_on = None
+
+
+TABLES = (
+    'user', 'restaurant', 'table', 'category', 'menu', 'menu_item', 'order',
+    'order_status', 'invoice', 'stock', 'payment', 'qr_code',
+)
+
+# (table, column, referenced table, ondelete)
+FOREIGN_KEYS = (
+    ('menu_item', 'category_id', 'category', None),
+    ('order_status', 'order_id', 'order', None),
+    ('invoice', 'order_id', 'order', 'RESTRICT'),
+    ('payment', 'order_id', 'order', 'RESTRICT'),
+    ('qr_code', 'payment_id', 'payment', 'CASCADE'),
+)
+
+UUID_PATTERN = '^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$'
+
+BACKFILL_BATCH = 5000
+
+
+def _columns():
+    return [(t, 'id') for t in TABLES] + [(t, c) for t, c, _, _ in FOREIGN_KEYS]
+
+
+def _shadow(column):
+    return f'{column}_uuid'
+
+
+def _column_type(bind, table, column):
+    return bind.execute(
+        sa.text(
+            'SELECT data_type FROM information_schema.columns '
+            'WHERE table_name = :t AND column_name = :c'
+        ),
+        {'t': table, 'c': column},
+    ).scalar()
+
+
+def _is_nullable(bind, table, column):
+    return bind.execute(
+        sa.text(
+            'SELECT is_nullable = \'YES\' FROM information_schema.columns '
+            'WHERE table_name = :t AND column_name = :c'
+        ),
+        {'t': table, 'c': column},
+    ).scalar()
+
+
+def _check_values(bind, columns):
+    for table, column in columns:
+        bad = bind.execute(
+            sa.text(
+                f'SELECT count(*) FROM "{table}" '
+                f'WHERE {column} IS NOT NULL AND {column} !~ :pattern'
+            ),
+            {'pattern': UUID_PATTERN},
+        ).scalar()
+        if bad:
+            raise RuntimeError(f'{table}.{column} has {bad} values that are not uuids')
+
+
+def _drop_foreign_keys(bind):
+    inspector = sa.inspect(bind)
+    for table, column, _, _ in FOREIGN_KEYS:
+        for fk in inspector.get_foreign_keys(table):
+            if fk['constrained_columns'] == [column] and fk.get('name'):
+                op.drop_constraint(fk['name'], table, type_='foreignkey')
+
+
+def _create_foreign_keys(validate_now):
+    for table, column, referred, ondelete in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        on_delete = f' ON DELETE {ondelete}' if ondelete else ''
+        op.execute(
+            f'ALTER TABLE "{table}" ADD CONSTRAINT {name} FOREIGN KEY ({column}) '
+            f'REFERENCES "{referred}" (id){on_delete} NOT VALID'
+        )
+    if validate_now:
+        for table, column, _, _ in FOREIGN_KEYS:
+            op.execute(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT {table}_{column}_fkey')
+
+
+def _alter(bind, to_type, using):
+    for table, column in _columns():
+        current = _column_type(bind, table, column)
+        if current is None or current == to_type:
+            continue
+        op.execute(
+            f'ALTER TABLE "{table}" ALTER COLUMN {column} TYPE {to_type} '
+            f'USING {using.format(column=column)}'
+        )
+
+
+def _constraint_exists(bind, table, name):
+    return bind.execute(
+        sa.text(
+            'SELECT 1 FROM pg_constraint '
+            'WHERE conrelid = CAST(quote_ident(:t) AS regclass) AND conname = :n'
+        ),
+        {'t': table, 'n': name},
+    ).scalar() is not None
+
+
+def _indexes_on(bind, table, columns):
+    """Indexes of table that cover one of columns, with what is needed to rebuild them."""
+    rows = bind.execute(
+        sa.text(
+            """
+            SELECT i.relname AS name, ix.indisunique AS is_unique, am.amname AS method,
+                   pg_get_expr(ix.indpred, ix.indrelid, true) AS predicate,
+                   ARRAY(SELECT pg_get_indexdef(ix.indexrelid, k, true)
+                         FROM generate_series(1, ix.indnkeyatts) AS k ORDER BY k) AS keys,
+                   con.conname AS constraint_name, con.contype AS constraint_type
+            FROM pg_index ix
+            JOIN pg_class i ON i.oid = ix.indexrelid
+            JOIN pg_am am ON am.oid = i.relam
+            LEFT JOIN pg_constraint con
+                   ON con.conindid = ix.indexrelid AND con.contype IN ('p', 'u')
+            WHERE ix.indrelid = CAST(quote_ident(:t) AS regclass)
+            ORDER BY i.relname
+            """
+        ),
+        {'t': table},
+    ).mappings()
+    shadows = {_shadow(c) for c in columns}
+    return [
+        dict(row)
+        for row in rows
+        if set(row['keys']) & set(columns) and not set(row['keys']) & shadows
+    ]
+
+
+def _index_copy_name(name):
+    return f'{name[:58]}_uuid'
+
+
+def _create_index_concurrently(bind, table, index, columns):
+    copy = _index_copy_name(index['name'])
+    valid = bind.execute(
+        sa.text(
+            'SELECT ix.indisvalid FROM pg_index ix JOIN pg_class i ON i.oid = ix.indexrelid '
+            'WHERE i.relname = :n'
+        ),
+        {'n': copy},
+    ).scalar()
+    if valid:
+        return
+    if valid is not None:
+        # left INVALID by an interrupted CREATE INDEX CONCURRENTLY
+        op.execute(f'DROP INDEX CONCURRENTLY "{copy}"')
+    keys = ', '.join(_shadow(k) if k in columns else k for k in index['keys'])
+    unique = 'UNIQUE ' if index['is_unique'] else ''
+    where = f' WHERE {index["predicate"]}' if index['predicate'] else ''
+    op.execute(
+        f'CREATE {unique}INDEX CONCURRENTLY "{copy}" ON "{table}" '
+        f'USING {index["method"]} ({keys}){where}'
+    )
+
+
+def _online_columns(bind):
+    """{table: [column, ...]} still to convert; the order of TABLES and FOREIGN_KEYS."""
+    pending = {}
+    for table, column in _columns():
+        if _column_type(bind, table, column) not in (None, 'uuid'):
+            pending.setdefault(table, []).append(column)
+    return pending
+
+
+def _add_shadow_columns(pending):
+    for table, columns in pending.items():
+        for column in columns:
+            op.execute(f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS {_shadow(column)} uuid')
+        assignments = ' '.join(f'NEW.{_shadow(c)} := NEW.{c}::uuid;' for c in columns)
+        op.execute(
+            f'CREATE OR REPLACE FUNCTION {table}_uuid_dual_write() RETURNS trigger AS $$ '
+            f'BEGIN {assignments} RETURN NEW; END $$ LANGUAGE plpgsql'
+        )
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_uuid_dual_write ON "{table}"')
+        op.execute(
+            f'CREATE TRIGGER {table}_uuid_dual_write BEFORE INSERT OR UPDATE ON "{table}" '
+            f'FOR EACH ROW EXECUTE FUNCTION {table}_uuid_dual_write()'
+        )
+
+
+def _backfill(bind, pending):
+    # the primary key is still the varchar id, so walk it in batches; each UPDATE commits
+    # on its own and rows written meanwhile are already filled by the trigger
+    for table, columns in pending.items():
+        assignments = ', '.join(f'{_shadow(c)} = {c}::uuid' for c in columns)
+        last = ''
+        while True:
+            upto = bind.execute(
+                sa.text(
+                    f'SELECT id FROM "{table}" WHERE id > :last '
+                    f'ORDER BY id OFFSET :skip LIMIT 1'
+                ),
+                {'last': last, 'skip': BACKFILL_BATCH - 1},
+            ).scalar()
+            upper = ' AND id <= :upto' if upto is not None else ''
+            bind.execute(
+                sa.text(f'UPDATE "{table}" SET {assignments} WHERE id > :last{upper}'),
+                {'last': last, 'upto': upto},
+            )
+            if upto is None:
+                break
+            last = upto
+
+
+def _prepare_constraints(bind, pending, indexes):
+    for table, columns in pending.items():
+        for index in indexes[table]:
+            _create_index_concurrently(bind, table, index, columns)
+        for column in columns:
+            if _is_nullable(bind, table, column):
+                continue
+            # a validated CHECK lets the swap's SET NOT NULL skip its table scan
+            check = f'{table}_{_shadow(column)}_not_null'
+            if not _constraint_exists(bind, table, check):
+                op.execute(
+                    f'ALTER TABLE "{table}" ADD CONSTRAINT {check} '
+                    f'CHECK ({_shadow(column)} IS NOT NULL) NOT VALID'
+                )
+            op.execute(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT {check}')
+
+    for table, column, referred, ondelete in FOREIGN_KEYS:
+        if column not in pending.get(table, ()):
+            continue
+        name = f'{table}_{_shadow(column)}_fkey'
+        if not _constraint_exists(bind, table, name):
+            # the referenced table's shadow id already has its unique index copy
+            on_delete = f' ON DELETE {ondelete}' if ondelete else ''
+            op.execute(
+                f'ALTER TABLE "{table}" ADD CONSTRAINT {name} FOREIGN KEY ({_shadow(column)}) '
+                f'REFERENCES "{referred}" ({_shadow("id")}){on_delete} NOT VALID'
+            )
+        op.execute(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT {name}')
+
+
+def _swap(bind, pending, indexes):
+    inspector = sa.inspect(bind)
+    for table, column, _, _ in FOREIGN_KEYS:
+        if column not in pending.get(table, ()):
+            continue
+        for fk in inspector.get_foreign_keys(table):
+            if fk['constrained_columns'] == [column] and fk.get('name'):
+                op.drop_constraint(fk['name'], table, type_='foreignkey')
+
+    for table, columns in pending.items():
+        op.execute(f'DROP TRIGGER {table}_uuid_dual_write ON "{table}"')
+        op.execute(f'DROP FUNCTION {table}_uuid_dual_write()')
+        for column in columns:
+            not_null = not _is_nullable(bind, table, column)
+            # drops the varchar primary key, unique constraint and indexes with it
+            op.execute(f'ALTER TABLE "{table}" DROP COLUMN {column}')
+            op.execute(f'ALTER TABLE "{table}" RENAME COLUMN {_shadow(column)} TO {column}')
+            if not_null:
+                op.execute(f'ALTER TABLE "{table}" ALTER COLUMN {column} SET NOT NULL')
+                op.execute(
+                    f'ALTER TABLE "{table}" DROP CONSTRAINT {table}_{_shadow(column)}_not_null'
+                )
+        for index in indexes[table]:
+            copy = _index_copy_name(index['name'])
+            if index['constraint_type'] == 'p':
+                op.execute(
+                    f'ALTER TABLE "{table}" ADD CONSTRAINT {index["constraint_name"]} '
+                    f'PRIMARY KEY USING INDEX "{copy}"'
+                )
+            elif index['constraint_type'] == 'u':
+                op.execute(
+                    f'ALTER TABLE "{table}" ADD CONSTRAINT {index["constraint_name"]} '
+                    f'UNIQUE USING INDEX "{copy}"'
+                )
+            else:
+                op.execute(f'ALTER INDEX "{copy}" RENAME TO "{index["name"]}"')
+
+    for table, column, _, _ in FOREIGN_KEYS:
+        if column in pending.get(table, ()):
+            op.execute(
+                f'ALTER TABLE "{table}" RENAME CONSTRAINT {table}_{_shadow(column)}_fkey '
+                f'TO {table}_{column}_fkey'
+            )
+
+
+def _upgrade_online(bind):
+    pending = _online_columns(bind)
+    if not pending:
+        return
+    _check_values(bind, [(t, c) for t, columns in pending.items() for c in columns])
+    indexes = {t: _indexes_on(bind, t, columns) for t, columns in pending.items()}
+
+    _add_shadow_columns(pending)
+    with op.get_context().autocommit_block():
+        _backfill(bind, pending)
+        _prepare_constraints(bind, pending, indexes)
+    _swap(bind, pending, indexes)
+
+
+def _upgrade_in_place(bind):
+    columns = [(t, c) for t, c in _columns() if _column_type(bind, t, c) != 'uuid']
+    _check_values(bind, columns)
+
+    _drop_foreign_keys(bind)
+    _alter(bind, 'uuid', '{column}::uuid')
+    _create_foreign_keys(validate_now=False)
+
+    with op.get_context().autocommit_block():
+        for table, column, _, _ in FOREIGN_KEYS:
+            op.execute(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT {table}_{column}_fkey')
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # session-wide, so it also covers the reads before the DDL and the autocommit steps
+    op.execute("SET lock_timeout = '5s'")
+    mode = context.get_x_argument(as_dictionary=True).get('uuid_conversion', 'online')
+    if mode == 'in-place':
+        _upgrade_in_place(bind)
+    elif mode == 'online':
+        _upgrade_online(bind)
+    else:
+        raise ValueError(f"uuid_conversion must be 'online' or 'in-place', not {mode!r}")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    op.execute("SET lock_timeout = '5s'")
+    _drop_foreign_keys(bind)
+    _alter(bind, 'character varying', '{column}::text')
+    _create_foreign_keys(validate_now=True)
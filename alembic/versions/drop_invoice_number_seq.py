@@ -0,0 +1,22 @@
+"""drop invoice_number_seq; block invoice numbers are reserved from invoice_number_counter
+
+Revision ID: e6f7a8b9c0d1
+Revises: d5e6f7a8b9c0
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+revision = 'e6f7a8b9c0d1'
+down_revision = 'd5e6f7a8b9c0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute('DROP SEQUENCE IF EXISTS invoice_number_seq')
+
+
+def downgrade() -> None:
+    op.execute('CREATE SEQUENCE IF NOT EXISTS invoice_number_seq')
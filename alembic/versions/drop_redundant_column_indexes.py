@@ -0,0 +1,58 @@
+"""drop single-column indexes no query uses; index user email by lower()
+
+Revision ID: c8d9e0f1a2b3
+Revises: b7c8d9e0f1a2
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c8d9e0f1a2b3'
+down_revision = 'b7c8d9e0f1a2'
+branch_labels = None
+depends_on = None
+
+
+# (table, column) pairs whose index=True indexes are never used for lookups. Lookups that
+# remain are served by ix_menu_menu_id_not_deleted, ix_order_table_no_created_at_not_deleted
+# and the unique restaurant / invoice_number indexes, which are kept.
+REDUNDANT_INDEXES = (
+    ('menu', 'category_id'),
+    ('menu', 'category_name'),
+    ('menu', 'item_list'),
+    ('menu', 'menu_id'),
+    ('menu', 'price'),
+    ('menu', 'quantity'),
+    ('order', 'item_list'),
+    ('order', 'quantity'),
+    ('order', 'table_no'),
+    ('stock', 'cost_per_unit'),
+    ('stock', 'name'),
+    ('stock', 'quantity'),
+    ('stock', 'unit_of_measure'),
+    ('order_status', 'status'),
+    ('restaurant', 'restaurant_address'),
+    ('restaurant', 'restaurant_email'),
+    ('restaurant', 'restaurant_phone'),
+    ('user', 'firstname'),
+    ('user', 'lastname'),
+    ('category', 'category_id'),
+    ('category', 'category_name'),
+    ('menu_item', 'item_name'),
+    ('menu_item', 'item_price'),
+    ('table', 'table_no'),
+)
+
+
+def upgrade() -> None:
+    for table, column in REDUNDANT_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS ix_{table}_{column}')
+    op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_email_lower', table_name='user')
+    for table, column in REDUNDANT_INDEXES:
+        op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False)
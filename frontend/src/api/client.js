@@ -25,6 +25,59 @@ export async function request(path, options = {}) {
   return data;
 }
 
+// POST with an Idempotency-Key; retries network failures with the same key, so a request
+// that reached the server before the connection dropped is answered from its stored result.
+export async function requestIdempotent(path, body, retries = 2) {
+  const options = {
+    method: 'POST',
+    body: JSON.stringify(body),
+    headers: { 'Idempotency-Key': crypto.randomUUID() },
+  };
+  for (let attempt = 0; ; attempt += 1) {
+    try {
+      return await request(path, options);
+    } catch (err) {
+      // fetch rejects with TypeError on network errors; HTTP errors carry a status
+      if (err.status !== undefined || attempt >= retries) throw err;
+      await new Promise((r) => setTimeout(r, 500 * (attempt + 1)));
+    }
+  }
+}
+
+// Total row count of a list endpoint, read from the X-Total-Count header (one-row page).
+export async function requestTotal(path) {
+  const url = `${API_BASE}${path}?page=1&per_page=1&with_total=true`;
+  const token = getToken();
+  const res = await fetch(url, { headers: token ? { Authorization: `Bearer ${token}` } : {} });
+  if (!res.ok) {
+    const err = new Error(res.statusText || 'Request failed');
+    err.status = res.status;
+    throw err;
+  }
+  return Number(res.headers.get('X-Total-Count')) || 0;
+}
+
+// Subscribe to the order event stream (SSE). onEvent gets { type, order }; onReconnect
+// fires after the browser re-establishes a dropped stream, when events may have been missed.
+export function subscribeOrders(onEvent, onReconnect) {
+  const source = new EventSource(`${API_BASE}/orders/stream`);
+  let dropped = false;
+  const handle = (e) => {
+    try {
+      onEvent(JSON.parse(e.data));
+    } catch {
+      // ignore malformed events
+    }
+  };
+  ['order.created', 'order.updated', 'order.status'].forEach((type) => source.addEventListener(type, handle));
+  source.onerror = () => { dropped = true; };
+  source.onopen = () => {
+    if (dropped && onReconnect) onReconnect();
+    dropped = false;
+  };
+  return () => source.close();
+}
+
 export const api = {
   // Auth
   login: (body) => request('/login', { method: 'POST', body: JSON.stringify(body) }),
@@ -54,6 +107,7 @@ export const api = {
 
   // Tables
   getTables: (page = 1, per_page = 50) => request(`/get_tables?page=${page}&per_page=${per_page}`),
+  countTables: () => requestTotal('/get_tables'),
   createTable: (body) => request('/create_table', { method: 'POST', body: JSON.stringify(body) }),
   getTable: (id) => request(`/tables_by_id/${id}`),
   updateTable: (id, body) => request(`/update_table/${id}`, { method: 'PUT', body: JSON.stringify(body) }),
@@ -64,6 +118,7 @@ export const api = {
 
   // Menu
   getMenus: (page = 1, per_page = 50) => request(`/get_menus?page=${page}&per_page=${per_page}`),
+  countMenus: () => requestTotal('/get_menus'),
   getMenu: (id) => request(`/get_menu_by_id/${id}`),
   createMenu: (body) => request('/create_menu', { method: 'POST', body: JSON.stringify(body) }),
   updateMenu: (id, body) => request(`/update_menu/${id}`, { method: 'PUT', body: JSON.stringify(body) }),
@@ -71,14 +126,17 @@ export const api = {
 
   // Orders
   getOrders: (page = 1, per_page = 50) => request(`/get_orders?page=${page}&per_page=${per_page}`),
+  countOrders: () => requestTotal('/get_orders'),
   getOrder: (id) => request(`/get_order_by_id/${id}`),
-  createOrder: (body) => request('/create_order', { method: 'POST', body: JSON.stringify(body) }),
+  createOrder: (body) => requestIdempotent('/create_order', body),
+  createOrders: (orders) => request('/create_orders', { method: 'POST', body: JSON.stringify(orders) }),
   updateOrder: (id, body) => request(`/update_order/${id}`, { method: 'PUT', body: JSON.stringify(body) }),
   deleteOrder: (id) => request(`/delete_order_by_id/${id}`, { method: 'DELETE' }),
   updateOrderStatus: (id, body) => request(`/update_order_status/${id}`, { method: 'PUT', body: JSON.stringify(body) }),
 
   // Stock
   getStocks: (page = 1, per_page = 50) => request(`/get_stocks?page=${page}&per_page=${per_page}`),
+  countStocks: () => requestTotal('/get_stocks'),
   getStock: (id) => request(`/get_stock_by_id/${id}`),
   createStock: (body) => request('/create_stock', { method: 'POST', body: JSON.stringify(body) }),
   updateStock: (id, body) => request(`/update_stock/${id}`, { method: 'PUT', body: JSON.stringify(body) }),
@@ -89,12 +147,12 @@ export const api = {
   getInvoice: (id) => request(`/get_invoice_by_id/${id}`),
   getTablesWithUninvoicedOrders: () => request('/tables_with_uninvoiced_orders'),
   createInvoice: (body) => request('/create_invoice', { method: 'POST', body: JSON.stringify(body) }),
-  createInvoiceForTable: (body) => request('/create_invoice_for_table', { method: 'POST', body: JSON.stringify(body) }),
+  createInvoiceForTable: (body) => requestIdempotent('/create_invoice_for_table', body),
   updateInvoice: (id, body) => request(`/update_invoice/${id}`, { method: 'PUT', body: JSON.stringify(body) }),
   deleteInvoice: (id) => request(`/delete_invoice_by_id/${id}`, { method: 'DELETE' }),
 
   // Payments
-  createPayment: (body) => request('/create_payment', { method: 'POST', body: JSON.stringify(body) }),
+  createPayment: (body) => requestIdempotent('/create_payment', body),
   getPayment: (id) => request(`/${id}`),
   markPaymentPaid: (id, body = {}) => request(`/${id}/mark_paid`, { method: 'POST', body: JSON.stringify(body) }),
 };
@@ -9,32 +9,15 @@ export default function Dashboard() {
   const [stats, setStats] = useState({ tables: 0, menus: 0, orders: 0, stock: 0 });
 
   useEffect(() => {
-    Promise.all([
-      api.getTables(1, 1).then((d) => ({ tables: Array.isArray(d) ? d.length : 0 })),
-      api.getMenus(1, 1).then((d) => ({ menus: Array.isArray(d) ? d.length : 0 })),
-      api.getOrders(1, 1).then((d) => ({ orders: Array.isArray(d) ? d.length : 0 })),
-      api.getStocks(1, 1).then((d) => ({ stock: Array.isArray(d) ? d.length : 0 })),
-    ]).catch(() => ({})).then((arr) => {
-      setStats((s) => ({
-        ...s,
-        ...Object.assign({}, ...arr),
-      }));
-    });
-
     const load = async () => {
       try {
-        const [t, m, o, st] = await Promise.all([
-          api.getTables(1, 100),
-          api.getMenus(1, 100),
-          api.getOrders(1, 100),
-          api.getStocks(1, 100),
+        const [tables, menus, orders, stock] = await Promise.all([
+          api.countTables(),
+          api.countMenus(),
+          api.countOrders(),
+          api.countStocks(),
         ]);
-        setStats({
-          tables: Array.isArray(t) ? t.length : 0,
-          menus: Array.isArray(m) ? m.length : 0,
-          orders: Array.isArray(o) ? o.length : 0,
-          stock: Array.isArray(st) ? st.length : 0,
-        });
+        setStats({ tables, menus, orders, stock });
       } catch {
         // keep defaults
       }
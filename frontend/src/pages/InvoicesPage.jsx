@@ -52,7 +52,7 @@ export default function InvoicesPage() {
   const openCreate = () => {
     setForm({
       order_id: orders[0]?.order_id || '',
-      invoice_number: `INV-${Date.now()}`,
+      invoice_number: '',
       invoice_date: new Date().toISOString().slice(0, 10),
       total_amount: 0,
       gst_percent: 0,
@@ -124,7 +124,7 @@ export default function InvoicesPage() {
     try {
       const payload = {
         order_id: form.order_id,
-        invoice_number: form.invoice_number,
+        invoice_number: form.invoice_number || undefined,
         invoice_date: form.invoice_date,
         gst_percent: Number(form.gst_percent) || 0,
         discount_percent: Number(form.discount_percent) || 0,
@@ -348,11 +348,11 @@ export default function InvoicesPage() {
                 </select>
               </div>
               <div className="form-group">
-                <label>Invoice number</label>
+                <label>{modal === 'create' ? 'Invoice number (optional, auto-generated if empty)' : 'Invoice number'}</label>
                 <input
                   value={form.invoice_number}
                   onChange={(e) => setForm((f) => ({ ...f, invoice_number: e.target.value }))}
-                  required
+                  required={modal !== 'create'}
                 />
               </div>
               <div className="form-group">
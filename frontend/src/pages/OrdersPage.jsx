@@ -1,5 +1,5 @@
 import { useState, useEffect, useMemo } from 'react';
-import { api } from '../api/client';
+import { api, subscribeOrders } from '../api/client';
 import './ManagePage.css';
 
 const statusClass = (s) => {
@@ -92,8 +92,33 @@ export default function OrdersPage() {
       .finally(() => setLoading(false));
   };
 
+  const loadOrders = () =>
+    api.getOrders(1, 100)
+      .then((data) => setList(Array.isArray(data) ? data : []))
+      .catch((e) => setError(e.message));
+
   useEffect(() => load(), []);
 
+  // Live updates from the order stream instead of re-fetching after every change
+  useEffect(() => subscribeOrders(async ({ order }) => {
+    if (!order) return;
+    let next = order;
+    if (order.item_list_truncated) {
+      try {
+        next = await api.getOrder(order.order_id);
+      } catch {
+        return;
+      }
+    }
+    setList((prev) => {
+      const i = prev.findIndex((o) => o.order_id === next.order_id);
+      if (i < 0) return [...prev, next];
+      const copy = [...prev];
+      copy[i] = { ...copy[i], ...next };
+      return copy;
+    });
+  }, loadOrders), []);
+
   const openCreate = () => {
     const firstTableNo = tables.length > 0 ? String(tables[0].table_no) : '';
     setForm({ item_list: '[]', quantity: 0, table_no: firstTableNo });
@@ -170,7 +195,6 @@ export default function OrdersPage() {
         await api.updateOrder(modal, payload);
       }
       setModal(null);
-      load();
     } catch (err) {
       setError(err.message);
     }
@@ -181,7 +205,6 @@ export default function OrdersPage() {
     try {
       await api.updateOrderStatus(orderId, { status: statusForm.status });
       setModal(null);
-      load();
     } catch (err) {
       setError(err.message);
     }
@@ -192,7 +215,7 @@ export default function OrdersPage() {
     try {
       await api.deleteOrder(id);
       setModal(null);
-      load();
+      loadOrders();
     } catch (err) {
       setError(err.message);
     }
@@ -0,0 +1,197 @@
+"""
+Sync (threadpool) vs async handlers for the same order lookup: requests/sec and latency
+percentiles at equal client concurrency, served by uvicorn through the app's middleware.
+
+    ENV_FILE=tests/.test-env python -m scripts.bench_async_endpoints --concurrency 20 40 80
+
+Both routes run the same two statements on their own session: a SELECT pg_sleep(--db-ms)
+standing in for a slow round trip to the database, and the order lookup. The sync route
+holds one of Starlette's 40 threadpool slots for the whole request; the async one awaits
+the database. While the load runs, a probe sends one cheap request every 50 ms to the sync
+route with no sleep, the way the app's remaining sync endpoints share that threadpool.
+Each pool gets --pool-size connections, more than the threadpool can use, so the sync side
+is capped by its threads and not by its pool.
+
+Load comes from an httpx client in the same process, so on a small machine both sides are
+CPU bound well before the threadpool is; compare the columns, not across machines.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import threading
+import time
+
+# must come first: it points the app's engines at BENCH_DB
+from scripts.bench_utils import bench_database, print_table, seed_orders
+
+# isort: split
+import httpx
+import uvicorn
+from fastapi import APIRouter
+from sqlalchemy import text
+
+# 40 sync threads + 45 async connections stay under Postgres' default max_connections
+POOL_SIZE_DEFAULT = 45
+PROBE_INTERVAL_S = 0.05
+
+
+def _bench_app():
+    from src.main import create_app
+    from src.user.models import Order as OrderModel
+    from utils.db.session import get_async_db_read, get_db_read
+
+    router = APIRouter()
+
+    @router.get("/bench/sync/order/{order_id}")
+    def sync_order(order_id: str, db: get_db_read, sleep_ms: float = 0):
+        db.execute(text("SELECT pg_sleep(:s)"), {"s": sleep_ms / 1000})
+        return {"order_id": str(db.get(OrderModel, order_id).id)}
+
+    @router.get("/bench/async/order/{order_id}")
+    async def async_order(order_id: str, db: get_async_db_read, sleep_ms: float = 0):
+        await db.execute(text("SELECT pg_sleep(:s)"), {"s": sleep_ms / 1000})
+        return {"order_id": str((await db.get(OrderModel, order_id)).id)}
+
+    app = create_app()
+    app.include_router(router)
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _get(client: httpx.AsyncClient, url: str, latencies):
+    start = time.perf_counter()
+    response = await client.get(url)
+    latencies.append((time.perf_counter() - start) * 1000)
+    assert response.status_code == 200, response.text
+
+
+async def _run(
+    base: str, mode: str, ids, concurrency: int, requests: int, db_ms: float
+):
+    """
+    Keep concurrency requests to the mode route in flight until requests are done, probing
+    the sync route meanwhile. Returns req/s and the load and probe latencies in ms.
+    """
+    latencies, probe_latencies = [], []
+    remaining = iter(range(requests))
+    done = asyncio.Event()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+
+    async def worker(client: httpx.AsyncClient):
+        for n in remaining:
+            url = f"{base}/{mode}/order/{ids[n % len(ids)]}?sleep_ms={db_ms}"
+            await _get(client, url, latencies)
+
+    async def probe(client: httpx.AsyncClient):
+        n = 0
+        while not done.is_set():
+            await _get(
+                client, f"{base}/sync/order/{ids[n % len(ids)]}", probe_latencies
+            )
+            n += 1
+            await asyncio.sleep(PROBE_INTERVAL_S)
+
+    async with httpx.AsyncClient(limits=limits, timeout=300) as client:
+        probing = asyncio.create_task(probe(client))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probing
+    return requests / elapsed, latencies, probe_latencies
+
+
+def _percentile(samples, q: int) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[20, 40, 80])
+    parser.add_argument("--rounds", type=int, default=4, help="requests per client")
+    parser.add_argument("--db-ms", type=float, default=1000.0)
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE_DEFAULT)
+    args = parser.parse_args()
+    # read by src.config on first import, which happens below
+    os.environ["DB_POOL_SIZE"] = str(args.pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+    # queued requests show up as slow queries; re-running them under EXPLAIN skews the run
+    os.environ["SLOW_QUERY_EXPLAIN_SAMPLE_RATE"] = "0"
+
+    results = []
+    with bench_database() as engine:
+        with engine.begin() as conn:
+            seed_orders(conn, 1000)
+            ids = [str(i) for i in conn.scalars(text('SELECT id FROM "order"'))]
+
+        from utils.db.session import async_engine
+
+        port = _free_port()
+        server = uvicorn.Server(
+            uvicorn.Config(
+                _bench_app(), port=port, log_level="warning", timeout_keep_alive=300
+            )
+        )
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+        base = f"http://127.0.0.1:{port}/bench"
+        try:
+            for concurrency in args.concurrency:
+                row = [concurrency]
+                for mode in ("sync", "async"):
+                    rps, latencies, probes = asyncio.run(
+                        _run(
+                            base,
+                            mode,
+                            ids,
+                            concurrency,
+                            concurrency * args.rounds,
+                            args.db_ms,
+                        )
+                    )
+                    row += [
+                        f"{rps:.1f}",
+                        f"{_percentile(latencies, 99):.0f}",
+                        f"{statistics.median(probes):.0f}",
+                        f"{_percentile(probes, 99):.0f}",
+                    ]
+                    # the async pool keeps its connections; give the sync ones back
+                    engine.dispose()
+                results.append(row)
+        finally:
+            server.should_exit = True
+            thread.join()
+            # its connections belong to the server thread's loop; drop them without closing
+            async_engine.sync_engine.dispose(close=False)
+
+    print(
+        f"{args.rounds} requests per client, {args.db_ms:g} ms of database time each, "
+        f"pool size {args.pool_size}; probe = cheap sync request during the load"
+    )
+    print_table(
+        (
+            "concurrency",
+            "sync req/s",
+            "sync p99 ms",
+            "probe p50",
+            "probe p99",
+            "async req/s",
+            "async p99 ms",
+            "probe p50",
+            "probe p99",
+        ),
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
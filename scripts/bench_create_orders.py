@@ -0,0 +1,113 @@
+"""
+Batched order submission (POST /api/create_orders) vs the same orders sent as N single
+POST /api/create_order calls: statements executed and wall time per batch, through the app.
+
+    ENV_FILE=tests/.test-env python -m scripts.bench_create_orders --orders 1 10 50 200
+"""
+import argparse
+import json
+
+# must come first: it points the app's engines at BENCH_DB
+from scripts.bench_utils import bench_database, count_statements, measure, print_table
+
+# isort: split
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.main import create_app
+from utils.db.session import async_engine
+
+TABLES = 40
+
+
+def _orders(count: int):
+    return [
+        {
+            "item_list": json.dumps(
+                [
+                    {"name": f"Dish {n % 50}", "qty": 2, "price": 120.0},
+                    {"name": "Lassi", "qty": 1, "price": 60.0},
+                ]
+            ),
+            "quantity": 3,
+            "table_no": str(n % TABLES + 1),
+        }
+        for n in range(count)
+    ]
+
+
+def _batched(client: TestClient, orders):
+    response = client.post("/api/create_orders", json=orders)
+    assert response.status_code == 201 and not response.json()["errors"], response.text
+
+
+def _singles(client: TestClient, orders):
+    for order in orders:
+        response = client.post("/api/create_order", json=order)
+        assert response.status_code == 201, response.text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    with bench_database() as engine:
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO "table" (id, table_no, created_at, updated_at, is_deleted)
+                    SELECT gen_random_uuid(), g, now(), now(), false
+                    FROM generate_series(1, :tables) AS g
+                    """
+                ),
+                {"tables": TABLES},
+            )
+        # one client for the whole run: the asyncpg pool is bound to its event loop
+        with TestClient(create_app()) as client:
+            for count in args.orders:
+                orders = _orders(count)
+                with count_statements(async_engine.sync_engine) as statements:
+                    _batched(client, orders)
+                batched_statements = len(statements)
+                with count_statements(async_engine.sync_engine) as statements:
+                    _singles(client, orders)
+                single_statements = len(statements)
+                batched_ms = measure(
+                    lambda: _batched(client, orders), repeat=args.repeat
+                )
+                singles_ms = measure(
+                    lambda: _singles(client, orders), repeat=args.repeat
+                )
+                results.append(
+                    (
+                        count,
+                        batched_statements,
+                        single_statements,
+                        f"{batched_ms:.1f}",
+                        f"{singles_ms:.1f}",
+                        f"{singles_ms / batched_ms:.1f}x",
+                    )
+                )
+        # its connections belong to the closed client's loop; drop them without closing
+        async_engine.sync_engine.dispose(close=False)
+
+    print("orders of 2 line items each, median ms per batch over the app's HTTP stack")
+    print_table(
+        (
+            "orders",
+            "stmts batched",
+            "stmts singles",
+            "batched ms",
+            "singles ms",
+            "speedup",
+        ),
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Write cost of the single-column indexes dropped by drop_redundant_column_indexes: bulk
+seeding and per-request ORM inserts, with the indexes absent (current schema) vs recreated.
+
+    ENV_FILE=tests/.test-env python -m scripts.bench_dropped_indexes --rows 200000
+"""
+import argparse
+import importlib.util
+import time
+from pathlib import Path
+
+# must come first: it points the app's engines at BENCH_DB
+from scripts.bench_utils import bench_database, print_table, seed_orders
+
+# isort: split
+from sqlalchemy import text
+
+from src.user.models import Menu, Order, Stock
+from utils.db.session import SessionLocal
+
+MIGRATION = (
+    Path(__file__).resolve().parent.parent
+    / "alembic"
+    / "versions"
+    / "drop_redundant_column_indexes.py"
+)
+WRITE_TABLES = ("order", "menu", "stock")
+
+
+def _redundant_indexes():
+    spec = importlib.util.spec_from_file_location(
+        "drop_redundant_column_indexes", MIGRATION
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return [(t, c) for t, c in module.REDUNDANT_INDEXES if t in WRITE_TABLES]
+
+
+def _reset(conn, indexes, recreate: bool):
+    conn.execute(text('TRUNCATE "order", menu, stock CASCADE'))
+    for table, column in indexes:
+        conn.execute(text(f"DROP INDEX IF EXISTS ix_{table}_{column}"))
+        if recreate:
+            conn.execute(
+                text(f'CREATE INDEX ix_{table}_{column} ON "{table}" ({column})')
+            )
+
+
+def _seed(conn, rows: int):
+    seed_orders(conn, rows)
+    conn.execute(
+        text(
+            """
+            INSERT INTO menu (id, menu_id, item_list, price, quantity, category_name,
+                              category_id, created_at, updated_at, is_deleted)
+            SELECT gen_random_uuid(), 'M' || g % 200, 'Dish ' || g, g % 900, '1',
+                   'Category ' || g % 12, 'C' || g % 12, now(), now(), false
+            FROM generate_series(1, :rows) AS g
+            """
+        ),
+        {"rows": rows},
+    )
+    conn.execute(
+        text(
+            """
+            INSERT INTO stock (id, name, quantity, unit_of_measure, cost_per_unit,
+                               created_at, updated_at, is_deleted)
+            SELECT gen_random_uuid(), 'Ingredient ' || g, g % 500, 'kg', (g % 90) + 0.5,
+                   now(), now(), false
+            FROM generate_series(1, :rows) AS g
+            """
+        ),
+        {"rows": rows},
+    )
+
+
+def _request_inserts(requests: int) -> float:
+    """Milliseconds per request that writes one order, menu row and stock row and commits."""
+    start = time.perf_counter()
+    for n in range(requests):
+        with SessionLocal() as db:
+            db.add(Order(item_list="[]", quantity=1, table_no=n % 40 + 1))
+            db.add(
+                Menu(
+                    menu_id=f"M{n}",
+                    item_list=f"Dish {n}",
+                    price=n % 900,
+                    quantity="1",
+                    category_name="Mains",
+                    category_id="C1",
+                )
+            )
+            db.add(
+                Stock(
+                    name=f"Ingredient {n}",
+                    quantity=1.0,
+                    unit_of_measure="kg",
+                    cost_per_unit=1.0,
+                )
+            )
+            db.commit()
+    return (time.perf_counter() - start) * 1000 / requests
+
+
+def _index_mib(conn) -> float:
+    size = conn.execute(
+        text(
+            "SELECT sum(pg_indexes_size(c.oid)) FROM pg_class c "
+            "WHERE c.relname IN ('order', 'menu', 'stock') AND c.relkind = 'r'"
+        )
+    ).scalar()
+    return size / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    args = parser.parse_args()
+
+    indexes = _redundant_indexes()
+    results = []
+    with bench_database() as engine:
+        for label, recreate in (("dropped (current)", False), ("recreated", True)):
+            with engine.begin() as conn:
+                _reset(conn, indexes, recreate)
+            start = time.perf_counter()
+            with engine.begin() as conn:
+                _seed(conn, args.rows)
+            seed_s = time.perf_counter() - start
+            per_request_ms = _request_inserts(args.requests)
+            with engine.connect() as conn:
+                index_mib = _index_mib(conn)
+            results.append(
+                (label, f"{seed_s:.2f}", f"{per_request_ms:.3f}", f"{index_mib:.1f}")
+            )
+
+    print(
+        f"{args.rows} rows each in order/menu/stock, {args.requests} insert requests; "
+        f"{len(indexes)} single-column indexes on those tables"
+    )
+    print_table(("indexes", "seed s", "ms/request", "index MiB"), results)
+
+
+if __name__ == "__main__":
+    main()
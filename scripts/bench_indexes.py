@@ -0,0 +1,83 @@
+"""
+Live-row partial index vs a plain index on order(table_no, created_at), with most orders
+soft-deleted: the lookup behind a table's open orders, and each index's size.
+
+    ENV_FILE=tests/.test-env python -m scripts.bench_indexes --rows 1000000
+"""
+import argparse
+
+# must come first: it points the app's engines at BENCH_DB
+from scripts.bench_utils import bench_database, measure, print_table, seed_orders
+
+# isort: split
+from sqlalchemy import text
+
+from src.user.models import Order
+from utils.db.session import SessionLocal
+
+PARTIAL = "ix_order_table_no_created_at_not_deleted"
+PLAIN = "ix_bench_order_table_no_created_at"
+
+
+def _open_orders(table_no: int):
+    # an ORM query, so the global soft-delete filter adds is_deleted = false
+    with SessionLocal() as db:
+        return (
+            db.query(Order.id, Order.created_at)
+            .filter(Order.table_no == table_no)
+            .order_by(Order.created_at)
+            .all()
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--deleted", type=float, default=0.9)
+    parser.add_argument("--tables", type=int, default=200)
+    args = parser.parse_args()
+
+    with bench_database() as engine:
+        with engine.begin() as conn:
+            seed_orders(
+                conn, args.rows, deleted_fraction=args.deleted, tables=args.tables
+            )
+
+        def index_mib(name: str) -> str:
+            with engine.connect() as conn:
+                size = conn.execute(
+                    text("SELECT pg_relation_size(to_regclass(:name))"), {"name": name}
+                ).scalar()
+            return f"{size / 2**20:.1f}"
+
+        results = []
+        tables = range(1, args.tables + 1, max(1, args.tables // 20))
+        partial_ms = measure(lambda: [_open_orders(t) for t in tables])
+        results.append(
+            (
+                "partial (live rows)",
+                f"{partial_ms / len(tables):.2f}",
+                index_mib(PARTIAL),
+            )
+        )
+
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP INDEX {PARTIAL}"))
+            conn.execute(
+                text(f'CREATE INDEX {PLAIN} ON "order" (table_no, created_at)')
+            )
+            conn.execute(text('ANALYZE "order"'))
+        plain_ms = measure(lambda: [_open_orders(t) for t in tables])
+        results.append(
+            ("plain (all rows)", f"{plain_ms / len(tables):.2f}", index_mib(PLAIN))
+        )
+
+    print(
+        f"{args.rows} orders over {args.tables} tables, {args.deleted:.0%} soft-deleted; "
+        "median ms per table lookup"
+    )
+    print_table(("index", "ms", "index MiB"), results)
+
+
+if __name__ == "__main__":
+    main()
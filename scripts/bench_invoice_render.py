@@ -0,0 +1,245 @@
+"""
+Invoice page render cost and bytes per view: the old f-string page with its stylesheet
+inlined vs the current template (src/user/templates/invoice.html) with a fingerprinted
+stylesheet link, on the same in-memory invoice. No database is needed.
+
+    ENV_FILE=tests/.test-env python -m scripts.bench_invoice_render --items 1 12 50
+"""
+import argparse
+import html
+import timeit
+from datetime import datetime
+from types import SimpleNamespace
+
+# must come first: src.user.api reads its settings from the env file at import
+from scripts.bench_utils import print_table
+
+# isort: split
+from src.user.api import _invoice_page_html
+from src.user.utils.pages import asset_urls, static_assets
+
+
+# fmt: off
+def _inline_css_page(invoice, restaurant, order, line_items) -> str:
+    """The invoice page as rendered before the template move, kept verbatim as the baseline."""
+    logo_url = getattr(restaurant, "logo_url", None) or ""
+    address = getattr(restaurant, "restaurant_address", None) or ""
+    phone = getattr(restaurant, "restaurant_phone", None) or ""
+    email = getattr(restaurant, "restaurant_email", None) or ""
+
+    inv_date = invoice.invoice_date
+    if hasattr(inv_date, "strftime"):
+        date_str = inv_date.strftime("%d/%m/%Y")
+    else:
+        date_str = str(inv_date)[:10] if inv_date else ""
+
+    total = float(invoice.total_amount or 0)
+    subtotal = round(sum((item["quantity"] * item["price"]) for item in line_items), 2) or total
+    gst_percent = float(getattr(invoice, "gst_percent", 0) or 0)
+    discount_percent = float(getattr(invoice, "discount_percent", 0) or 0)
+    gst_amount = round(subtotal * (gst_percent / 100), 2)
+    discount_amount = round(subtotal * (discount_percent / 100), 2)
+    total_computed = round(subtotal + gst_amount - discount_amount, 2)
+    if abs(total_computed - total) > 0.01:
+        total_computed = total
+
+    rows_html = "".join(
+        f"""
+        <tr>
+          <td>{i + 1}</td>
+          <td>{html.escape(str(item['description']))}</td>
+          <td>{item['quantity']}pcs</td>
+          <td>₹{item['price']:.2f}</td>
+        </tr>"""
+        for i, item in enumerate(line_items)
+    )
+    if not rows_html:
+        rows_html = "<tr><td colspan='4'>No items</td></tr>"
+
+    # Header: logo (if set) or initial, then restaurant name (auto from first restaurant in DB)
+    restaurant_display_name = (restaurant.upi_merchant_name or "Restaurant") if restaurant else "Restaurant"  # noqa: E501
+    logo_html = ""
+    if logo_url:
+        logo_html = f'<img src="{html.escape(logo_url)}" alt="{html.escape(restaurant_display_name)}" class="logo-img" />'  # noqa: E501
+    else:
+        initial = (restaurant_display_name or "R")[0].upper()
+        logo_html = f'<div class="logo-placeholder" aria-hidden="true">{html.escape(initial)}</div>'
+
+    website = getattr(restaurant, "website", None) or ""
+    contact_lines = []
+    if phone:
+        contact_lines.append(f'<span class="contact-line"><span class="icon">&#9742;</span> {html.escape(phone)}</span>')  # noqa: E501
+    if website:
+        contact_lines.append(f'<span class="contact-line"><span class="icon">&#127760;</span> {html.escape(website)}</span>')  # noqa: E501
+    elif address:
+        contact_lines.append(f'<span class="contact-line"><span class="icon">&#127760;</span> www.restaurant.com</span>')  # noqa: E501,F541
+    if email:
+        contact_lines.append(f'<span class="contact-line"><span class="icon">&#9993;</span> {html.escape(email)}</span>')  # noqa: E501
+    if address:
+        contact_lines.append(f'<span class="contact-line"><span class="icon">&#128205;</span> {html.escape(address)}</span>')  # noqa: E501
+    contact_html = "".join(contact_lines) if contact_lines else "<span class=\"contact-line\">—</span>"  # noqa: E501
+
+    customer_name_val = (getattr(invoice, "customer_name", "") or "").strip()
+    customer_display = html.escape(customer_name_val) if customer_name_val else f"Table {html.escape(str(order.table_no or ''))}"  # noqa: E501
+    customer_address = ""
+
+    return f"""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>Invoice {html.escape(invoice.invoice_number or "")}</title>
+  <link href="https://fonts.googleapis.com/css2?family=Dancing+Script:wght@500&display=swap" rel="stylesheet">
+  <style>
+    * {{ box-sizing: border-box; }}
+    body {{ font-family: 'Segoe UI', system-ui, sans-serif; margin: 0; padding: 2rem; background: #f5f0e8; color: #3d2f24; }}
+    .invoice {{ max-width: 800px; margin: 0 auto; background: #fdfbf7; padding: 2.5rem; border-radius: 8px; box-shadow: 0 2px 16px rgba(61,47,36,0.06); position: relative; }}
+    .leaf-top {{ position: absolute; top: 1rem; left: 1rem; color: #6b5344; font-size: 1.8rem; opacity: 0.7; }}
+    .leaf-bottom {{ position: absolute; bottom: 1rem; right: 1rem; color: #6b5344; font-size: 1.8rem; opacity: 0.7; }}
+    .header-top {{ display: flex; justify-content: center; align-items: center; gap: 0.75rem; margin-bottom: 1.5rem; }}
+    .logo-img {{ width: 56px; height: 56px; object-fit: contain; border-radius: 50%; }}
+    .logo-placeholder {{ width: 56px; height: 56px; border: 2px solid #6b5344; border-radius: 50%; display: flex; align-items: center; justify-content: center; font-size: 1.2rem; color: #6b5344; }}
+    .logo-text {{ font-weight: 700; font-size: 1.25rem; color: #3d2f24; letter-spacing: 0.02em; }}
+    .header-row {{ display: flex; justify-content: space-between; align-items: flex-start; flex-wrap: wrap; gap: 1rem; margin-bottom: 0.5rem; }}
+    .bill-to {{ font-size: 0.75rem; color: #6b5344; text-transform: uppercase; letter-spacing: 0.08em; margin-bottom: 0.2rem; }}
+    .customer-name {{ font-size: 1.1rem; font-weight: 700; color: #3d2f24; }}
+    .customer-addr {{ font-size: 0.9rem; color: #5c4a3a; }}
+    .inv-meta {{ text-align: right; font-size: 0.9rem; color: #3d2f24; }}
+    .inv-meta p {{ margin: 0.2rem 0; }}
+    h1.invoice-title {{ text-align: center; font-size: 1.6rem; margin: 1.25rem 0; color: #3d2f24; font-weight: 700; letter-spacing: 0.02em; }}
+    table {{ width: 100%; border-collapse: collapse; margin: 1rem 0; }}
+    th {{ text-align: left; padding: 0.5rem 0.4rem; border-bottom: 1px solid #d4cdc4; font-size: 0.8rem; color: #3d2f24; font-weight: 600; text-transform: uppercase; letter-spacing: 0.03em; }}
+    td {{ padding: 0.5rem 0.4rem; border-bottom: 1px solid #e8e2d9; font-size: 0.9rem; color: #3d2f24; }}
+    .summary-wrap {{ margin-top: 1.5rem; display: flex; justify-content: flex-end; }}
+    .summary {{ width: 280px; border-collapse: collapse; font-size: 0.9rem; color: #3d2f24; }}
+    .summary tr {{ border-bottom: 1px solid #e8e2d9; }}
+    .summary td {{ padding: 0.35rem 0; border: none; }}
+    .summary td:first-child {{ padding-right: 1.5rem; }}
+    .summary td:last-child {{ text-align: right; }}
+    .summary .total-row {{ font-weight: 700; font-size: 1rem; border-bottom: none; padding-top: 0.4rem; }}
+    .footer {{ margin-top: 2rem; padding-top: 1.25rem; border-top: 1px solid #e8e2d9; }}
+    .thanks {{ font-family: 'Dancing Script', cursive; font-size: 1.15rem; color: #6b5344; margin-bottom: 0.75rem; }}
+    .contact {{ font-size: 0.85rem; color: #5c4a3a; }}
+    .contact-line {{ display: block; margin: 0.2rem 0; }}
+    .icon {{ margin-right: 0.35rem; color: #6b5344; }}
+    @media print {{ body {{ background: #fff; }} .invoice {{ box-shadow: none; }} }}
+  </style>
+</head>
+<body>
+  <div class="invoice">
+    <span class="leaf-top">&#10047;</span>
+    <div class="header-top">
+      {logo_html}
+      <span class="logo-text">{html.escape(restaurant_display_name)}</span>
+    </div>
+    <div class="header-row">
+      <div>
+        <div class="bill-to">INVOICE TO:</div>
+        <div class="customer-name">{html.escape(customer_display)}</div>
+        <div class="customer-addr">{html.escape(customer_address) or "—"}</div>
+      </div>
+      <div class="inv-meta">
+        <p><strong>INVOICE NO:</strong> {html.escape(invoice.invoice_number or "")}</p>
+        <p><strong>DATE:</strong> {date_str}</p>
+      </div>
+    </div>
+    <h1 class="invoice-title">INVOICE</h1>
+    <table>
+      <thead>
+        <tr>
+          <th>SL NO</th>
+          <th>ITEM DESCRIPTION</th>
+          <th>QUANTITY</th>
+          <th>PRICE</th>
+        </tr>
+      </thead>
+      <tbody>
+        {rows_html}
+      </tbody>
+    </table>
+    <table class="summary">
+      <tr><td>SUB TOTAL</td><td>₹{subtotal:.2f}</td></tr>
+      <tr><td>GST ({gst_percent}%)</td><td>₹{gst_amount:.2f}</td></tr>
+      <tr><td>DISCOUNT ({discount_percent}%)</td><td>-₹{discount_amount:.2f}</td></tr>
+      <tr class="total-row"><td>TOTAL</td><td>₹{total_computed:.2f}</td></tr>
+    </table>
+    <div class="footer">
+      <div class="thanks">Thank you for your recent order!</div>
+      <div class="contact">
+        {contact_html}
+      </div>
+    </div>
+    <span class="leaf-bottom">&#10047;</span>
+  </div>
+</body>
+</html>"""  # noqa: E501
+# fmt: on
+
+
+def _sample(items: int):
+    invoice = SimpleNamespace(
+        invoice_number="INV-2026-27-000123",
+        invoice_date=datetime(2026, 10, 17),
+        total_amount=0,
+        gst_percent=5.0,
+        discount_percent=0.0,
+        customer_name="",
+    )
+    restaurant = SimpleNamespace(
+        upi_merchant_name="Cafe & Co",
+        logo_url="",
+        restaurant_address="1 Main St",
+        restaurant_phone="98765 43210",
+        restaurant_email="hello@example.com",
+        website="",
+    )
+    order = SimpleNamespace(table_no=4)
+    line_items = [
+        {
+            "description": f"Dish {n} <special>",
+            "quantity": n % 3 + 1,
+            "price": 120.0 + n,
+        }
+        for n in range(items)
+    ]
+    return invoice, restaurant, order, line_items
+
+
+def _us_per_render(fn, args, number: int) -> float:
+    return min(timeit.repeat(lambda: fn(*args), number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1, 12, 50])
+    parser.add_argument("--number", type=int, default=5_000)
+    args = parser.parse_args()
+
+    stylesheet = static_assets[asset_urls["invoice.css"].rsplit("/", 1)[1]].body
+    results = []
+    for items in args.items:
+        sample = _sample(items)
+        old_bytes = len(_inline_css_page(*sample).encode())
+        new_bytes = len(_invoice_page_html(*sample).encode())
+        results.append(
+            (
+                items,
+                f"{_us_per_render(_inline_css_page, sample, args.number):.1f}",
+                f"{_us_per_render(_invoice_page_html, sample, args.number):.1f}",
+                old_bytes,
+                new_bytes,
+            )
+        )
+
+    print(
+        f"best of 5 x {args.number} renders; the stylesheet is {len(stylesheet)} bytes,"
+    )
+    print("fetched once per client and then served from its cache")
+    print_table(
+        ("items", "inline us", "template us", "inline bytes", "template bytes"), results
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Memory and time to walk every invoice: Query.all() vs CRUDBase.iter_all (entities) vs
+iter_filtered with columns (plain rows).
+
+    ENV_FILE=tests/.test-env python -m scripts.bench_iter_all --rows 1000000
+
+Each mode runs in its own process and reports its peak RSS growth, which includes the
+result buffered by libpq; tracemalloc would only see Python objects.
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import time
+
+# must come first: it points the app's engines at BENCH_DB
+from scripts.bench_utils import bench_database, print_table
+
+# isort: split
+from sqlalchemy import text
+
+from src.user.models import Invoice
+from utils.crud.base import CRUDBase
+from utils.db.session import SessionLocal
+
+crud = CRUDBase(Invoice)
+
+MODES = {
+    "all": lambda db: db.query(Invoice).all(),
+    "iter_all": lambda db: crud.iter_all(db),
+    "iter_filtered(columns)": lambda db: crud.iter_filtered(
+        db, columns=["order_id", "order_ids"]
+    ),
+}
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_mode(mode: str):
+    with SessionLocal() as db:
+        db.execute(text("SELECT 1"))
+        before = _peak_rss_mib()
+        start = time.perf_counter()
+        seen = sum(1 for _ in MODES[mode](db))
+        elapsed = time.perf_counter() - start
+    print(f"{seen}\t{elapsed:.2f}\t{_peak_rss_mib() - before:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        _run_mode(args.mode)
+        return
+
+    with bench_database() as engine:
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO "order" (id, item_list, quantity, status, table_no,
+                                         created_at, updated_at, is_deleted)
+                    VALUES (gen_random_uuid(), '[]', 1, 'PENDING', 1, now(), now(), false)
+                    """
+                )
+            )
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO invoice (id, order_id, order_ids, invoice_number,
+                                         invoice_date, total_amount, gst_percent,
+                                         discount_percent, payment_status, notes,
+                                         customer_name, created_at, updated_at, is_deleted)
+                    SELECT gen_random_uuid(), o.id, '["' || o.id || '"]', 'INV-' || g,
+                           now(), 250.0, 5.0, 0.0, 'PENDING', 'Table service',
+                           'Guest ' || g, now(), now(), false
+                    FROM generate_series(1, :rows) AS g, "order" AS o
+                    """
+                ),
+                {"rows": args.rows},
+            )
+            conn.execute(text("ANALYZE invoice"))
+
+        results = []
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, "-m", "scripts.bench_iter_all", "--mode", mode],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            seen, seconds, rss = out.strip().splitlines()[-1].split("\t")
+            results.append((mode, seen, seconds, rss))
+
+    print(f"{args.rows} invoices")
+    print_table(("mode", "rows", "seconds", "peak RSS MiB"), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Entity vs column-projected list reads (CRUDBase.get_multi vs get_multi_rows), as get_stocks
+serves them: fetch a page and build the Stock response models.
+
+    ENV_FILE=tests/.test-env python -m scripts.bench_list_reads --rows 50000
+"""
+import argparse
+import tracemalloc
+
+# must come first: it points the app's engines at BENCH_DB
+from scripts.bench_utils import bench_database, measure, print_table
+
+# isort: split
+from sqlalchemy import text
+
+from src.user.api import STOCK_LIST_COLUMNS
+from src.user.models import Stock as StockModel
+from src.user.schemas import Stock
+from utils.crud.base import CRUDBase
+from utils.db.session import SessionLocal
+
+crud = CRUDBase(StockModel)
+
+
+def _entity_page(per_page: int):
+    with SessionLocal() as db:
+        return [
+            Stock(
+                id=s.id,
+                name=s.name,
+                quantity=s.quantity,
+                unit_of_measure=s.unit_of_measure,
+                cost_per_unit=s.cost_per_unit,
+            )
+            for s in crud.get_multi(db, per_page=per_page)
+        ]
+
+
+def _row_page(per_page: int):
+    with SessionLocal() as db:
+        return [
+            Stock(
+                id=s.id,
+                name=s.name,
+                quantity=s.quantity,
+                unit_of_measure=s.unit_of_measure,
+                cost_per_unit=s.cost_per_unit,
+            )
+            for s in crud.get_multi_rows(
+                db, columns=STOCK_LIST_COLUMNS, per_page=per_page
+            )
+        ]
+
+
+def _peak_kib(fn) -> float:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with bench_database() as engine:
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO stock (id, name, quantity, unit_of_measure,
+                                       cost_per_unit, created_at, updated_at, is_deleted)
+                    SELECT gen_random_uuid(), 'Ingredient ' || g, g % 500, 'kg',
+                           (g % 90) + 0.5, now() - (g * interval '1 second'), now(), false
+                    FROM generate_series(1, :rows) AS g
+                    """
+                ),
+                {"rows": args.rows},
+            )
+            conn.execute(text("ANALYZE stock"))
+
+        results = []
+        for per_page in (50, 500, 5000):
+            entity_ms = measure(lambda: _entity_page(per_page))
+            row_ms = measure(lambda: _row_page(per_page))
+            results.append(
+                (
+                    per_page,
+                    f"{entity_ms:.2f}",
+                    f"{row_ms:.2f}",
+                    f"{_peak_kib(lambda: _entity_page(per_page)):.0f}",
+                    f"{_peak_kib(lambda: _row_page(per_page)):.0f}",
+                )
+            )
+
+    print(f"{args.rows} stock rows; median ms per page and peak KiB allocated")
+    print_table(("per_page", "entity ms", "rows ms", "entity KiB", "rows KiB"), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Kitchen screens polling GET /api/get_active_orders vs subscribed to GET /api/orders/stream
+(SSE): how long a new order takes to reach every screen, and what the screens cost the
+server in CPU, memory and database connections.
+
+    ENV_FILE=tests/.test-env python -m scripts.bench_order_stream --clients 500 --seconds 30
+
+The app runs under uvicorn in a child process, fresh for each mode, so its CPU time and
+RSS (read from /proc, Linux only) are its own. --clients screens connect, then one order a
+second is created through POST /api/create_order for --seconds. Delivery latency runs from
+the start of that POST until a screen has the order: for polling, the poll that first
+returns it; for SSE, the event. DB connections is the most the app had open to the bench
+database at once, sampled every 100 ms; with EVENTS_PG_NOTIFY that includes the hub's
+LISTEN connection.
+
+Screens share one process and event loop, so on a small machine their own scheduling
+adds to the latency of both modes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# must come first: it points the app's engines at BENCH_DB
+from scripts.bench_utils import bench_database, print_table, seed_orders
+
+# isort: split
+import httpx
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+ORDER = {
+    "item_list": json.dumps([{"name": "Dish 1", "qty": 2, "price": 120.0}]),
+    "quantity": 2,
+    "table_no": "7",
+}
+STREAM_REQUEST = (
+    b"GET /api/orders/stream HTTP/1.1\r\n"
+    b"Host: bench\r\nAccept: text/event-stream\r\n\r\n"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime, fields 14 and 15 of proc(5)
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def _rss_mib(pid: int) -> float:
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE / 2**20
+
+
+def _start_server(port: int) -> subprocess.Popen:
+    # the child inherits POSTGRES_DB from bench_utils, so it serves the bench database;
+    # the test env's DEBUG logging would be counted as server CPU
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.main:create_app",
+            "--factory",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--timeout-keep-alive",
+            "300",
+        ],
+        env={**os.environ, "LOG_LEVEL": "WARNING"},
+    )
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            url = f"http://127.0.0.1:{port}/api/get_active_orders"
+            httpx.get(url).raise_for_status()
+            return server
+        except httpx.TransportError:
+            if time.monotonic() > deadline or server.poll() is not None:
+                server.kill()
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.2)
+
+
+async def _sse_screen(port: int, seen: Dict[str, float], subscribed: asyncio.Queue):
+    """Hold one stream open, recording when each order id first arrives."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(STREAM_REQUEST)
+    try:
+        while line := await reader.readline():
+            # each event is a single chunk, so its data line is never split
+            if line.startswith(b"data: "):
+                order_id = json.loads(line[6:])["order"]["order_id"]
+                seen.setdefault(order_id, time.perf_counter())
+            elif line.startswith(b"retry:"):
+                subscribed.put_nowait(None)
+    finally:
+        writer.close()
+
+
+async def _poll_screen(
+    client: httpx.AsyncClient, base: str, seen: Dict[str, float], interval: float
+):
+    """Poll the kitchen view every interval seconds, recording when each id first shows."""
+    # screens are switched on at different times, so their polls are spread out
+    await asyncio.sleep(random.uniform(0, interval))
+    while True:
+        response = await client.get(f"{base}/api/get_active_orders")
+        now = time.perf_counter()
+        for order in response.json():
+            seen.setdefault(order["order_id"], now)
+        await asyncio.sleep(interval)
+
+
+def _db_connections(engine: Engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(
+            text(
+                "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()"
+                " AND backend_type = 'client backend' AND pid <> pg_backend_pid()"
+            )
+        ).scalar()
+
+
+async def _measure(mode: str, engine: Engine, args) -> List[str]:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    server = _start_server(port)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    client = httpx.AsyncClient(limits=limits, timeout=120)
+    seen: List[Dict[str, float]] = [{} for _ in range(args.clients)]
+    try:
+        rss_before = _rss_mib(server.pid)
+        if mode == "sse":
+            subscribed: asyncio.Queue = asyncio.Queue()
+            screens = [
+                asyncio.create_task(_sse_screen(port, s, subscribed)) for s in seen
+            ]
+            for _ in seen:
+                await asyncio.wait_for(subscribed.get(), timeout=60)
+        else:
+            screens = [
+                asyncio.create_task(_poll_screen(client, base, s, args.poll_interval))
+                for s in seen
+            ]
+            await asyncio.sleep(args.poll_interval)
+
+        peak_connections = 0
+
+        async def sample_connections():
+            nonlocal peak_connections
+            while True:
+                count = await asyncio.to_thread(_db_connections, engine)
+                peak_connections = max(peak_connections, count)
+                await asyncio.sleep(0.1)
+
+        sampler = asyncio.create_task(sample_connections())
+        cpu_start, start = _cpu_seconds(server.pid), time.perf_counter()
+        created: Dict[str, float] = {}
+        for n in range(args.seconds):
+            await asyncio.sleep(max(0.0, start + n - time.perf_counter()))
+            posted = time.perf_counter()
+            response = await client.post(f"{base}/api/create_order", json=ORDER)
+            assert response.status_code == 201, response.text
+            created[response.json()["order_id"]] = posted
+        # long enough for the last order to reach every screen
+        await asyncio.sleep(args.poll_interval + 1 if mode == "poll" else 1)
+        cpu = (_cpu_seconds(server.pid) - cpu_start) / (time.perf_counter() - start)
+        rss_after = _rss_mib(server.pid)
+        sampler.cancel()
+        for screen in screens:
+            screen.cancel()
+        await asyncio.gather(sampler, *screens, return_exceptions=True)
+    finally:
+        await client.aclose()
+        server.terminate()
+        server.wait()
+
+    latencies = [
+        (s[order_id] - posted) * 1000
+        for s in seen
+        for order_id, posted in created.items()
+        if order_id in s
+    ]
+    missed = len(seen) * len(created) - len(latencies)
+    q = statistics.quantiles(latencies, n=100, method="inclusive")
+    return [
+        mode,
+        f"{statistics.median(latencies):.0f}",
+        f"{q[98]:.0f}",
+        str(missed),
+        f"{cpu:.0%}",
+        f"{rss_after - rss_before:.1f}",
+        str(peak_connections),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--seconds", type=int, default=30)
+    parser.add_argument(
+        "--poll-interval", type=float, default=5.0, help="seconds between polls"
+    )
+    args = parser.parse_args()
+
+    results = []
+    with bench_database() as engine:
+        with engine.begin() as conn:
+            # an open kitchen: what each poll of get_active_orders returns
+            seed_orders(conn, 30)
+        for mode in ("poll", "sse"):
+            results.append(asyncio.run(_measure(mode, engine, args)))
+
+    print(
+        f"{args.clients} screens, one new order a second for {args.seconds} s, "
+        f"polling every {args.poll_interval:g} s; latency from POST to screen"
+    )
+    print_table(
+        (
+            "mode",
+            "p50 ms",
+            "p99 ms",
+            "missed",
+            "server CPU",
+            "server RSS +MiB",
+            "DB connections",
+        ),
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+OFFSET vs keyset pagination over the order table (CRUDBase.get_multi vs get_multi_keyset).
+
+    ENV_FILE=tests/.test-env python -m scripts.bench_pagination --rows 200000
+"""
+import argparse
+
+# must come first: it points the app's engines at BENCH_DB
+from scripts.bench_utils import bench_database, measure, print_table, seed_orders
+
+# isort: split
+from src.user.models import Order
+from utils.crud.base import CRUDBase
+from utils.db.session import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--per-page", type=int, default=50)
+    args = parser.parse_args()
+
+    crud = CRUDBase(Order)
+    per_page = args.per_page
+    last_page = args.rows // per_page
+    pages = sorted(
+        p for p in {1, 10, 100, 1000, 10_000, last_page} if 0 < p <= last_page
+    )
+
+    with bench_database() as engine:
+        with engine.begin() as conn:
+            seed_orders(conn, args.rows)
+
+        def fetch(method, **kwargs):
+            # a fresh session per call, like a request, so the identity map stays empty
+            with SessionLocal() as db:
+                return method(db, per_page=per_page, **kwargs)
+
+        results = []
+        for page in pages:
+            # the cursor a client would hold when asking for this page
+            cursor = None
+            if page > 1:
+                anchor = fetch(crud.get_multi, page=page - 1)[-1]
+                cursor = crud.encode_cursor(anchor)
+            offset_ms = measure(lambda: fetch(crud.get_multi, page=page))
+            keyset_ms = measure(lambda: fetch(crud.get_multi_keyset, cursor=cursor))
+            results.append(
+                (
+                    page,
+                    f"{offset_ms:.2f}",
+                    f"{keyset_ms:.2f}",
+                    f"{offset_ms / keyset_ms:.1f}x",
+                )
+            )
+
+    print(f"{args.rows} orders, per_page={per_page}, median ms per page")
+    print_table(("page", "offset", "keyset", "speedup"), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Unit of work (commit=False on each CRUDBase write, one commit at the end) vs the old
+commit-per-call style, for a create_payment-shaped flow: insert a payment, insert its
+QR code, and move the order to PREPARING, all on one AsyncSession.
+
+    ENV_FILE=tests/.test-env python -m scripts.bench_unit_of_work --flows 500 --concurrency 1 10
+
+Each commit is a round trip plus a WAL flush, so per-call commits cost two extra of each
+per flow. The table shows flow latency and throughput with --concurrency flows in flight.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+# must come first: it points the app's engines at BENCH_DB
+from scripts.bench_utils import (
+    bench_database,
+    count_statements,
+    print_table,
+    seed_orders,
+)
+
+# isort: split
+from sqlalchemy import event, text
+
+from src.user.api import order_crud, payment_crud, qr_code_crud
+from src.user.models import OrderState, PaymentStatus
+from utils.db.session import AsyncSessionLocal, async_engine
+
+UPI_URI = "upi://pay?pa=bench@upi&pn=Bench&am=240.00&cu=INR"
+
+
+async def _flow(order_id: str, commit: bool):
+    async with AsyncSessionLocal() as db:
+        order = await order_crud.get_async(db, id=order_id)
+        payment = await payment_crud.create_async(
+            db,
+            obj_in={
+                "order_id": order_id,
+                "amount": 240.0,
+                "status": PaymentStatus.PENDING,
+                "retry_count": 0,
+            },
+            commit=commit,
+        )
+        await qr_code_crud.create_async(
+            db,
+            obj_in={
+                "payment_id": str(payment.id),
+                "qr_data": UPI_URI,
+                "is_active": True,
+            },
+            commit=commit,
+        )
+        await order_crud.update_async(
+            db, db_obj=order, obj_in={"status": OrderState.PREPARING}, commit=commit
+        )
+        if not commit:
+            await db.commit()
+
+
+async def _run(order_ids, commit: bool, concurrency: int):
+    """Run one flow per order id, concurrency at a time. Returns flows/s and latencies in ms."""
+    latencies = []
+    remaining = iter(order_ids)
+
+    async def worker():
+        for order_id in remaining:
+            start = time.perf_counter()
+            await _flow(order_id, commit)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    # a fresh pool's first connect initializes the dialect under a thread lock; let it
+    # finish before the workers connect concurrently
+    async with async_engine.connect():
+        pass
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    # the pool's connections belong to this run's event loop
+    await async_engine.dispose()
+    return len(order_ids) / elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--flows", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10])
+    args = parser.parse_args()
+
+    results = []
+    with bench_database() as engine:
+        # every flow pays a fresh order: the payment index allows one live payment each
+        runs = 2 * (len(args.concurrency) + 1)
+        with engine.begin() as conn:
+            seed_orders(conn, args.flows * runs)
+            order_ids = [str(i) for i in conn.scalars(text('SELECT id FROM "order"'))]
+        batches = iter(order_ids[n::runs] for n in range(runs))
+
+        per_flow = {}
+        for commit in (True, False):
+            commits = []
+            listener = lambda conn: commits.append(conn)
+            event.listen(async_engine.sync_engine, "commit", listener)
+            with count_statements(async_engine.sync_engine) as executed:
+                asyncio.run(_run(next(batches)[:1], commit, 1))
+            event.remove(async_engine.sync_engine, "commit", listener)
+            per_flow[commit] = f"{len(executed)} statements, {len(commits)} x COMMIT"
+
+        for concurrency in args.concurrency:
+            row = [concurrency]
+            for commit in (True, False):
+                rate, latencies = asyncio.run(_run(next(batches), commit, concurrency))
+                q = statistics.quantiles(latencies, n=100, method="inclusive")
+                row += [f"{statistics.median(latencies):.2f}", f"{q[98]:.2f}"]
+                row.append(f"{rate:.0f}")
+            results.append(row)
+
+    print(
+        f"{args.flows} flows per cell; per flow: per-call commits {per_flow[True]}, "
+        f"unit of work {per_flow[False]}"
+    )
+    print_table(
+        (
+            "concurrency",
+            "per-call p50 ms",
+            "p99 ms",
+            "flows/s",
+            "uow p50 ms",
+            "p99 ms",
+            "flows/s",
+        ),
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Shared setup for the scripts/bench_*.py micro-benchmarks.
+
+Import this module before anything from src or utils: like tests/conftest.py it loads
+the env file first (ENV_FILE, default tests/.test-env), then points POSTGRES_DB at a
+throwaway database (BENCH_DB, default bench_db) so the app's engines bind to it.
+
+    ENV_FILE=tests/.test-env python -m scripts.bench_pagination --rows 200000
+
+Numbers are wall-clock medians on whatever server the env file names; compare runs on
+the same machine only.
+"""
+import logging
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Sequence
+
+from dotenv import load_dotenv
+
+load_dotenv(os.getenv("ENV_FILE", "./tests/.test-env"))
+os.environ["POSTGRES_DB"] = os.getenv("BENCH_DB", "bench_db")
+
+import psycopg2  # noqa: E402
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+from sqlalchemy.engine import Connection, Engine  # noqa: E402
+
+# seeding statements would otherwise all be reported as slow queries
+logging.getLogger("utils.db.query_stats").setLevel(logging.ERROR)
+
+
+def _admin_connection():
+    con = psycopg2.connect(
+        host=os.environ["POSTGRES_SERVER"],
+        port=os.environ["POSTGRES_PORT"],
+        user=os.environ["POSTGRES_USER"],
+        password=os.environ["POSTGRES_PASSWORD"],
+        dbname="postgres",
+    )
+    con.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    return con
+
+
+@contextmanager
+def bench_database() -> Iterator[Engine]:
+    """Create BENCH_DB with every model table, yield the app's sync engine, drop it after."""
+    name = os.environ["POSTGRES_DB"]
+    con = _admin_connection()
+    con.cursor().execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+    con.cursor().execute(f"CREATE DATABASE {name}")
+
+    from src.user import models  # noqa: F401  registers every table on ModelBase
+    from utils.db.base import ModelBase
+    from utils.db.session import async_engine, engine
+
+    ModelBase.metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        async_engine.sync_engine.dispose()
+        con.cursor().execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+        con.close()
+
+
+def seed_orders(
+    conn: Connection, rows: int, deleted_fraction: float = 0.0, tables: int = 40
+):
+    """rows orders over tables tables, one second apart, with a frontend-style item_list."""
+    conn.execute(
+        text(
+            """
+            INSERT INTO "order" (id, item_list, quantity, status, order_pending,
+                                 order_done, order_cancel, table_no, created_at,
+                                 updated_at, is_deleted)
+            SELECT gen_random_uuid(),
+                   '[{"name": "Dish ' || g % 50 || '", "qty": 2, "price": 120.0}]',
+                   2, 'PENDING', 'true', 'false', 'false', g % :tables + 1,
+                   now() - (g * interval '1 second'), now(),
+                   random() < :deleted
+            FROM generate_series(1, :rows) AS g
+            """
+        ),
+        {"rows": rows, "deleted": deleted_fraction, "tables": tables},
+    )
+    conn.execute(text('ANALYZE "order"'))
+
+
+def measure(fn: Callable[[], object], repeat: int = 7) -> float:
+    """Median milliseconds of repeat calls, after one warm-up call."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+@contextmanager
+def count_statements(engine: Engine) -> Iterator[List[str]]:
+    """Collect the SQL of every statement engine executes inside the block."""
+    statements: List[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+def print_table(headers: Sequence[str], rows: Sequence[Sequence[object]]):
+    cells = [list(map(str, headers))] + [[str(c) for c in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for n, row in enumerate(cells):
+        print("  ".join(c.rjust(w) for c, w in zip(row, widths)))
+        if n == 0:
+            print("  ".join("-" * w for w in widths))
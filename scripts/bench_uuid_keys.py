@@ -0,0 +1,97 @@
+"""
+Primary key layouts for ModelBase.id: random UUIDv4 strings in a varchar column (the old
+layout), UUIDv4 in a native uuid column, and time-ordered UUIDv7 in a native uuid column
+(the current one). Insert throughput, WAL written, and index size for each.
+
+    ENV_FILE=tests/.test-env python -m scripts.bench_uuid_keys --rows 1000000
+
+Rows go in batches of --batch, one transaction each, the way orders arrive. Like
+ModelBase.id, each key column is both the primary key and UNIQUE, so every table carries
+two indexes on it. Random keys land on arbitrary leaf pages of those indexes: every page
+touched after a checkpoint is written to the WAL in full, and once the indexes outgrow
+shared_buffers inserts start to wait on reads, so the gap widens with --rows.
+"""
+import argparse
+import time
+import uuid
+
+# must come first: it points the app's engines at BENCH_DB
+from scripts.bench_utils import bench_database, print_table
+
+# isort: split
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from utils.db.base import uuid7
+
+LAYOUTS = (
+    ("varchar uuid4", String, lambda: str(uuid.uuid4())),
+    ("uuid uuid4", UUID(as_uuid=True), uuid.uuid4),
+    ("uuid uuid7", UUID(as_uuid=True), uuid7),
+)
+
+
+def _table(metadata: MetaData, n: int, key_type) -> Table:
+    return Table(
+        f"bench_key_{n}",
+        metadata,
+        Column("id", key_type, primary_key=True, unique=True, nullable=False),
+        Column("created_at", DateTime, server_default=func.now()),
+        Column("item_list", String),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    batches = -(-args.rows // args.batch)
+    results = []
+    with bench_database() as engine:
+        metadata = MetaData()
+        tables = [_table(metadata, n, t) for n, (_, t, _) in enumerate(LAYOUTS)]
+        metadata.create_all(engine)
+
+        for (name, _, new_key), table in zip(LAYOUTS, tables):
+            item_list = '[{"name": "Dish 1", "qty": 2, "price": 120.0}]'
+            elapsed = 0.0
+            with engine.connect() as conn:
+                wal_start = conn.execute(text("SELECT pg_current_wal_lsn()")).scalar()
+            for _ in range(batches):
+                batch = [
+                    {"id": new_key(), "item_list": item_list} for _ in range(args.batch)
+                ]
+                start = time.perf_counter()
+                with engine.begin() as conn:
+                    conn.execute(table.insert(), batch)
+                elapsed += time.perf_counter() - start
+
+            with engine.connect() as conn:
+                wal_bytes, index_bytes, table_bytes = conn.execute(
+                    text(
+                        "SELECT pg_current_wal_lsn() - CAST(:lsn AS pg_lsn),"
+                        " pg_indexes_size(to_regclass(:t)),"
+                        " pg_table_size(to_regclass(:t))"
+                    ),
+                    {"lsn": wal_start, "t": table.name},
+                ).one()
+            results.append(
+                (
+                    name,
+                    f"{batches * args.batch / elapsed:,.0f}",
+                    f"{wal_bytes / 2**20:.0f}",
+                    f"{index_bytes / 2**20:.1f}",
+                    f"{table_bytes / 2**20:.1f}",
+                )
+            )
+
+    print(
+        f"{batches * args.batch} rows in batches of {args.batch}, one transaction per batch"
+    )
+    print_table(("key", "rows/s", "WAL MiB", "index MiB", "table MiB"), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -40,13 +40,107 @@ class Config:
     JWT_SECRET_KEY: str = os.environ.get("JWT_SECRET_KEY", "")
     JWT_EXPIRATION_TIME: str = os.environ.get("JWT_EXPIRATION_TIME", "86400")
 
+    # Database connection pool (per worker process). DB_USE_NULL_POOL disables pooling
+    # entirely, which is what PgBouncer in transaction-pooling mode expects.
+    DB_POOL_SIZE: int = int(os.environ.get("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: int = int(os.environ.get("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = (
+        os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+    )
+    DB_POOL_USE_LIFO: bool = (
+        os.environ.get("DB_POOL_USE_LIFO", "true").lower() == "true"
+    )
+    DB_USE_NULL_POOL: bool = (
+        os.environ.get("DB_USE_NULL_POOL", "false").lower() == "true"
+    )
+    # checkouts that wait longer than this are logged as slow
+    DB_POOL_SLOW_WAIT_MS: int = int(os.environ.get("DB_POOL_SLOW_WAIT_MS", "100"))
+
+    # Query statistics: per-fingerprint counts/latency, slow-query log and sampled
+    # EXPLAIN capture for slow SELECTs (with ANALYZE only when a re-run has no side
+    # effects, and only on the psycopg2 engines)
+    QUERY_STATS_ENABLED: bool = (
+        os.environ.get("QUERY_STATS_ENABLED", "true").lower() == "true"
+    )
+    SLOW_QUERY_MS: int = int(os.environ.get("SLOW_QUERY_MS", "200"))
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = float(
+        os.environ.get("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0.05")
+    )
+    # With QUERY_STATS_ENABLED: warn when one request issues more statements than this
+    # (0 disables); in DEV the count is also returned in the X-DB-Query-Count header
+    DB_QUERY_BUDGET: int = int(os.environ.get("DB_QUERY_BUDGET", "0"))
+
+    # List endpoints called with with_total=true report X-Total-Count; tables with at least
+    # this many rows (per pg_class.reltuples) report the planner estimate instead of COUNT(*)
+    COUNT_ESTIMATE_THRESHOLD: int = int(
+        os.environ.get("COUNT_ESTIMATE_THRESHOLD", "100000")
+    )
+
+    # Optional read replica (full postgresql:// URL). GET endpoints read from it when set;
+    # a client that wrote within DB_READ_YOUR_WRITES_SECONDS keeps reading from the primary.
+    POSTGRES_REPLICA_URL: str = os.environ.get("POSTGRES_REPLICA_URL", "")
+    DB_READ_YOUR_WRITES_SECONDS: int = int(
+        os.environ.get("DB_READ_YOUR_WRITES_SECONDS", "5")
+    )
+
+    # Real-time events (GET /api/orders/stream). With EVENTS_PG_NOTIFY each worker also
+    # LISTENs on EVENTS_PG_CHANNEL so events published by one worker reach all of them.
+    EVENTS_PG_NOTIFY: bool = (
+        os.environ.get("EVENTS_PG_NOTIFY", "true").lower() == "true"
+    )
+    EVENTS_PG_CHANNEL: str = os.environ.get("EVENTS_PG_CHANNEL", "app_events")
+    EVENTS_SUBSCRIBER_QUEUE_SIZE: int = int(
+        os.environ.get("EVENTS_SUBSCRIBER_QUEUE_SIZE", "100")
+    )
+    EVENTS_HEARTBEAT_SECONDS: int = int(
+        os.environ.get("EVENTS_HEARTBEAT_SECONDS", "15")
+    )
+
+    # Idempotency-Key on create_order / create_invoice_for_table / create_payment: stored
+    # responses are replayed for IDEMPOTENCY_TTL_SECONDS, the newest IDEMPOTENCY_CACHE_SIZE
+    # from memory; expired keys are purged every IDEMPOTENCY_PURGE_INTERVAL_SECONDS
+    IDEMPOTENCY_TTL_SECONDS: int = int(
+        os.environ.get("IDEMPOTENCY_TTL_SECONDS", "86400")
+    )
+    IDEMPOTENCY_CACHE_SIZE: int = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", "10000"))
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = int(
+        os.environ.get("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "600")
+    )
+
+    # Invoice numbers allocated when the client sends none: PREFIX-FY-000123, the serial
+    # restarting each financial year. Numbers come from a per-year counter row, reserved in
+    # blocks of INVOICE_NUMBER_BLOCK_SIZE per worker (unique, may have gaps), or with
+    # INVOICE_NUMBER_GAPLESS one at a time in the invoice's transaction (no gaps, invoice
+    # creation is serialised)
+    INVOICE_NUMBER_PREFIX: str = os.environ.get("INVOICE_NUMBER_PREFIX", "INV")
+    INVOICE_NUMBER_PADDING: int = int(os.environ.get("INVOICE_NUMBER_PADDING", "6"))
+    INVOICE_NUMBER_FINANCIAL_YEAR: bool = (
+        os.environ.get("INVOICE_NUMBER_FINANCIAL_YEAR", "true").lower() == "true"
+    )
+    INVOICE_NUMBER_FY_START_MONTH: int = int(
+        os.environ.get("INVOICE_NUMBER_FY_START_MONTH", "4")
+    )
+    INVOICE_NUMBER_BLOCK_SIZE: int = int(
+        os.environ.get("INVOICE_NUMBER_BLOCK_SIZE", "50")
+    )
+    INVOICE_NUMBER_GAPLESS: bool = (
+        os.environ.get("INVOICE_NUMBER_GAPLESS", "false").lower() == "true"
+    )
+
+    # Rendered invoice pages kept in memory per worker, least recently viewed evicted first
+    INVOICE_PAGE_CACHE_BYTES: int = int(
+        os.environ.get("INVOICE_PAGE_CACHE_BYTES", str(16 * 1024 * 1024))
+    )
+
     # UPI / Payment QR – your UPI ID so payments credit to your bank
     # UPI_ID = your UPI ID (e.g. 9876543210@ybl, yourname@paytm, business@okaxis)
 
     @staticmethod
-    def assemble_db_connection():
+    def assemble_db_connection(scheme: str = "postgresql"):
         return PostgresDsn.build(
-            scheme="postgresql",
+            scheme=scheme,
             username=os.environ["POSTGRES_USER"],
             password=os.environ["POSTGRES_PASSWORD"],
             port=int(os.environ["POSTGRES_PORT"]),
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 import traceback
@@ -8,6 +9,13 @@ from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from src.config import Config
+from utils.db.query_stats import (
+    QUERY_COUNT_HEADER,
+    QueryCounter,
+    current_query_counter,
+    current_route,
+    route_label,
+)
 
 format = "%(levelname)s:%(funcName)s:%(message)s"
 logging.basicConfig(level=Config.LOG_LEVEL, format=format)
@@ -39,6 +47,33 @@ def create_app():
 
     app.middleware("http")(catch_exceptions_middleware)
 
+    async def query_route_middleware(request: Request, call_next):
+        # tag SQL issued while serving this request with its route (see utils.db.query_stats)
+        route = route_label(request.method, request.url.path)
+        token = current_route.set(route)
+        counter = QueryCounter()
+        counter_token = current_query_counter.set(counter)
+        try:
+            response = await call_next(request)
+        finally:
+            current_query_counter.reset(counter_token)
+            current_route.reset(token)
+        if Config.DB_QUERY_BUDGET and counter.count > Config.DB_QUERY_BUDGET:
+            logging.warning(
+                "event=db_query_budget_exceeded route=%s queries=%d budget=%d",
+                route,
+                counter.count,
+                Config.DB_QUERY_BUDGET,
+            )
+        if Config.DEPLOYMENT_ENV == "DEV":
+            # lets tests and the browser dev tools assert per-endpoint round trips
+            response.headers[QUERY_COUNT_HEADER] = str(counter.count)
+        return response
+
+    app.middleware("http")(query_route_middleware)
+
+    from src.user.utils.idempotency import IDEMPOTENT_REPLAYED_HEADER, run_purge_loop
+
     # add CORS
     if Config.BACKEND_CORS_ORIGINS:
         app.add_middleware(
@@ -47,13 +82,21 @@ def create_app():
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            expose_headers=[
+                "X-Next-Cursor",
+                "X-Total-Count",
+                "X-Total-Count-Estimated",
+                QUERY_COUNT_HEADER,
+                IDEMPOTENT_REPLAYED_HEADER,
+            ],
         )
 
     # Include API handler router
     from src.api_handler import api_router
-    from src.user.models import Invoice, Stock, Payment, QRCode
+    from src.user.models import Invoice, Payment, QRCode, Stock
     from utils.db.base import ModelBase
     from utils.db.session import engine
+    from utils.pubsub import hub
 
     @app.on_event("startup")
     def _ensure_tables():
@@ -67,6 +110,25 @@ def create_app():
         except Exception as e:
             logging.warning("Could not ensure tables exist: %s", e)
 
+    @app.on_event("startup")
+    async def _start_event_hub():
+        await hub.start()
+
+    @app.on_event("shutdown")
+    async def _stop_event_hub():
+        await hub.stop()
+
+    background_tasks = []
+
+    @app.on_event("startup")
+    async def _start_idempotency_purge():
+        background_tasks.append(asyncio.create_task(run_purge_loop()))
+
+    @app.on_event("shutdown")
+    async def _stop_background_tasks():
+        for task in background_tasks:
+            task.cancel()
+
     # include main router (prefix so frontend can use same base for API and view/print pages)
     app.include_router(api_router, prefix="/api")
 
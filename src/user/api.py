@@ -1,73 +1,119 @@
+import asyncio
 import html
+import io
 import json
 import logging
 import os
 import uuid
-from typing import List
-
-import io
+from typing import Dict, List, Optional
 
 import qrcode
-from fastapi import APIRouter, Body, Depends, File, HTTPException, Request, UploadFile, status
-from fastapi.responses import HTMLResponse, Response
-from src.config import Config
+from fastapi import APIRouter, Body, File, HTTPException, Request, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from sqlalchemy import exists, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import false, true
 
+from src.config import Config
 from src.user.crud import user_crud
-from src.user.models import (
-    User as UserModel,
-    Table as TableModel,
-    Menu as MenuModel,
-    Category as CategoryModel,
-    Order as OrderModel,
-    OrderStatus as OrderStatusModel,
-    Stock as StockModel,
-    Invoice as InvoiceModel,
-    PaymentStatus as PaymentStatusModel,
-    Payment as PaymentModel,
-    QRCode as QRCodeModel,
-    Restaurant as RestaurantModel,
-)
+from src.user.models import ACTIVE_ORDER_STATES
+from src.user.models import Category as CategoryModel
+from src.user.models import Invoice as InvoiceModel
+from src.user.models import InvoiceOrder as InvoiceOrderModel
+from src.user.models import Menu as MenuModel
+from src.user.models import MenuItem as MenuItemModel
+from src.user.models import Order as OrderModel
+from src.user.models import OrderItem as OrderItemModel
+from src.user.models import OrderState
+from src.user.models import OrderStatus as OrderStatusModel
+from src.user.models import Payment as PaymentModel
+from src.user.models import PaymentStatus as PaymentStatusModel
+from src.user.models import QRCode as QRCodeModel
+from src.user.models import Restaurant as RestaurantModel
+from src.user.models import Stock as StockModel
+from src.user.models import Table as TableModel
+from src.user.models import User as UserModel
+from src.user.models import UserRoles
 from src.user.schemas import (
-    LoginRequest,
-    Table,
+    BulkDeleteRequest,
+    BulkDeleteResponse,
+    BulkUpdateResponse,
     Category,
-    Token,
-    UserBase,
-    SignupRequest,
-    UserResponse,
-    UserUpdate,
+    Invoice,
+    InvoiceCreate,
+    InvoiceCreateForTable,
+    InvoiceResponse,
+    InvoiceUpdate,
+    LoginRequest,
     Menu,
     MenuCreate,
+    OrderBatchError,
+    OrderBatchResponse,
+    OrderBulkUpdate,
     OrderCreate,
+    OrderItemCreate,
     OrderResponse,
     OrderStatus,
     OrderStatusResponse,
     OrderStatusUpdate,
     OrderUpdate,
-    StockCreate,
-    Stock,
-    StockUpdate,
-    InvoiceCreate,
-    InvoiceCreateForTable,
-    Invoice,
-    InvoiceUpdate,
-    InvoiceResponse,
-    PaymentStatus,
     PaymentCreate,
     PaymentMarkPaid,
     PaymentResponse,
-    PaymentUpdate,
-    QRCode,
     PaymentReviveResponse,
+    PaymentStatus,
+    PaymentUpdate,
     PaymentWebhook,
+    QRCode,
     Restaurant,
+    SignupRequest,
+    Stock,
+    StockBulkUpdate,
+    StockCreate,
+    StockUpdate,
+    Table,
+    TableBulkUpdate,
+    Token,
+    UserBase,
+    UserResponse,
+    UserUpdate,
+)
+from src.user.utils.deps import (
+    async_authenticated_user,
+    authenticated_user,
+    is_authorized_for,
+)
+from src.user.utils.idempotency import async_idempotency, idempotency
+from src.user.utils.invoice_numbers import invoice_number_allocator
+from src.user.utils.page_cache import (
+    http_date,
+    invoice_page_cache,
+    not_modified,
+    page_etag,
+)
+from src.user.utils.pages import (
+    IMMUTABLE_CACHE_CONTROL,
+    asset_urls,
+    invoice_template,
+    pay_template,
+    static_assets,
 )
-from src.user.utils.deps import authenticated_user
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.sql.expression import false
-from utils.crud.base import CRUDBase
-from utils.db.session import get_db
+from utils.crud.base import CRUDBase, UpsertConflictError
+from utils.db.base import str_uuid
+from utils.db.pool import pool_status
+from utils.db.query_stats import query_stats
+from utils.db.session import (
+    get_async_db,
+    get_async_db_read,
+    get_async_uow,
+    get_db,
+    get_db_read,
+    get_uow,
+)
+from utils.pubsub import MAX_NOTIFY_PAYLOAD, hub
 
 logger = logging.getLogger(__name__)
 
@@ -82,11 +128,18 @@ invoice_router = APIRouter()
 payment_status_router = APIRouter()
 payment_router = APIRouter()
 restaurant_router = APIRouter()
+admin_router = APIRouter()
+static_router = APIRouter()
+
+admin_user = is_authorized_for([UserRoles.ADMIN.value, UserRoles.SUPER_ADMIN.value])
 
 table_crud = CRUDBase[TableModel, Table, Table](TableModel)
 menu_crud = CRUDBase[MenuModel, Menu, Menu](MenuModel)
 category_crud = CRUDBase[CategoryModel, Category, Category](CategoryModel)
 order_crud = CRUDBase[OrderModel, OrderCreate, OrderResponse](OrderModel)
+order_item_crud = CRUDBase[OrderItemModel, OrderItemCreate, OrderItemCreate](
+    OrderItemModel
+)
 order_status_crud = CRUDBase[OrderStatusModel, OrderStatusUpdate, OrderStatusResponse](
     OrderStatusModel
 )
@@ -107,9 +160,103 @@ class RestaurantCRUD(CRUDBase[RestaurantModel, Restaurant, Restaurant]):
             .first()
         )
 
+    async def get_by_merchant_name_async(
+        self, db: AsyncSession, name: str
+    ) -> RestaurantModel:
+        return await db.scalar(
+            select(RestaurantModel)
+            .where(RestaurantModel.upi_merchant_name == name)
+            .limit(1)
+        )
+
 
 restaurant_crud = RestaurantCRUD(RestaurantModel)
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+INVALID_CURSOR_DETAIL = (
+    "Invalid cursor. Use the X-Next-Cursor header from a previous page."
+)
+
+
+def _set_total_count(response: Response, total: int, is_estimate: bool):
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    response.headers[TOTAL_COUNT_ESTIMATED_HEADER] = "true" if is_estimate else "false"
+
+
+def _paginate(
+    crud: CRUDBase,
+    db: Session,
+    response: Response,
+    page: int,
+    per_page: int,
+    cursor: Optional[str],
+    columns: Optional[List[str]] = None,
+    with_total: bool = False,
+):
+    """Keyset page when cursor is given, else page/per_page; the next cursor goes in X-Next-Cursor.
+
+    With columns, only those columns are selected and plain rows are returned. with_total
+    adds X-Total-Count (estimated for very large tables, see Config.COUNT_ESTIMATE_THRESHOLD).
+    """
+    try:
+        if columns:
+            rows = crud.get_multi_rows(
+                db, columns=columns, page=page, per_page=per_page, cursor=cursor
+            )
+            next_cursor = crud.next_cursor(rows, per_page)
+        elif cursor:
+            rows, next_cursor = crud.get_multi_keyset(
+                db, cursor=cursor, per_page=per_page
+            )
+        else:
+            rows = crud.get_multi(db, page=page, per_page=per_page)
+            next_cursor = crud.next_cursor(rows, per_page)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_CURSOR_DETAIL
+        )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if with_total:
+        _set_total_count(
+            response, *crud.count(db, threshold=Config.COUNT_ESTIMATE_THRESHOLD)
+        )
+    return rows
+
+
+async def _paginate_async(
+    crud: CRUDBase,
+    db: AsyncSession,
+    response: Response,
+    page: int,
+    per_page: int,
+    cursor: Optional[str],
+    with_total: bool = False,
+):
+    try:
+        if cursor:
+            rows, next_cursor = await crud.get_multi_keyset_async(
+                db, cursor=cursor, per_page=per_page
+            )
+        else:
+            rows = await crud.get_multi_async(db, page=page, per_page=per_page)
+            next_cursor = crud.next_cursor(rows, per_page)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_CURSOR_DETAIL
+        )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if with_total:
+        _set_total_count(
+            response,
+            *await crud.count_async(db, threshold=Config.COUNT_ESTIMATE_THRESHOLD),
+        )
+    return rows
+
+
 ########################################################
 # Restaurant APIs
 ########################################################
@@ -120,20 +267,34 @@ restaurant_crud = RestaurantCRUD(RestaurantModel)
 )
 def create_restaurant(restaurant_data: Restaurant, db: get_db):
     restaurant_crud.create(db, obj_in=restaurant_data)
+    # every invoice page shows restaurant details
+    invoice_page_cache.clear()
     return restaurant_data
 
 
+RESTAURANT_LIST_COLUMNS = [
+    "upi_merchant_name",
+    "upi_id",
+    "restaurant_address",
+    "restaurant_phone",
+    "restaurant_email",
+    "logo_url",
+]
+
+
 @restaurant_router.get("/get_restaurants", response_model=List[Restaurant])
-def get_restaurants(db: get_db, page: int = 1, per_page: int = 50):
-    rows = restaurant_crud.get_multi(db, page=page, per_page=per_page)
+def get_restaurants(db: get_db_read, page: int = 1, per_page: int = 50):
+    rows = restaurant_crud.get_multi_rows(
+        db, columns=RESTAURANT_LIST_COLUMNS, page=page, per_page=per_page
+    )
     return [
         Restaurant(
             upi_merchant_name=r.upi_merchant_name or "",
             upi_id=r.upi_id or "",
-            restaurant_address=getattr(r, "restaurant_address", None),
-            restaurant_phone=getattr(r, "restaurant_phone", None),
-            restaurant_email=getattr(r, "restaurant_email", None),
-            logo_url=getattr(r, "logo_url", None),
+            restaurant_address=r.restaurant_address,
+            restaurant_phone=r.restaurant_phone,
+            restaurant_email=r.restaurant_email,
+            logo_url=r.logo_url,
         )
         for r in rows
     ]
@@ -184,7 +345,7 @@ def signup(user_req: SignupRequest, db: get_db):
             status_code=status.HTTP_409_CONFLICT,
             detail="User with this email already exists",
         )
-    user_id = str(uuid.uuid4())
+    user_id = str_uuid()
     data = user_req.model_dump()
     data["email"] = email
     data["password"] = (data.get("password") or "").strip()
@@ -232,11 +393,15 @@ def me(user_db: authenticated_user):
 @user_router.get(
     "/users", response_model=List[UserResponse], status_code=status.HTTP_200_OK
 )
-def get_users(db: get_db, page: int = 1, per_page: int = 10):
-    users = user_crud.get_multi(db, page=page, per_page=per_page)
+def get_users(db: get_db_read, page: int = 1, per_page: int = 10):
+    users = user_crud.get_multi_rows(
+        db,
+        columns=["email", "firstname", "lastname", "role"],
+        page=page,
+        per_page=per_page,
+    )
     return [
         UserResponse(
-            id=str(u.id),
             email=u.email,
             firstname=u.firstname,
             lastname=u.lastname,
@@ -278,13 +443,21 @@ def create_table(table_data: Table, user_db: authenticated_user):
 
 
 @table_router.get("/get_tables", response_model=List[Table])
-def get_tables(db: get_db, page: int = 1, per_page: int = 10):
-    tables = table_crud.get_multi(db, page=page, per_page=per_page)
+def get_tables(
+    response: Response,
+    db: get_db_read,
+    page: int = 1,
+    per_page: int = 10,
+    with_total: bool = False,
+):
+    tables = _paginate(
+        table_crud, db, response, page, per_page, None, with_total=with_total
+    )
     return [Table(table_id=str(t.id), table_no=t.table_no) for t in tables]
 
 
 @table_router.get("/tables_by_id/{table_id}", response_model=Table)
-def get_table(table_id: str, db: get_db):
+def get_table(table_id: str, db: get_db_read):
 
     db_table = table_crud.get(db, id=table_id)
     if not db_table:
@@ -323,6 +496,44 @@ def delete_table(table_id: str, db: get_db):
     return {"message": "Table deleted successfully"}
 
 
+@table_router.post(
+    "/bulk_create_table",
+    response_model=List[Table],
+    status_code=status.HTTP_201_CREATED,
+)
+def bulk_create_tables(tables_data: List[Table], user_db: authenticated_user):
+    user, db = user_db
+    firstname = str(getattr(user, "firstname", None) or "system")
+    created = table_crud.bulk_create(
+        db,
+        objs_in=[
+            {"table_no": t.table_no, "created_by": firstname, "updated_by": firstname}
+            for t in tables_data
+        ],
+    )
+    return [Table(table_id=str(t.id), table_no=t.table_no) for t in created]
+
+
+@table_router.put("/bulk_update_table", response_model=BulkUpdateResponse)
+def bulk_update_tables(tables_data: List[TableBulkUpdate], user_db: authenticated_user):
+    user, db = user_db
+    firstname = str(getattr(user, "firstname", None) or "system")
+    updated_ids = table_crud.bulk_update(
+        db,
+        objs_in=[
+            {"id": t.table_id, "table_no": t.table_no, "updated_by": firstname}
+            for t in tables_data
+        ],
+    )
+    return BulkUpdateResponse(updated=len(updated_ids))
+
+
+@table_router.post("/bulk_delete_table", response_model=BulkDeleteResponse)
+def bulk_delete_tables(payload: BulkDeleteRequest, user_db: authenticated_user):
+    _, db = user_db
+    return BulkDeleteResponse(deleted=table_crud.bulk_soft_delete(db, ids=payload.ids))
+
+
 ########################################################
 # Category APIs
 ########################################################
@@ -420,13 +631,21 @@ def create_menu(menu_data: MenuCreate, user_db: authenticated_user):
     )
     db.add(db_obj)
     db.commit()
-    db.refresh(db_obj)
     return _menu_row_to_schema(db_obj)
 
 
 @menu_router.get("/get_menus", response_model=List[Menu])
-def get_menus(db: get_db, page: int = 1, per_page: int = 10):
-    menus = menu_crud.get_multi(db, page=page, per_page=per_page)
+def get_menus(
+    response: Response,
+    db: get_db_read,
+    page: int = 1,
+    per_page: int = 10,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+):
+    menus = _paginate(
+        menu_crud, db, response, page, per_page, cursor, with_total=with_total
+    )
     return [_menu_row_to_schema(m) for m in menus]
 
 
@@ -438,13 +657,9 @@ def _normalize_menu_id(menu_id: str) -> str:
 
 
 @menu_router.get("/get_menu_by_id/{menu_id}", response_model=Menu)
-def get_menu(menu_id: str, db: get_db):
+def get_menu(menu_id: str, db: get_db_read):
     menu_id = _normalize_menu_id(menu_id)
-    menu = (
-        db.query(MenuModel)
-        .filter(MenuModel.menu_id == menu_id, MenuModel.is_deleted == false())
-        .first()
-    )
+    menu = db.query(MenuModel).filter(MenuModel.menu_id == menu_id).first()
     if not menu:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -461,11 +676,7 @@ def update_menu(
 ):
     _, db = user_db
     menu_id = _normalize_menu_id(menu_id)
-    menu = (
-        db.query(MenuModel)
-        .filter(MenuModel.menu_id == menu_id, MenuModel.is_deleted == false())
-        .first()
-    )
+    menu = db.query(MenuModel).filter(MenuModel.menu_id == menu_id).first()
     if not menu:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -478,7 +689,6 @@ def update_menu(
     menu.updated_by = str(UserModel.firstname)
     db.add(menu)
     db.commit()
-    db.refresh(menu)
     return _menu_row_to_schema(menu)
 
 
@@ -487,11 +697,7 @@ def update_menu(
 )
 def delete_menu(menu_id: str, db: get_db):
     menu_id = _normalize_menu_id(menu_id)
-    menu = (
-        db.query(MenuModel)
-        .filter(MenuModel.menu_id == menu_id, MenuModel.is_deleted == false())
-        .first()
-    )
+    menu = db.query(MenuModel).filter(MenuModel.menu_id == menu_id).first()
     if not menu:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -501,125 +707,406 @@ def delete_menu(menu_id: str, db: get_db):
     return {"message": "Menu deleted successfully"}
 
 
-def _order_status_from_model(o: OrderModel) -> OrderStatus:
-    """Derive OrderStatus from order_pending, order_done, order_cancel."""
-    done = (o.order_done or "").lower() == "true"
-    cancel = (o.order_cancel or "").lower() == "true"
-    pending = (o.order_pending or "").lower() == "true"
-    if cancel:
-        return OrderStatus.CANCELLED
-    if done:
-        return OrderStatus.READY
-    if pending:
-        return OrderStatus.PENDING
-    return OrderStatus.PREPARING
-
-
-def _order_status_for_response(o: OrderModel, db) -> OrderStatus:
-    """Use status from order_status table if present; else derive from order flags."""
-    row = (
-        db.query(OrderStatusModel)
-        .filter(
-            OrderStatusModel.order_id == str(o.id),
-            OrderStatusModel.is_deleted == false(),
-        )
-        .first()
-    )
-    if row and (row.status or "").strip():
-        try:
-            return OrderStatus(row.status.strip().lower())
-        except ValueError:
-            pass
-    return _order_status_from_model(o)
+def _legacy_order_flags(order_state: OrderState) -> Dict[str, str]:
+    """order_pending/order_done/order_cancel values matching order.status."""
+    return {
+        "order_pending": "true" if order_state == OrderState.PENDING else "false",
+        "order_done": "true" if order_state == OrderState.READY else "false",
+        "order_cancel": "true" if order_state == OrderState.CANCELLED else "false",
+    }
 
 
-def _order_row_to_response(o: OrderModel, db) -> OrderResponse:
-    """Build OrderResponse from DB row; status from order_status table when present."""
+def _order_to_response(o: OrderModel) -> OrderResponse:
     return OrderResponse(
         order_id=str(o.id),
         item_list=o.item_list or "[]",
-        order_status=_order_status_for_response(o, db),
+        order_status=OrderStatus(o.status.value),
         table_id=str(o.table_no or ""),
     )
 
 
+def _order_item_rows(order_id: str, item_list: str) -> List[dict]:
+    """
+    order_item rows for an order's item_list JSON, parsed as invoices always have been.
+    A non-numeric qty or price is a 400: the line could never be billed. menu_item_id is
+    still the client's value here; _link_menu_items checks it before the insert.
+    """
+    try:
+        items = _parse_order_items(item_list or "[]")
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="item_list entries need a numeric qty and price",
+        )
+    return [
+        {
+            "order_id": order_id,
+            "line_no": line_no,
+            "menu_item_id": item["menu_item_id"],
+            "name": item["description"],
+            "qty": item["quantity"],
+            "unit_price": item["price"],
+        }
+        for line_no, item in enumerate(items, start=1)
+    ]
+
+
+async def _link_menu_items(db: AsyncSession, rows: List[dict]):
+    """
+    Keep order_item.menu_item_id only where it names a live menu item, with one lookup
+    for all rows. Clients send whatever id their menu had; a malformed, unknown or since
+    deleted id is stored as NULL (the line keeps its name and price) instead of failing
+    the foreign key.
+    """
+    wanted: Dict[int, str] = {}
+    for i, row in enumerate(rows):
+        try:
+            wanted[i] = str(uuid.UUID(str(row["menu_item_id"])))
+        except ValueError:
+            pass
+        row["menu_item_id"] = None
+    if not wanted:
+        return
+    live = set(
+        await db.scalars(
+            select(MenuItemModel.id).where(MenuItemModel.id.in_(set(wanted.values())))
+        )
+    )
+    for i, menu_item_id in wanted.items():
+        if menu_item_id in live:
+            rows[i]["menu_item_id"] = menu_item_id
+
+
+async def _replace_order_items(db: AsyncSession, order_ids_items: Dict[str, str]):
+    """Swap the line items of each order id for the ones parsed from its new item_list."""
+    rows = [
+        row
+        for order_id, item_list in order_ids_items.items()
+        for row in _order_item_rows(order_id, item_list)
+    ]
+    await _link_menu_items(db, rows)
+    await db.execute(
+        update(OrderItemModel)
+        .where(
+            OrderItemModel.order_id.in_(list(order_ids_items)),
+            OrderItemModel.is_deleted == false(),
+        )
+        .values(is_deleted=True)
+        .execution_options(synchronize_session=False)
+    )
+    if rows:
+        await order_item_crud.bulk_create_async(db, objs_in=rows, commit=False)
+
+
+# Topic for /orders/stream; events are {"type": "order.<kind>", "order": OrderResponse}
+ORDER_EVENTS_TOPIC = "orders"
+
+
+async def _publish_order_event(event_type: str, order: OrderResponse):
+    """Push an order change to stream subscribers; never fails the request that made it."""
+    data = order.model_dump(mode="json")
+    if len(json.dumps(data)) > MAX_NOTIFY_PAYLOAD - 200:
+        # Too big for NOTIFY; subscribers fetch the full order by id
+        data["item_list"] = None
+        data["item_list_truncated"] = True
+    try:
+        await hub.publish(ORDER_EVENTS_TOPIC, {"type": event_type, "order": data})
+    except Exception as e:
+        logger.warning(
+            "event=order_event_publish_failed type=%s error=%s", event_type, e
+        )
+
+
 ########################################################
 # Order APIs
 ########################################################
 
 
-@order_router.post(
-    "/create_order", response_model=OrderResponse, status_code=status.HTTP_201_CREATED
-)
-def create_order(order_data: OrderCreate, db: get_db):
+def _parse_table_no(table_no: str) -> int:
+    """OrderCreate/OrderUpdate carry table_no as a string; asyncpg only binds ints to Integer."""
     try:
-        table_no = int(order_data.table_no)
+        return int(table_no)
     except (ValueError, TypeError):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="table_no must be a valid integer",
         )
+
+
+@order_router.post(
+    "/create_order", response_model=OrderResponse, status_code=status.HTTP_201_CREATED
+)
+async def create_order(
+    order_data: OrderCreate, uow: get_async_uow, idem: async_idempotency
+):
+    if idem.replay is not None:
+        return idem.replay
+    db = uow.session
     obj_in = {
         "item_list": order_data.item_list,
         "quantity": order_data.quantity,
-        "table_no": table_no,
-        "order_pending": "true",
-        "order_done": "false",
-        "order_cancel": "false",
+        "table_no": _parse_table_no(order_data.table_no),
+        # status itself comes from the column default (PENDING)
+        **_legacy_order_flags(OrderState.PENDING),
     }
-    created = order_crud.create(db, obj_in=obj_in)
-    return _order_row_to_response(created, db)
+    # id is assigned here so the line items can reference it; both commit together
+    obj_in["id"] = str_uuid()
+    rows = _order_item_rows(obj_in["id"], order_data.item_list)
+    await _link_menu_items(db, rows)
+    created = await order_crud.create_async(db, obj_in=obj_in, commit=False)
+    if rows:
+        await order_item_crud.bulk_create_async(db, objs_in=rows, commit=False)
+    result = _order_to_response(created)
+    await idem.save_async(db, result, status.HTTP_201_CREATED)
+    await uow.commit()
+    await _publish_order_event("order.created", result)
+    return result
+
+
+# Largest batch POST /create_orders accepts
+MAX_ORDER_BATCH = 500
+
+
+@order_router.post(
+    "/create_orders",
+    response_model=OrderBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_orders(orders_data: List[OrderCreate], uow: get_async_uow):
+    """
+    Create a batch of orders (e.g. a large party or the self-order tablet) in one
+    transaction: table numbers are checked with one query, and orders and their line
+    items go in as multi-row INSERTs. Orders with a bad table_no or item_list are
+    reported in errors by position and the rest are still created.
+    """
+    db = uow.session
+    if len(orders_data) > MAX_ORDER_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_ORDER_BATCH} orders per batch",
+        )
+    errors: List[OrderBatchError] = []
+    table_nos: Dict[int, int] = {}
+    for index, order_data in enumerate(orders_data):
+        try:
+            table_nos[index] = int(order_data.table_no)
+        except (ValueError, TypeError):
+            errors.append(
+                OrderBatchError(index=index, detail="table_no must be a valid integer")
+            )
+    known_tables = set()
+    if table_nos:
+        known_tables = set(
+            await db.scalars(
+                select(TableModel.table_no).where(
+                    TableModel.table_no.in_(set(table_nos.values()))
+                )
+            )
+        )
+
+    order_rows, item_rows = [], []
+    for index, order_data in enumerate(orders_data):
+        if index not in table_nos:
+            continue
+        if table_nos[index] not in known_tables:
+            errors.append(
+                OrderBatchError(
+                    index=index, detail=f"Table {table_nos[index]} does not exist"
+                )
+            )
+            continue
+        order_id = str_uuid()
+        try:
+            item_rows.extend(_order_item_rows(order_id, order_data.item_list))
+        except HTTPException as e:
+            errors.append(OrderBatchError(index=index, detail=e.detail))
+            continue
+        order_rows.append(
+            {
+                "id": order_id,
+                "item_list": order_data.item_list,
+                "quantity": order_data.quantity,
+                "table_no": table_nos[index],
+                **_legacy_order_flags(OrderState.PENDING),
+            }
+        )
+
+    results = []
+    if order_rows:
+        created = await order_crud.bulk_create_async(
+            db, objs_in=order_rows, commit=False
+        )
+        if item_rows:
+            await _link_menu_items(db, item_rows)
+            await order_item_crud.bulk_create_async(db, objs_in=item_rows, commit=False)
+        await uow.commit()
+        # RETURNING order is not guaranteed; answer in request order
+        by_id = {str(o.id): o for o in created}
+        results = [_order_to_response(by_id[row["id"]]) for row in order_rows]
+    for result in results:
+        await _publish_order_event("order.created", result)
+    errors.sort(key=lambda e: e.index)
+    return OrderBatchResponse(created=results, errors=errors)
 
 
 @order_router.get("/get_orders", response_model=List[OrderResponse])
-def get_orders(db: get_db, page: int = 1, per_page: int = 10):
-    orders = order_crud.get_multi(db, page=page, per_page=per_page)
-    return [_order_row_to_response(o, db) for o in orders]
+async def get_orders(
+    response: Response,
+    db: get_async_db_read,
+    page: int = 1,
+    per_page: int = 10,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+):
+    orders = await _paginate_async(
+        order_crud, db, response, page, per_page, cursor, with_total=with_total
+    )
+    return [_order_to_response(o) for o in orders]
+
+
+@order_router.get("/get_active_orders", response_model=List[OrderResponse])
+async def get_active_orders(db: get_async_db_read, limit: int = 100):
+    """Kitchen view: pending and preparing orders, oldest first."""
+    # Served by the partial (status, created_at) index on live orders
+    orders = await db.scalars(
+        select(OrderModel)
+        .where(OrderModel.status.in_(ACTIVE_ORDER_STATES))
+        .order_by(OrderModel.created_at)
+        .limit(max(1, min(limit, 500)))
+    )
+    return [_order_to_response(o) for o in orders]
 
 
 @order_router.get("/get_order_by_id/{order_id}", response_model=OrderResponse)
-def get_order(order_id: str, db: get_db):
-    order = order_crud.get(db, id=order_id)
+async def get_order(order_id: str, db: get_async_db_read):
+    order = await order_crud.get_async(db, id=order_id)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
         )
-    return _order_row_to_response(order, db)
+    return _order_to_response(order)
+
+
+@order_router.get("/orders/stream")
+async def stream_orders():
+    """
+    Server-Sent Events feed of order.created, order.updated and order.status events, so
+    kitchen screens get pushed changes instead of polling get_orders. Holds no DB
+    connection while idle; a comment line is sent every EVENTS_HEARTBEAT_SECONDS to keep
+    proxies from closing the connection.
+    """
+
+    async def events():
+        # Starlette cancels this generator when the client disconnects, which unsubscribes
+        async with hub.subscribe(ORDER_EVENTS_TOPIC) as queue:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=Config.EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @order_router.put("/update_order/{order_id}", response_model=OrderResponse)
-def update_order(
+async def update_order(
     order_id: str,
     order_data: OrderUpdate,
-    user_db: authenticated_user,
+    user_db: async_authenticated_user,
+    uow: get_async_uow,
 ):
     _, db = user_db
     order_id = order_id.strip("'\"")
-    order = order_crud.get(db, id=order_id)
+    order = await order_crud.get_async(db, id=order_id)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
         )
-    order.item_list = order_data.item_list
-    order.quantity = order_data.quantity
     order.updated_by = str(UserModel.firstname)
-    order_crud.update(db, db_obj=order, obj_in=order_data)
-    return _order_row_to_response(order, db)
+    await order_crud.update_async(
+        db,
+        db_obj=order,
+        obj_in={
+            "item_list": order_data.item_list,
+            "quantity": order_data.quantity,
+            "table_no": _parse_table_no(order_data.table_no),
+        },
+        commit=False,
+    )
+    await _replace_order_items(db, {str(order.id): order_data.item_list})
+    await uow.commit()
+    result = _order_to_response(order)
+    await _publish_order_event("order.updated", result)
+    return result
 
 
 @order_router.delete(
     "/delete_order_by_id/{order_id}", status_code=status.HTTP_204_NO_CONTENT
 )
-def delete_order(order_id: str, db: get_db):
-    order = order_crud.get(db, id=order_id)
+async def delete_order(order_id: str, db: get_async_db):
+    order = await order_crud.get_async(db, id=order_id)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
         )
-    order_crud.soft_del(db, order)
+    await order_crud.soft_del_async(db, order)
     return {"message": "Order deleted successfully"}
 
 
+@order_router.put("/bulk_update_order", response_model=BulkUpdateResponse)
+async def bulk_update_orders(
+    orders_data: List[OrderBulkUpdate],
+    user_db: async_authenticated_user,
+    uow: get_async_uow,
+):
+    user, db = user_db
+    firstname = str(getattr(user, "firstname", None) or "system")
+    objs_in = []
+    for order_data in orders_data:
+        obj_in = order_data.model_dump(exclude_unset=True, exclude={"order_id"})
+        obj_in["id"] = _normalize_order_id(order_data.order_id)
+        obj_in["updated_by"] = firstname
+        objs_in.append(obj_in)
+    updated_ids = await order_crud.bulk_update_async(db, objs_in=objs_in, commit=False)
+    # only orders the UPDATE matched get new line items: an unknown id would fail the
+    # order_item foreign key, and a soft-deleted order must not gain live items
+    updated = set(updated_ids)
+    new_item_lists = {}
+    for obj_in in objs_in:
+        if "item_list" not in obj_in:
+            continue
+        try:
+            order_id = str(uuid.UUID(obj_in["id"]))
+        except ValueError:
+            continue
+        if order_id in updated:
+            new_item_lists[order_id] = obj_in["item_list"]
+    if new_item_lists:
+        await _replace_order_items(db, new_item_lists)
+    await uow.commit()
+    return BulkUpdateResponse(updated=len(updated_ids))
+
+
+@order_router.post("/bulk_delete_order", response_model=BulkDeleteResponse)
+async def bulk_delete_orders(
+    payload: BulkDeleteRequest, user_db: async_authenticated_user
+):
+    _, db = user_db
+    deleted = await order_crud.bulk_soft_delete_async(
+        db, ids=[_normalize_order_id(i) for i in payload.ids]
+    )
+    return BulkDeleteResponse(deleted=deleted)
+
+
 ########################################################
 # Order Status APIs
 ########################################################
@@ -635,43 +1122,48 @@ def _normalize_order_id(order_id: str) -> str:
 @order_status_router.put(
     "/update_order_status/{order_id}", response_model=OrderStatusResponse
 )
-def update_order_status(
+async def update_order_status(
     order_id: str,
     order_status_data: OrderStatusUpdate,
-    user_db: authenticated_user,
+    user_db: async_authenticated_user,
+    uow: get_async_uow,
 ):
     _, db = user_db
     order_id = _normalize_order_id(order_id)
     # Ensure order exists
-    order = order_crud.get(db, id=order_id)
+    order = await order_crud.get_async(db, id=order_id)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
         )
-    order_status = (
-        db.query(OrderStatusModel)
-        .filter(
-            OrderStatusModel.order_id == order_id,
-            OrderStatusModel.is_deleted == false(),
-        )
-        .first()
+    # order.status and its legacy flags change in the same transaction as order_status
+    await order_crud.update_async(
+        db,
+        db_obj=order,
+        obj_in={
+            "status": OrderState(order_status_data.status.value),
+            **_legacy_order_flags(OrderState(order_status_data.status.value)),
+            "updated_by": str(UserModel.firstname),
+        },
+        commit=False,
     )
-    if not order_status:
-        # Create order_status row on first update (orders don't get one at creation)
-        order_status = OrderStatusModel(
-            order_id=order_id,
-            status=order_status_data.status.value,
-            created_by=str(UserModel.firstname),
-            updated_by=str(UserModel.firstname),
-        )
-        db.add(order_status)
-        db.commit()
-        db.refresh(order_status)
-    else:
-        order_status.status = order_status_data.status.value
-        order_status.updated_by = str(UserModel.firstname)
-        order_status_crud.update(db, db_obj=order_status, obj_in=order_status_data)
-        db.refresh(order_status)
+    # Orders don't get a status row at creation; the first update inserts it. The partial
+    # unique index on order_id makes this a single race-free statement.
+    order_status, _ = await order_status_crud.upsert_async(
+        db,
+        obj_in={
+            "order_id": order_id,
+            "status": order_status_data.status.value,
+            "created_by": str(UserModel.firstname),
+            "updated_by": str(UserModel.firstname),
+        },
+        conflict_cols=["order_id"],
+        update_cols=["status", "updated_by"],
+        index_where=OrderStatusModel.is_deleted == false(),
+        commit=False,
+    )
+    await uow.commit()
+    await _publish_order_event("order.status", _order_to_response(order))
     return OrderStatusResponse(
         order_id=str(order_status.order_id), status=order_status.status or ""
     )
@@ -704,12 +1196,31 @@ def create_stock(stock_data: StockCreate, user_db: authenticated_user):
     )
 
 
+STOCK_LIST_COLUMNS = ["name", "quantity", "unit_of_measure", "cost_per_unit"]
+
+
 @stock_router.get("/get_stocks", response_model=List[Stock])
-def get_stocks(db: get_db, page: int = 1, per_page: int = 10):
-    stocks = stock_crud.get_multi(db, page=page, per_page=per_page)
+def get_stocks(
+    response: Response,
+    db: get_db_read,
+    page: int = 1,
+    per_page: int = 10,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+):
+    stocks = _paginate(
+        stock_crud,
+        db,
+        response,
+        page,
+        per_page,
+        cursor,
+        columns=STOCK_LIST_COLUMNS,
+        with_total=with_total,
+    )
     return [
         Stock(
-            id=str(s.id),
+            id=s.id,
             name=s.name,
             quantity=s.quantity,
             unit_of_measure=s.unit_of_measure,
@@ -720,7 +1231,7 @@ def get_stocks(db: get_db, page: int = 1, per_page: int = 10):
 
 
 @stock_router.get("/get_stock_by_id/{stock_id}", response_model=Stock)
-def get_stock(stock_id: str, db: get_db):
+def get_stock(stock_id: str, db: get_db_read):
     stock = stock_crud.get(db, id=stock_id)
     if not stock:
         raise HTTPException(
@@ -763,6 +1274,54 @@ def delete_stock(stock_id: str, user_db: authenticated_user):
     return {"message": "Stock deleted successfully"}
 
 
+@stock_router.post(
+    "/bulk_create_stock",
+    response_model=List[Stock],
+    status_code=status.HTTP_201_CREATED,
+)
+def bulk_create_stocks(stocks_data: List[StockCreate], user_db: authenticated_user):
+    """Insert many stock rows (e.g. a month-end count or import) in one transaction."""
+    user, db = user_db
+    firstname = str(getattr(user, "firstname", None) or "system")
+    objs_in = []
+    for stock_data in stocks_data:
+        obj_in = stock_data.model_dump()
+        obj_in["created_by"] = firstname
+        obj_in["updated_by"] = firstname
+        objs_in.append(obj_in)
+    created = stock_crud.bulk_create(db, objs_in=objs_in)
+    return [
+        Stock(
+            id=str(s.id),
+            name=s.name,
+            quantity=s.quantity,
+            unit_of_measure=s.unit_of_measure,
+            cost_per_unit=s.cost_per_unit,
+            created_at=s.created_at,
+            updated_at=s.updated_at,
+        )
+        for s in created
+    ]
+
+
+@stock_router.put("/bulk_update_stock", response_model=BulkUpdateResponse)
+def bulk_update_stocks(stocks_data: List[StockBulkUpdate], user_db: authenticated_user):
+    user, db = user_db
+    firstname = str(getattr(user, "firstname", None) or "system")
+    objs_in = []
+    for stock_data in stocks_data:
+        obj_in = stock_data.model_dump(exclude_unset=True)
+        obj_in["updated_by"] = firstname
+        objs_in.append(obj_in)
+    return BulkUpdateResponse(updated=len(stock_crud.bulk_update(db, objs_in=objs_in)))
+
+
+@stock_router.post("/bulk_delete_stock", response_model=BulkDeleteResponse)
+def bulk_delete_stocks(payload: BulkDeleteRequest, user_db: authenticated_user):
+    _, db = user_db
+    return BulkDeleteResponse(deleted=stock_crud.bulk_soft_delete(db, ids=payload.ids))
+
+
 ########################################################
 # Invoice APIs
 ########################################################
@@ -775,10 +1334,74 @@ def _invoice_total_from_subtotal(subtotal: float, gst_percent: float, discount_p
     return round(subtotal + gst_amount - discount_amount, 2)
 
 
+def _orders_subtotal(db: Session, order_ids: List[str]) -> float:
+    """SUM(qty * unit_price) over the orders' line items, computed in the database."""
+    subtotal = db.scalar(
+        select(
+            func.coalesce(func.sum(OrderItemModel.qty * OrderItemModel.unit_price), 0)
+        ).where(
+            OrderItemModel.order_id.in_(order_ids),
+            OrderItemModel.is_deleted == false(),
+        )
+    )
+    return round(float(subtotal or 0), 2)
+
+
+def _order_line_items(db: Session, order_ids: List[str]) -> List[dict]:
+    """Invoice line items for the given orders, in order_ids order and then line order."""
+    rows = db.execute(
+        select(
+            OrderItemModel.order_id,
+            OrderItemModel.name,
+            OrderItemModel.qty,
+            OrderItemModel.unit_price,
+        )
+        .where(OrderItemModel.order_id.in_(order_ids))
+        .order_by(OrderItemModel.line_no)
+    )
+    by_order: Dict[str, List[dict]] = {}
+    for r in rows:
+        by_order.setdefault(str(r.order_id), []).append(
+            {"description": r.name, "quantity": r.qty, "price": r.unit_price}
+        )
+    return [item for order_id in order_ids for item in by_order.get(str(order_id), [])]
+
+
+def _insert_invoice(db: Session, obj_in: dict) -> InvoiceModel:
+    """
+    Insert an invoice without committing. With no invoice_number from the client one is
+    allocated, which cannot clash, so it is a plain INSERT; a client-chosen number that
+    is already taken is a 409.
+    """
+    if not obj_in.get("invoice_number"):
+        obj_in["invoice_number"] = invoice_number_allocator.next(
+            db, obj_in.get("invoice_date")
+        )
+        created = InvoiceModel(**obj_in)
+        db.add(created)
+        db.flush()
+        return created
+    try:
+        created, inserted = invoice_crud.upsert(
+            db, obj_in=obj_in, conflict_cols=["invoice_number"], commit=False
+        )
+    except UpsertConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not inserted:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An invoice with this invoice_number already exists. "
+            "Use a different invoice_number.",
+        )
+    return created
+
+
 @invoice_router.post(
     "/create_invoice", response_model=Invoice, status_code=status.HTTP_201_CREATED
 )
-def create_invoice(invoice_data: InvoiceCreate, user_db: authenticated_user):
+def create_invoice(
+    invoice_data: InvoiceCreate, user_db: authenticated_user, uow: get_uow
+):
     _, db = user_db
     order = order_crud.get(db, id=invoice_data.order_id)
     if not order:
@@ -786,27 +1409,22 @@ def create_invoice(invoice_data: InvoiceCreate, user_db: authenticated_user):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Order not found. Use a valid order_id from GET /get_orders.",
         )
-    items = _parse_order_items(order.item_list or "[]")
-    subtotal = round(sum((item["quantity"] * item["price"]) for item in items), 2)
+    subtotal = _orders_subtotal(db, [str(order.id)])
     gst_percent = float(getattr(invoice_data, "gst_percent", 0) or 0)
     discount_percent = float(getattr(invoice_data, "discount_percent", 0) or 0)
     total_amount = _invoice_total_from_subtotal(subtotal, gst_percent, discount_percent)
     obj_in = invoice_data.model_dump(exclude_unset=True)
+    if obj_in.get("invoice_date") is None:
+        # a blank date defaults to the database's now()
+        obj_in.pop("invoice_date", None)
     obj_in["total_amount"] = total_amount
     obj_in["gst_percent"] = gst_percent
     obj_in["discount_percent"] = discount_percent
     obj_in["created_by"] = str(UserModel.firstname)
     obj_in["updated_by"] = str(UserModel.firstname)
-    try:
-        created = invoice_crud.create(db, obj_in=obj_in)
-    except IntegrityError as e:
-        err_msg = str(e.orig) if getattr(e, "orig", None) else str(e)
-        if "invoice_number" in err_msg or "ix_invoice_invoice_number" in err_msg:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="An invoice with this invoice_number already exists. Use a different invoice_number.",
-            ) from e
-        raise
+    created = _insert_invoice(db, obj_in)
+    _link_invoice_orders(db, str(created.id), [str(order.id)])
+    uow.commit()
     return Invoice(
         invoice_id=str(created.id),
         order_id=created.order_id,
@@ -821,28 +1439,57 @@ def create_invoice(invoice_data: InvoiceCreate, user_db: authenticated_user):
     )
 
 
+INVOICE_LIST_COLUMNS = [
+    "order_id",
+    "invoice_number",
+    "invoice_date",
+    "total_amount",
+    "gst_percent",
+    "discount_percent",
+    "payment_status",
+    "notes",
+    "customer_name",
+]
+
+
 @invoice_router.get("/get_invoices", response_model=List[Invoice])
-def get_invoices(db: get_db, page: int = 1, per_page: int = 10):
-    invoices = invoice_crud.get_multi(db, page=page, per_page=per_page)
+def get_invoices(
+    response: Response,
+    db: get_db_read,
+    page: int = 1,
+    per_page: int = 10,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+):
+    invoices = _paginate(
+        invoice_crud,
+        db,
+        response,
+        page,
+        per_page,
+        cursor,
+        columns=INVOICE_LIST_COLUMNS,
+        with_total=with_total,
+    )
     return [
         Invoice(
-            invoice_id=str(i.id),
+            invoice_id=i.id,
             order_id=i.order_id,
             invoice_number=i.invoice_number,
             invoice_date=i.invoice_date,
             total_amount=i.total_amount,
-            gst_percent=getattr(i, "gst_percent", 0) or 0,
-            discount_percent=getattr(i, "discount_percent", 0) or 0,
+            gst_percent=i.gst_percent or 0,
+            discount_percent=i.discount_percent or 0,
             payment_status=i.payment_status,
             notes=i.notes,
-            customer_name=getattr(i, "customer_name", ""),
+            customer_name=i.customer_name or "",
         )
         for i in invoices
     ]
 
 
 @invoice_router.get("/get_invoice_by_id/{invoice_id}", response_model=Invoice)
-def get_invoice(invoice_id: str, db: get_db):
+def get_invoice(invoice_id: str, db: get_db_read):
     invoice = invoice_crud.get(db, id=invoice_id)
     if not invoice:
         raise HTTPException(
@@ -867,8 +1514,9 @@ def update_invoice(
     invoice_id: str,
     invoice_data: InvoiceUpdate,
     user_db: authenticated_user,
+    uow: get_uow,
 ):
-    _, db = user_db
+    user, db = user_db
     invoice = invoice_crud.get(db, id=invoice_id)
     if not invoice:
         raise HTTPException(
@@ -881,6 +1529,19 @@ def update_invoice(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Order not found. Use a valid order_id from GET /get_orders.",
             )
+        if str(order.id) != str(invoice.order_id):
+            # move the billing link from the old order to the new one
+            db.execute(
+                update(InvoiceOrderModel)
+                .where(
+                    InvoiceOrderModel.invoice_id == invoice.id,
+                    InvoiceOrderModel.order_id == invoice.order_id,
+                    InvoiceOrderModel.is_deleted == false(),
+                )
+                .values(is_deleted=True)
+                .execution_options(synchronize_session=False)
+            )
+            _link_invoice_orders(db, str(invoice.id), [str(order.id)])
         invoice.order_id = invoice_data.order_id
     if invoice_data.invoice_number is not None:
         invoice.invoice_number = invoice_data.invoice_number
@@ -898,9 +1559,10 @@ def update_invoice(
         invoice.notes = invoice_data.notes
     if invoice_data.customer_name is not None:
         invoice.customer_name = invoice_data.customer_name
-    invoice.updated_by = str(user_db.firstname)
-    invoice_crud.update(db, db_obj=invoice, obj_in=invoice_data)
-    db.refresh(invoice)
+    invoice.updated_by = str(getattr(user, "firstname", None) or "system")
+    invoice_crud.update(db, db_obj=invoice, obj_in=invoice_data, commit=False)
+    uow.commit()
+    invoice_page_cache.invalidate(str(invoice.id))
     return Invoice(
         invoice_id=str(invoice.id),
         order_id=invoice.order_id,
@@ -915,32 +1577,50 @@ def update_invoice(
     )
 
 
+def _order_not_invoiced():
+    """Filter for orders without a live invoice_order link (anti-join on its unique index)."""
+    return ~exists().where(
+        InvoiceOrderModel.order_id == OrderModel.id,
+        InvoiceOrderModel.is_deleted == false(),
+    )
+
+
+def _link_invoice_orders(db: Session, invoice_id: str, order_ids: List[str]):
+    """
+    Record the invoice's orders in invoice_order. The partial unique index on order_id
+    lets an order be on one live invoice only, so an order already billed elsewhere
+    (e.g. by a concurrent request) is a 409 and the caller's transaction is not committed.
+    """
+    stmt = (
+        pg_insert(InvoiceOrderModel)
+        .values(
+            [
+                {"id": str_uuid(), "invoice_id": invoice_id, "order_id": order_id}
+                for order_id in order_ids
+            ]
+        )
+        .on_conflict_do_nothing(
+            index_elements=["order_id"],
+            index_where=InvoiceOrderModel.is_deleted == false(),
+        )
+        .returning(InvoiceOrderModel.order_id)
+    )
+    linked = set(db.scalars(stmt).all())
+    if len(linked) < len(set(order_ids)):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Some of these orders are already on another invoice.",
+        )
+
+
 @invoice_router.get(
     "/tables_with_uninvoiced_orders", response_model=List[int]
 )
-def get_tables_with_uninvoiced_orders(db: get_db):
+def get_tables_with_uninvoiced_orders(db: get_db_read):
     """Return list of table numbers that have at least one uninvoiced order (for dropdown when creating invoice by table)."""
-    all_invoices = (
-        db.query(InvoiceModel)
-        .filter(InvoiceModel.is_deleted == false())
-        .all()
-    )
-    invoiced_order_ids = set()
-    for inv in all_invoices:
-        invoiced_order_ids.add(inv.order_id)
-        if inv.order_ids:
-            try:
-                ids = json.loads(inv.order_ids)
-                if isinstance(ids, list):
-                    invoiced_order_ids.update(str(x) for x in ids)
-            except (json.JSONDecodeError, TypeError):
-                pass
-    filters = [OrderModel.is_deleted == false()]
-    if invoiced_order_ids:
-        filters.append(~OrderModel.id.in_(invoiced_order_ids))
     rows = (
         db.query(OrderModel.table_no)
-        .filter(*filters)
+        .filter(_order_not_invoiced())
         .distinct()
         .order_by(OrderModel.table_no)
         .all()
@@ -952,38 +1632,25 @@ def get_tables_with_uninvoiced_orders(db: get_db):
     "/create_invoice_for_table", response_model=Invoice, status_code=status.HTTP_201_CREATED
 )
 def create_invoice_for_table(
-    payload: InvoiceCreateForTable, user_db: authenticated_user
+    payload: InvoiceCreateForTable,
+    user_db: authenticated_user,
+    uow: get_uow,
+    idem: idempotency,
 ):
     """Create a single merged invoice for all (uninvoiced) orders from the given table."""
+    if idem.replay is not None:
+        return idem.replay
     _, db = user_db
     table_no = payload.table_no
 
-    # Collect all order IDs that are already on any invoice
-    all_invoices = (
-        db.query(InvoiceModel)
-        .filter(InvoiceModel.is_deleted == false())
-        .all()
-    )
-    invoiced_order_ids = set()
-    for inv in all_invoices:
-        invoiced_order_ids.add(inv.order_id)
-        if inv.order_ids:
-            try:
-                ids = json.loads(inv.order_ids)
-                if isinstance(ids, list):
-                    invoiced_order_ids.update(str(x) for x in ids)
-            except (json.JSONDecodeError, TypeError):
-                pass
-
-    # All orders for this table that are not yet invoiced
-    filters = [
-        OrderModel.table_no == table_no,
-        OrderModel.is_deleted == false(),
-    ]
-    if invoiced_order_ids:
-        filters.append(~OrderModel.id.in_(invoiced_order_ids))
+    # All orders for this table that are not yet invoiced, locked until commit so a second
+    # cashier billing the same table waits; the unique link index rejects any overlap.
     table_orders = (
-        db.query(OrderModel).filter(*filters).order_by(OrderModel.id).all()
+        db.query(OrderModel)
+        .filter(OrderModel.table_no == table_no, _order_not_invoiced())
+        .order_by(OrderModel.id)
+        .with_for_update(of=OrderModel)
+        .all()
     )
     if not table_orders:
         raise HTTPException(
@@ -994,27 +1661,16 @@ def create_invoice_for_table(
     order_ids_list = [str(o.id) for o in table_orders]
     first_order_id = order_ids_list[0]
 
-    # Compute subtotal from all orders' item_list, then apply GST and discount
-    subtotal = 0.0
-    for o in table_orders:
-        items = _parse_order_items(o.item_list or "[]")
-        subtotal += sum((item["quantity"] * item["price"]) for item in items)
-    subtotal = round(subtotal, 2)
+    # Subtotal over all the orders' line items, then apply GST and discount
+    subtotal = _orders_subtotal(db, order_ids_list)
     gst_percent = float(getattr(payload, "gst_percent", 0) or 0)
     discount_percent = float(getattr(payload, "discount_percent", 0) or 0)
     total_amount = _invoice_total_from_subtotal(subtotal, gst_percent, discount_percent)
 
-    invoice_number = payload.invoice_number or f"INV-{int(__import__('time').time() * 1000)}"
-    invoice_date = payload.invoice_date
-    if invoice_date is None:
-        from datetime import datetime
-        invoice_date = datetime.now()
-
     obj_in = {
         "order_id": first_order_id,
         "order_ids": json.dumps(order_ids_list),
-        "invoice_number": invoice_number,
-        "invoice_date": invoice_date,
+        "invoice_number": payload.invoice_number,
         "total_amount": total_amount,
         "gst_percent": gst_percent,
         "discount_percent": discount_percent,
@@ -1026,17 +1682,12 @@ def create_invoice_for_table(
         "created_by": str(UserModel.firstname),
         "updated_by": str(UserModel.firstname),
     }
-    try:
-        created = invoice_crud.create(db, obj_in=obj_in)
-    except IntegrityError as e:
-        err_msg = str(e.orig) if getattr(e, "orig", None) else str(e)
-        if "invoice_number" in err_msg or "ix_invoice_invoice_number" in err_msg:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="An invoice with this invoice_number already exists. Use a different invoice_number.",
-            ) from e
-        raise
-    return Invoice(
+    # without one the column defaults to the database's now()
+    if payload.invoice_date is not None:
+        obj_in["invoice_date"] = payload.invoice_date
+    created = _insert_invoice(db, obj_in)
+    _link_invoice_orders(db, str(created.id), order_ids_list)
+    result = Invoice(
         invoice_id=str(created.id),
         order_id=created.order_id,
         invoice_number=created.invoice_number,
@@ -1048,15 +1699,31 @@ def create_invoice_for_table(
         notes=created.notes,
         customer_name=getattr(created, "customer_name", ""),
     )
+    idem.save(db, result, status.HTTP_201_CREATED)
+    uow.commit()
+    return result
 
 
 @invoice_router.delete(
     "/delete_invoice_by_id/{invoice_id}", status_code=status.HTTP_204_NO_CONTENT
 )
-def delete_invoice(invoice_id: str, db: get_db):
+def delete_invoice(invoice_id: str, uow: get_uow):
+    db = uow.session
     invoice = invoice_crud.get(db, id=invoice_id)
     if invoice:
-        invoice_crud.soft_del(db, invoice)
+        # its orders become billable again
+        invoice_crud.soft_del(db, invoice, commit=False)
+        db.execute(
+            update(InvoiceOrderModel)
+            .where(
+                InvoiceOrderModel.invoice_id == invoice.id,
+                InvoiceOrderModel.is_deleted == false(),
+            )
+            .values(is_deleted=True)
+            .execution_options(synchronize_session=False)
+        )
+        uow.commit()
+        invoice_page_cache.invalidate(str(invoice.id))
         return None
     # Already soft-deleted? Treat as success (idempotent delete)
     invoice_any = invoice_crud.get_deleted_also(db, id=invoice_id)
@@ -1068,7 +1735,7 @@ def delete_invoice(invoice_id: str, db: get_db):
 
 
 def _parse_order_items(item_list_str: str) -> List[dict]:
-    """Parse order item_list JSON into list of {description, quantity, price} for invoice."""
+    """Parse order item_list JSON into {description, quantity, price, menu_item_id} rows."""
     if not item_list_str or not (item_list_str or "").strip():
         return []
     try:
@@ -1084,7 +1751,14 @@ def _parse_order_items(item_list_str: str) -> List[dict]:
         name = el.get("name") or el.get("item_name") or el.get("description") or f"Item {i + 1}"
         qty = int(el.get("qty") or el.get("quantity") or 1)
         price = float(el.get("price") or 0)
-        rows.append({"description": str(name), "quantity": qty, "price": price})
+        rows.append(
+            {
+                "description": str(name),
+                "quantity": qty,
+                "price": price,
+                "menu_item_id": el.get("menu_item_id") or None,
+            }
+        )
     return rows
 
 
@@ -1093,40 +1767,68 @@ def _parse_order_items(item_list_str: str) -> List[dict]:
     response_class=HTMLResponse,
     include_in_schema=False,
 )
-def invoice_view_page(invoice_id: str, db: get_db):
-    """Generate a printable invoice page with restaurant details and line items."""
+def invoice_view_page(invoice_id: str, request: Request, db: get_db_read):
+    """
+    Printable invoice page with restaurant details and line items.
+
+    The page is revalidated on every view (ETag / Last-Modified, 304 when unchanged) and
+    the rendered HTML is cached per invoice, so a reprint costs three small lookups
+    instead of loading every order and its line items.
+    """
     invoice = invoice_crud.get(db, id=invoice_id)
     if not invoice:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found"
         )
-
-    # Merged invoice: multiple orders from same table
-    order_ids_json = getattr(invoice, "order_ids", None)
-    order_ids_list = []
-    if order_ids_json:
-        try:
-            parsed = json.loads(order_ids_json)
-            if isinstance(parsed, list) and len(parsed) > 1:
-                order_ids_list = [str(x) for x in parsed]
-        except (json.JSONDecodeError, TypeError):
-            pass
-
-    if order_ids_list:
-        orders = []
-        for oid in order_ids_list:
-            o = order_crud.get(db, id=oid)
-            if o:
-                orders.append(o)
-        if not orders:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Orders not found for this invoice",
-            )
+    restaurants = restaurant_crud.get_multi(db, page=1, per_page=1)
+    restaurant = restaurants[0] if restaurants else None
+    # line item edits bump their order's updated_at
+    linked_orders = select(InvoiceOrderModel.order_id).where(
+        InvoiceOrderModel.invoice_id == invoice.id,
+        InvoiceOrderModel.is_deleted == false(),
+    )
+    orders_updated_at = db.scalar(
+        select(func.max(OrderModel.updated_at)).where(
+            or_(OrderModel.id == invoice.order_id, OrderModel.id.in_(linked_orders))
+        )
+    )
+    versions = [
+        invoice.updated_at,
+        getattr(restaurant, "updated_at", None),
+        orders_updated_at,
+    ]
+    etag = page_etag(
+        invoice.id,
+        getattr(restaurant, "id", None),
+        asset_urls["invoice.css"],
+        *versions,
+    )
+    last_modified = max((v for v in versions if v is not None), default=None)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    html_content = invoice_page_cache.get(str(invoice.id), etag)
+    if html_content is None:
+        html_content = _render_invoice_page(db, invoice, restaurant)
+        invoice_page_cache.put(str(invoice.id), etag, html_content)
+    return HTMLResponse(html_content, headers=headers)
+
+
+def _render_invoice_page(db: Session, invoice, restaurant) -> str:
+    # All orders billed on this invoice (several for a merged table invoice)
+    orders = (
+        db.query(OrderModel)
+        .join(InvoiceOrderModel, InvoiceOrderModel.order_id == OrderModel.id)
+        .filter(InvoiceOrderModel.invoice_id == invoice.id)
+        .order_by(OrderModel.id)
+        .all()
+    )
+    if orders:
         order = orders[0]
-        line_items = []
-        for o in orders:
-            line_items.extend(_parse_order_items(o.item_list or "[]"))
+        line_items = _order_line_items(db, [str(o.id) for o in orders])
     else:
         order = order_crud.get(db, id=invoice.order_id)
         if not order:
@@ -1134,11 +1836,12 @@ def invoice_view_page(invoice_id: str, db: get_db):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Order not found for this invoice",
             )
-        line_items = _parse_order_items(order.item_list or "[]")
+        line_items = _order_line_items(db, [str(order.id)])
+    return _invoice_page_html(invoice, restaurant, order, line_items)
 
-    restaurants = restaurant_crud.get_multi(db, page=1, per_page=1)
-    restaurant = restaurants[0] if restaurants else None
 
+def _invoice_page_html(invoice, restaurant, order, line_items: List[dict]) -> str:
+    """The invoice page for already loaded rows; no database access."""
     logo_url = getattr(restaurant, "logo_url", None) or ""
     address = getattr(restaurant, "restaurant_address", None) or ""
     phone = getattr(restaurant, "restaurant_phone", None) or ""
@@ -1160,6 +1863,7 @@ def invoice_view_page(invoice_id: str, db: get_db):
     if abs(total_computed - total) > 0.01:
         total_computed = total
 
+    # rows and contact lines stay f-strings: a template render per row costs twice as much
     rows_html = "".join(
         f"""
         <tr>
@@ -1189,7 +1893,10 @@ def invoice_view_page(invoice_id: str, db: get_db):
     if website:
         contact_lines.append(f'<span class="contact-line"><span class="icon">&#127760;</span> {html.escape(website)}</span>')
     elif address:
-        contact_lines.append(f'<span class="contact-line"><span class="icon">&#127760;</span> www.restaurant.com</span>')
+        contact_lines.append(
+            '<span class="contact-line"><span class="icon">&#127760;</span> '
+            "www.restaurant.com</span>"
+        )
     if email:
         contact_lines.append(f'<span class="contact-line"><span class="icon">&#9993;</span> {html.escape(email)}</span>')
     if address:
@@ -1197,101 +1904,41 @@ def invoice_view_page(invoice_id: str, db: get_db):
     contact_html = "".join(contact_lines) if contact_lines else "<span class=\"contact-line\">—</span>"
 
     customer_name_val = (getattr(invoice, "customer_name", "") or "").strip()
-    customer_display = html.escape(customer_name_val) if customer_name_val else f"Table {html.escape(str(order.table_no or ''))}"
+    customer_display = customer_name_val or f"Table {order.table_no or ''}"
     customer_address = ""
 
-    html_content = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>Invoice {html.escape(invoice.invoice_number or "")}</title>
-  <link href="https://fonts.googleapis.com/css2?family=Dancing+Script:wght@500&display=swap" rel="stylesheet">
-  <style>
-    * {{ box-sizing: border-box; }}
-    body {{ font-family: 'Segoe UI', system-ui, sans-serif; margin: 0; padding: 2rem; background: #f5f0e8; color: #3d2f24; }}
-    .invoice {{ max-width: 800px; margin: 0 auto; background: #fdfbf7; padding: 2.5rem; border-radius: 8px; box-shadow: 0 2px 16px rgba(61,47,36,0.06); position: relative; }}
-    .leaf-top {{ position: absolute; top: 1rem; left: 1rem; color: #6b5344; font-size: 1.8rem; opacity: 0.7; }}
-    .leaf-bottom {{ position: absolute; bottom: 1rem; right: 1rem; color: #6b5344; font-size: 1.8rem; opacity: 0.7; }}
-    .header-top {{ display: flex; justify-content: center; align-items: center; gap: 0.75rem; margin-bottom: 1.5rem; }}
-    .logo-img {{ width: 56px; height: 56px; object-fit: contain; border-radius: 50%; }}
-    .logo-placeholder {{ width: 56px; height: 56px; border: 2px solid #6b5344; border-radius: 50%; display: flex; align-items: center; justify-content: center; font-size: 1.2rem; color: #6b5344; }}
-    .logo-text {{ font-weight: 700; font-size: 1.25rem; color: #3d2f24; letter-spacing: 0.02em; }}
-    .header-row {{ display: flex; justify-content: space-between; align-items: flex-start; flex-wrap: wrap; gap: 1rem; margin-bottom: 0.5rem; }}
-    .bill-to {{ font-size: 0.75rem; color: #6b5344; text-transform: uppercase; letter-spacing: 0.08em; margin-bottom: 0.2rem; }}
-    .customer-name {{ font-size: 1.1rem; font-weight: 700; color: #3d2f24; }}
-    .customer-addr {{ font-size: 0.9rem; color: #5c4a3a; }}
-    .inv-meta {{ text-align: right; font-size: 0.9rem; color: #3d2f24; }}
-    .inv-meta p {{ margin: 0.2rem 0; }}
-    h1.invoice-title {{ text-align: center; font-size: 1.6rem; margin: 1.25rem 0; color: #3d2f24; font-weight: 700; letter-spacing: 0.02em; }}
-    table {{ width: 100%; border-collapse: collapse; margin: 1rem 0; }}
-    th {{ text-align: left; padding: 0.5rem 0.4rem; border-bottom: 1px solid #d4cdc4; font-size: 0.8rem; color: #3d2f24; font-weight: 600; text-transform: uppercase; letter-spacing: 0.03em; }}
-    td {{ padding: 0.5rem 0.4rem; border-bottom: 1px solid #e8e2d9; font-size: 0.9rem; color: #3d2f24; }}
-    .summary-wrap {{ margin-top: 1.5rem; display: flex; justify-content: flex-end; }}
-    .summary {{ width: 280px; border-collapse: collapse; font-size: 0.9rem; color: #3d2f24; }}
-    .summary tr {{ border-bottom: 1px solid #e8e2d9; }}
-    .summary td {{ padding: 0.35rem 0; border: none; }}
-    .summary td:first-child {{ padding-right: 1.5rem; }}
-    .summary td:last-child {{ text-align: right; }}
-    .summary .total-row {{ font-weight: 700; font-size: 1rem; border-bottom: none; padding-top: 0.4rem; }}
-    .footer {{ margin-top: 2rem; padding-top: 1.25rem; border-top: 1px solid #e8e2d9; }}
-    .thanks {{ font-family: 'Dancing Script', cursive; font-size: 1.15rem; color: #6b5344; margin-bottom: 0.75rem; }}
-    .contact {{ font-size: 0.85rem; color: #5c4a3a; }}
-    .contact-line {{ display: block; margin: 0.2rem 0; }}
-    .icon {{ margin-right: 0.35rem; color: #6b5344; }}
-    @media print {{ body {{ background: #fff; }} .invoice {{ box-shadow: none; }} }}
-  </style>
-</head>
-<body>
-  <div class="invoice">
-    <span class="leaf-top">&#10047;</span>
-    <div class="header-top">
-      {logo_html}
-      <span class="logo-text">{html.escape(restaurant_display_name)}</span>
-    </div>
-    <div class="header-row">
-      <div>
-        <div class="bill-to">INVOICE TO:</div>
-        <div class="customer-name">{html.escape(customer_display)}</div>
-        <div class="customer-addr">{html.escape(customer_address) or "—"}</div>
-      </div>
-      <div class="inv-meta">
-        <p><strong>INVOICE NO:</strong> {html.escape(invoice.invoice_number or "")}</p>
-        <p><strong>DATE:</strong> {date_str}</p>
-      </div>
-    </div>
-    <h1 class="invoice-title">INVOICE</h1>
-    <table>
-      <thead>
-        <tr>
-          <th>SL NO</th>
-          <th>ITEM DESCRIPTION</th>
-          <th>QUANTITY</th>
-          <th>PRICE</th>
-        </tr>
-      </thead>
-      <tbody>
-        {rows_html}
-      </tbody>
-    </table>
-    <table class="summary">
-      <tr><td>SUB TOTAL</td><td>₹{subtotal:.2f}</td></tr>
-      <tr><td>GST ({gst_percent}%)</td><td>₹{gst_amount:.2f}</td></tr>
-      <tr><td>DISCOUNT ({discount_percent}%)</td><td>-₹{discount_amount:.2f}</td></tr>
-      <tr class="total-row"><td>TOTAL</td><td>₹{total_computed:.2f}</td></tr>
-    </table>
-    <div class="footer">
-      <div class="thanks">Thank you for your recent order!</div>
-      <div class="contact">
-        {contact_html}
-      </div>
-    </div>
-    <span class="leaf-bottom">&#10047;</span>
-  </div>
-</body>
-</html>"""
-    return HTMLResponse(html_content)
+    return invoice_template.render(
+        stylesheet=asset_urls["invoice.css"],
+        invoice_number=html.escape(invoice.invoice_number or ""),
+        invoice_date=date_str,
+        logo_html=logo_html,
+        restaurant_name=html.escape(restaurant_display_name),
+        customer_name=html.escape(customer_display),
+        customer_address=html.escape(customer_address) or "—",
+        rows_html=rows_html,
+        subtotal=f"{subtotal:.2f}",
+        gst_percent=gst_percent,
+        gst_amount=f"{gst_amount:.2f}",
+        discount_percent=discount_percent,
+        discount_amount=f"{discount_amount:.2f}",
+        total=f"{total_computed:.2f}",
+        contact_html=contact_html,
+    )
+
+
+@static_router.get("/static/{asset_name}", include_in_schema=False)
+def static_asset(asset_name: str):
+    """Stylesheets of the invoice and pay pages, by fingerprinted name (see utils/pages.py)."""
+    asset = static_assets.get(asset_name)
+    if asset is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found"
+        )
+    return Response(
+        asset.body,
+        media_type=asset.media_type,
+        headers={"ETag": asset.etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL},
+    )
 
 
 ########################################################
@@ -1357,12 +2004,18 @@ def _qr_image_url(request: Request, payment_id: str) -> str:
     response_class=HTMLResponse,
     include_in_schema=False,
 )
-def pay_page(request: Request, payment_id: str, db: get_db):
+async def pay_page(
+    request: Request, payment_id: str, db_read: get_async_db_read, db: get_async_db
+):
     """
     Integrated payment page: open this URL to show a scannable QR code.
     Share the link with customers (e.g. http://yourserver/pay/{payment_id}) or use in kiosk/tablet.
     """
-    payment = db.query(PaymentModel).filter(PaymentModel.id == payment_id).first()
+    # Customers open this right after the cashier creates the payment, so a replica miss
+    # may just be lag: retry on the primary.
+    payment = await db_read.get(PaymentModel, payment_id) or await db.get(
+        PaymentModel, payment_id
+    )
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1370,34 +2023,13 @@ def pay_page(request: Request, payment_id: str, db: get_db):
         )
     qr_image_url = _qr_image_url(request, payment_id)
     amount = float(payment.amount)
-    html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>Pay &ndash; &#8377;{amount:,.2f}</title>
-  <style>
-    * {{ box-sizing: border-box; }}
-    body {{ font-family: system-ui, sans-serif; margin: 0; padding: 2rem; min-height: 100vh; display: flex; flex-direction: column; align-items: center; justify-content: center; background: #f5f5f5; }}
-    .card {{ background: #fff; border-radius: 12px; box-shadow: 0 2px 12px rgba(0,0,0,0.08); padding: 2rem; text-align: center; max-width: 360px; }}
-    h1 {{ margin: 0 0 0.5rem; font-size: 1.5rem; color: #333; }}
-    .amount {{ font-size: 2rem; font-weight: 700; color: #0d9488; margin-bottom: 1.5rem; }}
-    .qr {{ margin: 0 auto 1rem; display: block; border-radius: 8px; }}
-    p {{ color: #666; margin: 0; font-size: 0.95rem; }}
-  </style>
-</head>
-<body>
-  <div class="card">
-    <h1>Scan to pay</h1>
-    <div class="amount">&#8377;{amount:,.2f}</div>
-    <img class="qr" src="{qr_image_url}" alt="UPI QR code" width="256" height="256" />
-    <p>Scan with any UPI app to pay</p>
-  </div>
-</body> 
-</html>
-"""
-    return HTMLResponse(html)
+    return HTMLResponse(
+        pay_template.render(
+            stylesheet=asset_urls["pay.css"],
+            amount=f"{amount:,.2f}",
+            qr_image_url=html.escape(qr_image_url),
+        )
+    )
 
 
 @payment_router.post(
@@ -1405,12 +2037,21 @@ def pay_page(request: Request, payment_id: str, db: get_db):
     response_model=PaymentResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def create_payment(request: Request, payload: PaymentCreate, db: get_db):
+async def create_payment(
+    request: Request,
+    payload: PaymentCreate,
+    uow: get_async_uow,
+    idem: async_idempotency,
+):
+    if idem.replay is not None:
+        return idem.replay
+    # payment row and first QR commit together; a failed QR step leaves no bare payment
+    db = uow.session
     order_id = payload.order_id
     amount = payload.amount
 
     if payload.invoice_id:
-        invoice = invoice_crud.get(db, id=payload.invoice_id)
+        invoice = await invoice_crud.get_async(db, id=payload.invoice_id)
         if not invoice:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -1426,17 +2067,31 @@ def create_payment(request: Request, payload: PaymentCreate, db: get_db):
             )
         amount = float(amount)
 
-    order = order_crud.get(db, id=order_id)
+    order = await order_crud.get_async(db, id=order_id)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Order not found for this invoice/order.",
         )
-    # Check duplicate payment for this order
-    existing = (
-        db.query(PaymentModel).filter(PaymentModel.order_id == order_id).first()
-    )
-    if existing:
+    # One live payment per order, enforced by the partial unique index on order_id
+    try:
+        payment, inserted = await payment_crud.upsert_async(
+            db,
+            obj_in={
+                "order_id": order_id,
+                "amount": amount,
+                "status": PaymentStatus.PENDING,
+                "retry_count": payload.retry_count or 0,
+                "upi_ref_id": payload.upi_ref_id,
+            },
+            conflict_cols=["order_id"],
+            index_where=PaymentModel.is_deleted == false(),
+            commit=False,
+        )
+    except UpsertConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not inserted:
+        existing = payment
         # Return existing payment with QR so frontend can show it without a second request
         existing_response = PaymentResponse(
             payment_id=str(existing.id),
@@ -1456,22 +2111,12 @@ def create_payment(request: Request, payload: PaymentCreate, db: get_db):
             },
         )
 
-    payment = PaymentModel(
-        order_id=order_id,
-        amount=amount,
-        status=PaymentStatus.PENDING,
-        retry_count=payload.retry_count or 0,
-        upi_ref_id=payload.upi_ref_id,
-    )
-    db.add(payment)
-    db.commit()
-    db.refresh(payment)
     # Generate first QR (linked to the restaurant's UPI_ID so payment credits to the restaurant's account)
     try:
         upi_uri = generate_upi_uri(
             order_id=payment.order_id,
             amount=float(payment.amount),
-            restaurant=restaurant_crud.get_by_merchant_name(
+            restaurant=await restaurant_crud.get_by_merchant_name_async(
                 db, payload.restaurant_name
             ),
         )
@@ -1479,11 +2124,12 @@ def create_payment(request: Request, payload: PaymentCreate, db: get_db):
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
         )
-    qr_code_crud.create(
+    await qr_code_crud.create_async(
         db,
         obj_in={"payment_id": str(payment.id), "qr_data": upi_uri, "is_active": True},
+        commit=False,
     )
-    return PaymentResponse(
+    result = PaymentResponse(
         payment_id=str(payment.id),
         order_id=payment.order_id,
         amount=payment.amount,
@@ -1492,10 +2138,13 @@ def create_payment(request: Request, payload: PaymentCreate, db: get_db):
         upi_ref_id=payment.upi_ref_id,
         qr_image_url=_qr_image_url(request, str(payment.id)),
     )
+    await idem.save_async(db, result, status.HTTP_201_CREATED)
+    await uow.commit()
+    return result
 
 
-def _set_payment_paid_and_persist(
-    db,
+async def _set_payment_paid_and_persist(
+    db: AsyncSession,
     payment: PaymentModel,
     upi_ref_id: str | None = None,
 ) -> None:
@@ -1503,20 +2152,20 @@ def _set_payment_paid_and_persist(
     payment.status = PaymentStatus.PAID
     if upi_ref_id is not None:
         payment.upi_ref_id = upi_ref_id
-    db.query(QRCodeModel).filter(
-        QRCodeModel.payment_id == payment.id,
-        QRCodeModel.is_active == True,
-    ).update({"is_active": False})
+    await db.execute(
+        update(QRCodeModel)
+        .where(QRCodeModel.payment_id == payment.id, QRCodeModel.is_active == true())
+        .values(is_active=False)
+    )
     db.add(payment)
-    db.commit()
-    db.refresh(payment)
+    await db.commit()
 
 
 @payment_router.post(
     "/webhook/payment",
     status_code=status.HTTP_200_OK,
 )
-def payment_webhook(payload: PaymentWebhook, db: get_db):
+async def payment_webhook(payload: PaymentWebhook, db: get_async_db):
     """
     Webhook for payment success: when status=paid, payment is automatically updated to PAID and saved to DB.
     Call this from a payment gateway callback or your own job when you detect payment success.
@@ -1531,15 +2180,13 @@ def payment_webhook(payload: PaymentWebhook, db: get_db):
         return {"ok": True, "message": "Ignored (status is not paid)"}
 
     if payload.payment_id:
-        payment = (
-            db.query(PaymentModel).filter(PaymentModel.id == payload.payment_id).first()
-        )
+        payment = await db.get(PaymentModel, payload.payment_id)
     else:
-        payment = (
-            db.query(PaymentModel)
-            .filter(PaymentModel.order_id == payload.order_id)
+        payment = await db.scalar(
+            select(PaymentModel)
+            .where(PaymentModel.order_id == payload.order_id)
             .order_by(PaymentModel.created_at.desc())
-            .first()
+            .limit(1)
         )
 
     if not payment:
@@ -1555,7 +2202,7 @@ def payment_webhook(payload: PaymentWebhook, db: get_db):
             "message": "Already paid",
         }
 
-    _set_payment_paid_and_persist(db, payment, upi_ref_id=payload.upi_ref_id)
+    await _set_payment_paid_and_persist(db, payment, upi_ref_id=payload.upi_ref_id)
     return {"ok": True, "payment_id": str(payment.id), "payment_status": "paid"}
 
 
@@ -1563,8 +2210,8 @@ def payment_webhook(payload: PaymentWebhook, db: get_db):
     "/{payment_id}",
     response_model=PaymentResponse,
 )
-def get_payment(request: Request, payment_id: str, db: get_db):
-    payment = db.query(PaymentModel).filter(PaymentModel.id == payment_id).first()
+async def get_payment(request: Request, payment_id: str, db: get_async_db_read):
+    payment = await db.get(PaymentModel, payment_id)
 
     if not payment:
         raise HTTPException(
@@ -1583,50 +2230,61 @@ def get_payment(request: Request, payment_id: str, db: get_db):
     )
 
 
-@payment_router.get(
-    "/{payment_id}/qr",
-    response_model=QRCode,
-)
-def get_active_qr(
-    request: Request,
-    payment_id: str,
-    db: get_db,
+async def _get_active_qr_row(db: AsyncSession, payment_id: str) -> QRCodeModel:
+    return await db.scalar(
+        select(QRCodeModel)
+        .where(
+            QRCodeModel.payment_id == payment_id,
+            QRCodeModel.is_active == true(),
+        )
+        .order_by(QRCodeModel.created_at.desc())
+        .limit(1)
+    )
+
+
+async def _payment_with_active_qr(
+    db_read: AsyncSession, db: AsyncSession, payment_id: str
 ):
-    payment = db.query(PaymentModel).filter(PaymentModel.id == payment_id).first()
+    """
+    Load a payment and its active QR from the read session. A miss there may be replica
+    lag right after create_payment, so re-check on the primary before generating a new QR.
+    """
+    payment = await db_read.get(PaymentModel, payment_id)
+    qr = await _get_active_qr_row(db_read, payment_id) if payment else None
+    if qr:
+        return payment, qr
+
+    payment = await db.get(PaymentModel, payment_id)
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Payment not found",
         )
 
-    qr = (
-        db.query(QRCodeModel)
-        .filter(
-            QRCodeModel.payment_id == payment_id,
-            QRCodeModel.is_active == True,
-        )
-        .order_by(QRCodeModel.created_at.desc())
-        .first()
-    )
+    qr = await _get_active_qr_row(db, payment_id)
 
     if not qr:
         # Payment exists but no active QR: create one on the fly
-        db.query(QRCodeModel).filter(
-            QRCodeModel.payment_id == payment_id,
-            QRCodeModel.is_active == True,
-        ).update({"is_active": False})
+        await db.execute(
+            update(QRCodeModel)
+            .where(
+                QRCodeModel.payment_id == payment_id,
+                QRCodeModel.is_active == true(),
+            )
+            .values(is_active=False)
+        )
         try:
             upi_uri = generate_upi_uri(
                 order_id=payment.order_id,
                 amount=float(payment.amount),
-                restaurant=restaurant_crud.get(db, id=payment.order_id),
+                restaurant=await restaurant_crud.get_async(db, id=payment.order_id),
             )
         except ValueError as e:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail=str(e),
             )
-        qr = qr_code_crud.create(
+        qr = await qr_code_crud.create_async(
             db,
             obj_in={
                 "payment_id": str(payment.id),
@@ -1634,6 +2292,20 @@ def get_active_qr(
                 "is_active": True,
             },
         )
+    return payment, qr
+
+
+@payment_router.get(
+    "/{payment_id}/qr",
+    response_model=QRCode,
+)
+async def get_active_qr(
+    request: Request,
+    payment_id: str,
+    db_read: get_async_db_read,
+    db: get_async_db,
+):
+    _, qr = await _payment_with_active_qr(db_read, db, payment_id)
 
     return QRCode(
         qr_code_id=str(qr.id),
@@ -1651,9 +2323,10 @@ def get_active_qr(
         200: {"content": {"image/png": {}}, "description": "QR code image (PNG)"}
     },
 )
-def get_payment_qr_image(
+async def get_payment_qr_image(
     payment_id: str,
-    db: get_db,
+    db_read: get_async_db_read,
+    db: get_async_db,
     size: int = 10,
     border: int = 2,
 ):
@@ -1661,50 +2334,14 @@ def get_payment_qr_image(
     Return a scannable QR code image (PNG) for the payment's active UPI link.
     Use in <img src="/.../qr/image"> or download. Size and border are optional query params.
     """
-    payment = db.query(PaymentModel).filter(PaymentModel.id == payment_id).first()
-    if not payment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Payment not found",
-        )
-
-    qr = (
-        db.query(QRCodeModel)
-        .filter(
-            QRCodeModel.payment_id == payment_id,
-            QRCodeModel.is_active == True,
-        )
-        .order_by(QRCodeModel.created_at.desc())
-        .first()
-    )
-
-    if not qr:
-        db.query(QRCodeModel).filter(
-            QRCodeModel.payment_id == payment_id,
-            QRCodeModel.is_active == True,
-        ).update({"is_active": False})
-        try:
-            upi_uri = generate_upi_uri(
-                order_id=payment.order_id,
-                amount=float(payment.amount),
-                restaurant=restaurant_crud.get(db, id=payment.order_id),
-            )
-        except ValueError as e:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=str(e),
-            )
-        qr = qr_code_crud.create(
-            db,
-            obj_in={
-                "payment_id": str(payment.id),
-                "qr_data": upi_uri,
-                "is_active": True,
-            },
-        )
-
-    png_bytes = generate_qr_png(
-        qr.qr_data, size=min(max(size, 1), 20), border=min(max(border, 0), 10)
+    _, qr = await _payment_with_active_qr(db_read, db, payment_id)
+
+    # PNG encoding is CPU-bound; keep it off the event loop
+    png_bytes = await run_in_threadpool(
+        generate_qr_png,
+        qr.qr_data,
+        size=min(max(size, 1), 20),
+        border=min(max(border, 0), 10),
     )
     return Response(content=png_bytes, media_type="image/png")
 
@@ -1713,8 +2350,9 @@ def get_payment_qr_image(
     "/{payment_id}/revive",
     response_model=PaymentReviveResponse,
 )
-def revive_payment(request: Request, payment_id: str, db: get_db):
-    payment = db.query(PaymentModel).filter(PaymentModel.id == payment_id).first()
+async def revive_payment(request: Request, payment_id: str, uow: get_async_uow):
+    db = uow.session
+    payment = await db.get(PaymentModel, payment_id)
 
     if not payment:
         raise HTTPException(
@@ -1729,17 +2367,18 @@ def revive_payment(request: Request, payment_id: str, db: get_db):
         )
 
     # Deactivate old QRs
-    db.query(QRCodeModel).filter(
-        QRCodeModel.payment_id == payment.id,
-        QRCodeModel.is_active == True,
-    ).update({"is_active": False})
+    await db.execute(
+        update(QRCodeModel)
+        .where(QRCodeModel.payment_id == payment.id, QRCodeModel.is_active == true())
+        .values(is_active=False)
+    )
 
     # Generate new QR (linked to your UPI_VPA)
     try:
         upi_uri = generate_upi_uri(
             order_id=payment.order_id,
             amount=float(payment.amount),
-            restaurant=restaurant_crud.get(db, id=payment.order_id),
+            restaurant=await restaurant_crud.get_async(db, id=payment.order_id),
         )
     except ValueError as e:
         raise HTTPException(
@@ -1752,12 +2391,11 @@ def revive_payment(request: Request, payment_id: str, db: get_db):
         qr_data=upi_uri,
         is_active=True,
     )
-    new_qr = qr_code_crud.create(db, obj_in=new_qr)
+    new_qr = await qr_code_crud.create_async(db, obj_in=new_qr, commit=False)
     payment.retry_count += 1
     payment.status = PaymentStatus.PENDING
     db.add(payment)
-    db.commit()
-    db.refresh(payment)
+    await uow.commit()
 
     return PaymentReviveResponse(
         payment_id=str(payment.id),
@@ -1777,10 +2415,10 @@ def revive_payment(request: Request, payment_id: str, db: get_db):
     response_model=PaymentResponse,
     status_code=status.HTTP_200_OK,
 )
-def mark_payment_paid(
+async def mark_payment_paid(
     request: Request,
     payment_id: str,
-    db: get_db,
+    db: get_async_db,
     body: PaymentMarkPaid | None = Body(None),
 ):
     """
@@ -1789,7 +2427,7 @@ def mark_payment_paid(
     Optionally pass upi_ref_id (e.g. UPI transaction reference) for your records.
     Updates the payment row in the database and deactivates its QRs.
     """
-    payment = db.query(PaymentModel).filter(PaymentModel.id == payment_id).first()
+    payment = await db.get(PaymentModel, payment_id)
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1801,7 +2439,7 @@ def mark_payment_paid(
             detail="Payment is already marked as paid",
         )
 
-    _set_payment_paid_and_persist(
+    await _set_payment_paid_and_persist(
         db, payment, upi_ref_id=body.upi_ref_id if body else None
     )
 
@@ -1814,3 +2452,36 @@ def mark_payment_paid(
         upi_ref_id=payment.upi_ref_id,
         qr_image_url=None,
     )
+
+
+########################################################
+# Admin APIs
+########################################################
+
+
+@admin_router.get("/admin/db/pool", status_code=status.HTTP_200_OK)
+def get_db_pool_status(user_db: admin_user):
+    """Live connection pool counters (checked out, overflow, checkout waits) per engine."""
+    return pool_status()
+
+
+@admin_router.get("/admin/db/queries", status_code=status.HTTP_200_OK)
+def get_db_query_stats(
+    user_db: admin_user, limit: int = 50, order_by: str = "total_ms"
+):
+    """
+    Aggregated SQL statistics per statement fingerprint: call count, latency histogram,
+    calling routes and the last sampled EXPLAIN plan. order_by: total_ms, count, max_ms, avg_ms.
+    """
+    if order_by not in ("total_ms", "count", "max_ms", "avg_ms", "slow_count"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="order_by must be one of total_ms, count, max_ms, avg_ms, slow_count",
+        )
+    return query_stats.table(limit=min(max(limit, 1), 500), order_by=order_by)
+
+
+@admin_router.delete("/admin/db/queries", status_code=status.HTTP_204_NO_CONTENT)
+def reset_db_query_stats(user_db: admin_user):
+    query_stats.reset()
+    return None
@@ -1,8 +1,8 @@
 from typing import Any, Dict, Union
 
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session
 from sqlalchemy import func
+from sqlalchemy.orm import Session
 
 from src.user.models import User
 from src.user.schemas import UserBase, UserUpdate
@@ -14,7 +14,13 @@ class UserCRUD(CRUDBase[User, UserBase, UserUpdate]):
     def get_by_email(self, db: Session, email: str) -> User:
         if not email:
             return None
-        return db.query(User).filter(func.lower(User.email) == email.strip().lower()).first()
+        # soft-deleted users still own their email (unique), so signup must see them
+        return (
+            db.query(User)
+            .execution_options(include_deleted=True)
+            .filter(func.lower(User.email) == email.strip().lower())
+            .first()
+        )
 
     def create(self, db: Session, *, obj_in: UserBase) -> User:
         obj_in_data: dict = obj_in.model_dump(exclude_unset=True) if hasattr(obj_in, "model_dump") else jsonable_encoder(obj_in, exclude_unset=True)
@@ -1,20 +1,13 @@
+import logging
 from datetime import datetime, timedelta
 from enum import Enum
 
-import logging
-
 import jwt
 from passlib.context import CryptContext
-from sqlalchemy import (
-    Column,
-    Integer,
-    String,
-    ForeignKey,
-    Float,
-    Text,
-    DateTime,
-    Enum as SQLEnum,
-)
+from sqlalchemy import Column, DateTime
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy import Float, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.sql import text
 from sqlalchemy.sql.sqltypes import Boolean
 
 # Prefer Argon2 (matches existing DB $argon2id$ hashes); fallback to pbkdf2 if argon2 not installed
@@ -25,7 +18,7 @@ except Exception:
     pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
 from src.config import Config
-from utils.db.base import ModelBase
+from utils.db.base import ModelBase, UUIDStr
 
 
 class UserRoles(str, Enum):
@@ -46,9 +39,20 @@ class PaymentStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+class OrderState(str, Enum):
+    PENDING = "pending"
+    PREPARING = "preparing"
+    READY = "ready"
+    CANCELLED = "cancelled"
+
+
+# Kitchen view: orders still to be worked on
+ACTIVE_ORDER_STATES = (OrderState.PENDING, OrderState.PREPARING)
+
+
 class User(ModelBase):
-    firstname = Column(String, index=True)
-    lastname = Column(String, index=True)
+    firstname = Column(String)
+    lastname = Column(String)
     image_url = Column(String, nullable=True)
 
     email = Column(String, unique=True)
@@ -64,6 +68,9 @@ class User(ModelBase):
     is_active = Column(Boolean, default=True)
     is_banned = Column(Boolean, default=False)
 
+    # login/signup look users up by lower(email)
+    __table_args__ = (Index("ix_user_email_lower", func.lower(email)),)
+
     def __repr__(self):
         return f"""
             User INFO:
@@ -105,59 +112,123 @@ class User(ModelBase):
 class Restaurant(ModelBase):
     upi_merchant_name = Column(String, unique=True, index=True)
     upi_id = Column(String, unique=True, index=True)
-    restaurant_address = Column(String, index=True)
-    restaurant_phone = Column(String, index=True)
-    restaurant_email = Column(String, index=True)
+    restaurant_address = Column(String)
+    restaurant_phone = Column(String)
+    restaurant_email = Column(String)
     logo_url = Column(String, nullable=True)
 
 class Table(ModelBase):
-    table_no = Column(Integer, index=True)
+    table_no = Column(Integer)
 
 
 class Menu(ModelBase):
-    menu_id = Column(String, index=True)
-    item_list = Column(String, index=True)
-    price = Column(Integer, index=True)
-    quantity = Column(String, index=True)
-    category_name = Column(String, index=True)
-    category_id = Column(String, index=True)
+    menu_id = Column(String)
+    item_list = Column(String)
+    price = Column(Integer)
+    quantity = Column(String)
+    category_name = Column(String)
+    category_id = Column(String)
+
+    # keyset pagination order for CRUDBase.get_multi_keyset
+    __table_args__ = (
+        Index("ix_menu_created_at_id", "created_at", "id"),
+        Index(
+            "ix_menu_menu_id_not_deleted",
+            "menu_id",
+            postgresql_where=text("is_deleted = false"),
+        ),
+    )
 
 
 class Category(ModelBase):
-    category_id = Column(String, index=True)
-    category_name = Column(String, index=True)
+    category_id = Column(String)
+    category_name = Column(String)
 
 
 class MenuItem(ModelBase):
-    item_name = Column(String, index=True)
-    item_price = Column(Integer, index=True)
+    item_name = Column(String)
+    item_price = Column(Integer)
     # Link each menu item to a specific category
-    category_id = Column(String, ForeignKey("category.id"))
+    category_id = Column(UUIDStr, ForeignKey("category.id"))
 
 
 class Order(ModelBase):
-    item_list = Column(String, index=True)
-    quantity = Column(Integer, index=True)
+    # JSON string as sent by the client, returned as-is; order_item holds the parsed lines
+    item_list = Column(String)
+    quantity = Column(Integer)
+    # Source of truth for an order's status; written together with order_status.status
+    status = Column(
+        SQLEnum(OrderState),
+        default=OrderState.PENDING,
+        server_default=OrderState.PENDING.name,
+        nullable=False,
+    )
+    # Legacy string flags, kept in sync with status for older readers
     order_pending = Column(String, default="false")
     order_done = Column(String, default="false")
     order_cancel = Column(String, default="false")
-    table_no = Column(
-        Integer, index=True
-    )  # references table.table_no; no FK (table_no not unique)
+    table_no = Column(Integer)  # references table.table_no; no FK (table_no not unique)
+
+    __table_args__ = (
+        Index("ix_order_created_at_id", "created_at", "id"),
+        Index(
+            "ix_order_status_created_at_not_deleted",
+            "status",
+            "created_at",
+            postgresql_where=text("is_deleted = false"),
+        ),
+        Index(
+            "ix_order_table_no_created_at_not_deleted",
+            "table_no",
+            "created_at",
+            postgresql_where=text("is_deleted = false"),
+        ),
+    )
+
+
+class OrderItem(ModelBase):
+    """One line of an order; invoice subtotals are SUM(qty * unit_price) over these rows."""
+
+    order_id = Column(UUIDStr, ForeignKey("order.id"), nullable=False)
+    line_no = Column(Integer, nullable=False)  # position in the order's item_list
+    menu_item_id = Column(UUIDStr, ForeignKey("menu_item.id"), nullable=True)
+    name = Column(String, nullable=False)
+    qty = Column(Integer, nullable=False)
+    unit_price = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_order_item_order_id_line_no_not_deleted",
+            "order_id",
+            "line_no",
+            postgresql_where=text("is_deleted = false"),
+        ),
+    )
 
 
 class OrderStatus(ModelBase):
-    order_id = Column(String, ForeignKey("order.id"))
-    status = Column(String, index=True)
+    order_id = Column(UUIDStr, ForeignKey("order.id"))
+    status = Column(String)
+
+    # one live status row per order; conflict target for the upsert in update_order_status
+    __table_args__ = (
+        Index(
+            "uq_order_status_order_id",
+            "order_id",
+            unique=True,
+            postgresql_where=text("is_deleted = false"),
+        ),
+    )
 
 
 class Invoice(ModelBase):
     order_id = Column(
-        String, ForeignKey("order.id", ondelete="RESTRICT"), nullable=False
+        UUIDStr, ForeignKey("order.id", ondelete="RESTRICT"), nullable=False
     )
-    order_ids = Column(Text, nullable=True)  # JSON array of order IDs when merging multiple orders for same table
+    # JSON array of order IDs when merging multiple orders for same table
+    order_ids = Column(Text, nullable=True)
     invoice_number = Column(String(50), unique=True, index=True, nullable=False)
-    invoice_date = Column(DateTime, default=datetime.now, nullable=False)
+    invoice_date = Column(DateTime, server_default=func.now(), nullable=False)
     total_amount = Column(Float, nullable=False)
     gst_percent = Column(Float, default=0.0, nullable=False)
     discount_percent = Column(Float, default=0.0, nullable=False)
@@ -165,19 +236,54 @@ class Invoice(ModelBase):
         SQLEnum(PaymentStatus), default=PaymentStatus.PENDING, nullable=False
     )
     notes = Column(Text, nullable=True)
-    customer_name = Column(String(255), nullable=False)  # optional; shown in "INVOICE TO:" instead of table when set
+    # optional; shown in "INVOICE TO:" instead of table when set
+    customer_name = Column(String(255), nullable=False)
+
+    __table_args__ = (Index("ix_invoice_created_at_id", "created_at", "id"),)
+
+
+# Block-allocated invoice numbers (src.user.utils.invoice_numbers)
+class InvoiceNumberCounter(ModelBase):
+    """Invoice numbering: last number issued or reserved per period (financial year or "")."""
+
+    period = Column(String(20), nullable=False, unique=True)
+    last_value = Column(Integer, nullable=False)
+
+
+class InvoiceOrder(ModelBase):
+    """Order billed on an invoice; order_id/order_ids on invoice are kept for old readers."""
+
+    invoice_id = Column(UUIDStr, ForeignKey("invoice.id"), nullable=False)
+    order_id = Column(UUIDStr, ForeignKey("order.id"), nullable=False)
+
+    __table_args__ = (
+        # an order is on at most one live invoice; also serves the uninvoiced anti-join
+        Index(
+            "uq_invoice_order_order_id",
+            "order_id",
+            unique=True,
+            postgresql_where=text("is_deleted = false"),
+        ),
+        Index(
+            "ix_invoice_order_invoice_id_not_deleted",
+            "invoice_id",
+            postgresql_where=text("is_deleted = false"),
+        ),
+    )
 
 
 class Stock(ModelBase):
-    name = Column(String, index=True)
-    quantity = Column(Float, index=True)
-    unit_of_measure = Column(String, index=True)
-    cost_per_unit = Column(Float, index=True)
+    name = Column(String)
+    quantity = Column(Float)
+    unit_of_measure = Column(String)
+    cost_per_unit = Column(Float)
+
+    __table_args__ = (Index("ix_stock_created_at_id", "created_at", "id"),)
 
 
 class Payment(ModelBase):
     order_id = Column(
-        String, ForeignKey("order.id", ondelete="RESTRICT"), nullable=False
+        UUIDStr, ForeignKey("order.id", ondelete="RESTRICT"), nullable=False
     )
     amount = Column(Float, nullable=False)
 
@@ -190,12 +296,46 @@ class Payment(ModelBase):
     upi_ref_id = Column(String, nullable=True)
     retry_count = Column(Integer, default=0)
 
+    # one live payment per order; conflict target for the insert in create_payment
+    __table_args__ = (
+        Index(
+            "uq_payment_order_id",
+            "order_id",
+            unique=True,
+            postgresql_where=text("is_deleted = false"),
+        ),
+    )
+
 
 class QRCode(ModelBase):
     payment_id = Column(
-        String,
+        UUIDStr,
         ForeignKey("payment.id", ondelete="CASCADE"),
         nullable=False,
     )
     qr_data = Column(String, nullable=False)  # UPI URI
     is_active = Column(Boolean, default=True)
+
+    # newest active QR for a payment (_get_active_qr_row)
+    __table_args__ = (
+        Index(
+            "ix_qr_code_payment_id_created_at_active",
+            "payment_id",
+            "created_at",
+            postgresql_where=text("is_active = true AND is_deleted = false"),
+        ),
+    )
+
+
+class IdempotencyKey(ModelBase):
+    """Stored response of a create request sent with an Idempotency-Key header."""
+
+    # "<route> <sha256 of the caller and the client's key>"
+    key = Column(String(300), nullable=False, unique=True)
+    request_hash = Column(String(64), nullable=False)
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+
+    # expired keys are deleted by the background purge
+    __table_args__ = (Index("ix_idempotency_key_expires_at", "expires_at"),)
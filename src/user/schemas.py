@@ -1,14 +1,13 @@
-from re import U
-from typing import Optional
 import uuid
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from datetime import datetime
 from decimal import Decimal
-from typing import List
-from src.user.models import UserRoles
-from utils.schemas.base import BaseSchema
 from enum import Enum
-from datetime import datetime
+from typing import List, Optional
 
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from src.user.models import UserRoles
+from utils.schemas.base import BaseSchema
 
 ########################################################
 # Restaurant Schemas
@@ -75,6 +74,23 @@ class Token(BaseModel):
     token: str
 
 
+########################################################
+# Bulk Schemas
+########################################################
+
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[str]
+
+
+class BulkDeleteResponse(BaseModel):
+    deleted: int
+
+
+class BulkUpdateResponse(BaseModel):
+    updated: int
+
+
 ########################################################
 # Table Schemas
 ########################################################
@@ -85,6 +101,11 @@ class Table(BaseModel):
     table_no: int
 
 
+class TableBulkUpdate(BaseModel):
+    table_id: str
+    table_no: int
+
+
 ########################################################
 # Category Schemas
 ########################################################
@@ -176,6 +197,25 @@ class OrderUpdate(BaseModel):
     table_no: str
 
 
+class OrderBulkUpdate(BaseModel):
+    """One row of PUT /bulk_update_order; unset fields are left unchanged."""
+
+    order_id: str
+    item_list: Optional[str] = None
+    quantity: Optional[int] = None
+
+
+class OrderItemCreate(BaseModel):
+    """One order_item row, parsed from an order's item_list."""
+
+    order_id: str
+    line_no: int
+    menu_item_id: Optional[str] = None
+    name: str
+    qty: int
+    unit_price: float
+
+
 class OrderResponse(BaseModel):
     """Response for GET /get_orders and GET /get_order_by_id. Matches model fields."""
 
@@ -185,6 +225,20 @@ class OrderResponse(BaseModel):
     table_id: str  # table_no as string
 
 
+class OrderBatchError(BaseModel):
+    """An order of a POST /create_orders batch that was not created; index is its position."""
+
+    index: int
+    detail: str
+
+
+class OrderBatchResponse(BaseModel):
+    """Result of POST /create_orders: the created orders and the rejected ones."""
+
+    created: List[OrderResponse]
+    errors: List[OrderBatchError]
+
+
 # class kitchen_view(BaseModel):
 #     order_id: Order
 #     item_list: list[Order]
@@ -234,6 +288,10 @@ class StockUpdate(BaseModel):
     cost_per_unit: Optional[float] = None
 
 
+class StockBulkUpdate(StockUpdate):
+    id: str
+
+
 class Stock(StockBase):
     id: str = uuid.uuid4()
     created_at: Optional[datetime] = None
@@ -273,9 +331,10 @@ class InvoiceCreate(BaseModel):
     )  # ignore extra fields so client typos don't cause 422
 
     order_id: str
-    invoice_number: str
-    invoice_date: datetime
-    total_amount: Optional[float] = None  # auto-computed from order items + GST - discount if not provided
+    invoice_number: Optional[str] = None  # allocated if not provided
+    invoice_date: Optional[datetime]  # blank means now, taken from the database clock
+    # auto-computed from order items + GST - discount if not provided
+    total_amount: Optional[float] = None
     gst_percent: float = 0.0
     discount_percent: float = 0.0
     payment_status: PaymentStatus = PaymentStatus.PENDING
@@ -290,7 +349,7 @@ class InvoiceCreate(BaseModel):
         if isinstance(v, str):
             s = v.strip()
             if not s:
-                return datetime.now()
+                return None
             # Accept date-only "YYYY-MM-DD" from frontend
             if len(s) == 10 and s[4] == "-" and s[7] == "-":
                 return datetime.strptime(s, "%Y-%m-%d")
@@ -315,7 +374,7 @@ class InvoiceCreate(BaseModel):
 class InvoiceCreateForTable(BaseModel):
     """Create a single merged invoice for all orders of a table."""
     table_no: int
-    invoice_number: Optional[str] = None  # auto-generated if not provided
+    invoice_number: Optional[str] = None  # allocated if not provided
     invoice_date: Optional[datetime] = None
     gst_percent: float = 0.0
     discount_percent: float = 0.0
@@ -407,7 +466,9 @@ class QRCode(BaseModel):
     payment_id: str
     qr_data: str = Field(
         ...,
-        description="Full UPI payment URI (e.g. upi://pay?pa=...&am=...). Use this string as-is when generating the QR image; do not prepend your server URL (127.0.0.1:8000).",
+        description="Full UPI payment URI (e.g. upi://pay?pa=...&am=...). Use this string "
+        "as-is when generating the QR image; do not prepend your server URL "
+        "(127.0.0.1:8000).",
     )
     is_active: bool
     qr_image_url: Optional[str] = (
@@ -425,7 +486,10 @@ class PaymentReviveResponse(BaseModel):
 
 
 class PaymentWebhook(BaseModel):
-    """Payload for payment success webhook. Send payment_id or order_id; when status=paid we update DB."""
+    """
+    Payload for payment success webhook. Send payment_id or order_id; when status=paid we
+    update DB.
+    """
 
     payment_id: Optional[str] = None
     order_id: Optional[str] = None
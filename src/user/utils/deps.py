@@ -2,12 +2,13 @@ from typing import Annotated, Tuple
 
 import jwt
 from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.config import Config
 from src.user.crud import user_crud
 from src.user.models import AuthProvider, User
-from utils.db.session import get_db
+from utils.db.session import get_async_db, get_db
 
 
 def _authenticated(authorization: str = Header(None, alias="Authorization")):
@@ -55,8 +56,41 @@ def _authenticated_user(
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid token")
 
 
+async def _authenticated_user_async(
+    db: get_async_db, authorization: str = Header(None, alias="Authorization")
+) -> Tuple[User, AsyncSession]:
+    try:
+        user = None
+        if authorization:
+            payload = jwt.decode(
+                authorization.split()[1],
+                Config.JWT_SECRET_KEY,
+                algorithms=[Config.JWT_ALGORITHM],
+            )
+            user_id = payload["id"]
+            if not user_id:
+                raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid token")
+
+            user = await user_crud.get_async(db, id=user_id)
+            if not user:
+                raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid User")
+        else:
+            raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Authorization not found")
+
+        return user, db
+
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Token expired")
+
+    except jwt.InvalidTokenError:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid token")
+
+
 is_authorized = Annotated[bool, Depends(_authenticated)]
 authenticated_user = Annotated[Tuple[User, Session], Depends(_authenticated_user)]
+async_authenticated_user = Annotated[
+    Tuple[User, AsyncSession], Depends(_authenticated_user_async)
+]
 
 
 def _is_authorized_for(roles: list):
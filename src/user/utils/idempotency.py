@@ -0,0 +1,300 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Annotated, Any, NamedTuple, Optional, Tuple
+
+import jwt
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.config import Config
+from src.user.models import IdempotencyKey
+from utils.crud.base import CRUDBase, UpsertConflictError
+from utils.db.session import AsyncSessionLocal, get_async_uow, get_uow
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+# set on responses replayed from a stored result
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+PURGE_BATCH_SIZE = 1000
+# pg_try_advisory_xact_lock key held by whichever worker is purging a batch
+PURGE_LOCK_KEY = 0x1DE4_9E7C
+
+idempotency_key_crud = CRUDBase(IdempotencyKey)
+
+
+class _StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: Optional[int]
+    body: Optional[str]
+
+
+class _ResponseCache:
+    """
+    LRU of committed responses by key, so a replay is answered without touching the DB.
+    Entries expire IDEMPOTENCY_TTL_SECONDS after caching on the monotonic clock, a little
+    before the row's expires_at, which the database sets from its own now().
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, _StoredResponse]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[_StoredResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            deadline, stored = entry
+            if deadline <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return stored
+
+    def put(self, key: str, stored: _StoredResponse):
+        deadline = time.monotonic() + Config.IDEMPOTENCY_TTL_SECONDS
+        with self._lock:
+            self._entries[key] = (deadline, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+response_cache = _ResponseCache(Config.IDEMPOTENCY_CACHE_SIZE)
+
+
+class Idempotency:
+    """
+    Idempotency-Key handling for one request. Without the header every method is a no-op.
+
+    With it, the dependency either sets replay (the original response, for the handler to
+    return as-is) or claims the key by inserting its row in the request's transaction. A
+    concurrent request with the same key then blocks on the unique index until the first
+    one finishes, and replays its result. The handler calls save() before committing, so
+    the stored response commits or rolls back together with the work it describes; error
+    responses are never stored and a retry runs again.
+    """
+
+    def __init__(self, key: Optional[str], request_hash: str):
+        self.key = key
+        self.request_hash = request_hash
+        self.replay: Optional[JSONResponse] = None
+
+    def _claim_values(self) -> dict:
+        # expiry comes from the database clock, like every other timestamp column
+        return {
+            "key": self.key,
+            "request_hash": self.request_hash,
+            "expires_at": func.now()
+            + timedelta(seconds=Config.IDEMPOTENCY_TTL_SECONDS),
+        }
+
+    def _use(self, stored: _StoredResponse):
+        if stored.request_hash != self.request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"{IDEMPOTENCY_KEY_HEADER} was already used for a different request",
+            )
+        if stored.body is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"A request with this {IDEMPOTENCY_KEY_HEADER} is still in progress",
+            )
+        self.replay = JSONResponse(
+            content=json.loads(stored.body),
+            status_code=stored.status_code,
+            headers={IDEMPOTENT_REPLAYED_HEADER: "true"},
+        )
+
+    def _replay_row(self, row: IdempotencyKey):
+        self._use(
+            _StoredResponse(row.request_hash, row.response_status, row.response_body)
+        )
+
+    def _take_over_stmt(self):
+        """Reclaim the key if its row has expired; matches nothing while it is live."""
+        return (
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.key == self.key, IdempotencyKey.expires_at <= func.now()
+            )
+            .values(response_status=None, response_body=None, **self._claim_values())
+            .execution_options(synchronize_session=False)
+        )
+
+    def claim(self, db: Session):
+        try:
+            row, inserted = idempotency_key_crud.upsert(
+                db, obj_in=self._claim_values(), conflict_cols=["key"], commit=False
+            )
+        except UpsertConflictError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        if not inserted and not db.execute(self._take_over_stmt()).rowcount:
+            self._replay_row(row)
+
+    async def claim_async(self, db: AsyncSession):
+        try:
+            row, inserted = await idempotency_key_crud.upsert_async(
+                db, obj_in=self._claim_values(), conflict_cols=["key"], commit=False
+            )
+        except UpsertConflictError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        if not inserted and not (await db.execute(self._take_over_stmt())).rowcount:
+            self._replay_row(row)
+
+    def _save_stmt(self, result: Any, status_code: int):
+        body = json.dumps(jsonable_encoder(result))
+        stmt = (
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == self.key)
+            .values(response_status=status_code, response_body=body)
+            .execution_options(synchronize_session=False)
+        )
+        return stmt, _StoredResponse(self.request_hash, status_code, body)
+
+    def _cache_after_commit(self, session: Session, stored: _StoredResponse):
+        key = self.key
+        event.listen(
+            session,
+            "after_commit",
+            lambda _session: response_cache.put(key, stored),
+            once=True,
+        )
+
+    def save(self, db: Session, result: Any, status_code: int):
+        """Store result as the response for this key; commits with the caller's transaction."""
+        if self.key is None:
+            return
+        stmt, stored = self._save_stmt(result, status_code)
+        db.execute(stmt)
+        self._cache_after_commit(db, stored)
+
+    async def save_async(self, db: AsyncSession, result: Any, status_code: int):
+        if self.key is None:
+            return
+        stmt, stored = self._save_stmt(result, status_code)
+        await db.execute(stmt)
+        self._cache_after_commit(db.sync_session, stored)
+
+
+def _principal(authorization: Optional[str]) -> str:
+    """
+    Who a key belongs to: the user id of a valid token, so a retry with a refreshed token
+    still replays, else the raw Authorization header. Requests without one share a scope.
+    """
+    if not authorization:
+        return ""
+    try:
+        payload = jwt.decode(
+            authorization.split()[1],
+            Config.JWT_SECRET_KEY,
+            algorithms=[Config.JWT_ALGORITHM],
+        )
+        return f"user {payload['id']}"
+    except (jwt.InvalidTokenError, IndexError, KeyError):
+        return f"authorization {authorization}"
+
+
+async def _request_idempotency(
+    request: Request,
+    key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+) -> Idempotency:
+    if key is None:
+        return Idempotency(None, "")
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_KEY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters",
+        )
+    route = f"{request.method} {request.url.path}"
+    digest = hashlib.sha256(route.encode() + b"\n" + await request.body())
+    # scoped to the caller, so one client cannot replay another's response by its key
+    scoped = hashlib.sha256(f"{_principal(authorization)}\n{key}".encode())
+    idem = Idempotency(f"{route} {scoped.hexdigest()}", digest.hexdigest())
+    stored = response_cache.get(idem.key)
+    if stored is not None:
+        idem._use(stored)
+    return idem
+
+
+request_idempotency = Annotated[Idempotency, Depends(_request_idempotency)]
+
+
+async def _idempotency(idem: request_idempotency, uow: get_uow) -> Idempotency:
+    if idem.key is not None and idem.replay is None:
+        await run_in_threadpool(idem.claim, uow.session)
+    return idem
+
+
+async def _idempotency_async(
+    idem: request_idempotency, uow: get_async_uow
+) -> Idempotency:
+    if idem.key is not None and idem.replay is None:
+        await idem.claim_async(uow.session)
+    return idem
+
+
+# For handlers using get_uow / get_async_uow; shares their session and transaction
+idempotency = Annotated[Idempotency, Depends(_idempotency)]
+async_idempotency = Annotated[Idempotency, Depends(_idempotency_async)]
+
+
+async def purge_expired_keys() -> int:
+    """
+    Delete expired idempotency keys in short batches; returns how many were removed. Each
+    batch holds an advisory lock, and a worker that finds it taken stops, leaving the rest
+    of the sweep to whoever holds it.
+    """
+    purged = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            if not await db.scalar(
+                select(func.pg_try_advisory_xact_lock(PURGE_LOCK_KEY))
+            ):
+                await db.rollback()
+                return purged
+            expired = (
+                select(IdempotencyKey.id)
+                .where(IdempotencyKey.expires_at < func.now())
+                .limit(PURGE_BATCH_SIZE)
+            )
+            result = await db.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.id.in_(expired.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            purged += result.rowcount
+            if result.rowcount < PURGE_BATCH_SIZE:
+                return purged
+
+
+async def run_purge_loop():
+    """
+    Background sweep started from src.main. Every worker runs one; the advisory lock in
+    purge_expired_keys keeps them from deleting the same rows at the same time.
+    """
+    while True:
+        await asyncio.sleep(Config.IDEMPOTENCY_PURGE_INTERVAL_SECONDS)
+        try:
+            purged = await purge_expired_keys()
+            if purged:
+                logger.info("event=idempotency_keys_purged count=%d", purged)
+        except Exception as e:
+            logger.warning("event=idempotency_purge_failed error=%s", e)
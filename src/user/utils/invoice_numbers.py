@@ -0,0 +1,118 @@
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.orm import Session
+
+from src.config import Config
+from src.user.models import InvoiceNumberCounter
+from utils.db.base import str_uuid
+from utils.db.pool import engine_options
+
+
+class InvoiceNumberAllocator:
+    """
+    Hands out invoice numbers such as INV-2026-27-000123 (prefix, financial year, zero
+    padded serial), so invoice creation never collides on invoice_number.
+
+    Both modes count per period in invoice_number_counter, so the serial restarts with
+    each financial year either way. Default mode reserves block_size numbers at a time by
+    advancing the period's row in a transaction of its own and serves them from memory,
+    so most invoices cost no query. Numbers are unique, but a worker restart or a year
+    end leaves the rest of a block unused, and concurrent workers interleave. Gapless
+    mode instead increments the row inside the caller's transaction: a rollback returns
+    the number, at the price of serialising invoice creation.
+    """
+
+    SEPARATOR = "-"
+
+    def __init__(
+        self,
+        *,
+        prefix: str,
+        padding: int,
+        financial_year: bool,
+        fy_start_month: int,
+        block_size: int,
+        gapless: bool,
+    ):
+        self.prefix = prefix
+        self.padding = padding
+        self.financial_year = financial_year
+        self.fy_start_month = fy_start_month
+        self.block_size = max(1, block_size)
+        self.gapless = gapless
+        self._lock = threading.Lock()
+        self._blocks: Dict[str, Deque[int]] = {}
+        self._reserve_engines: Dict[URL, Engine] = {}
+
+    def period(self, when: datetime) -> str:
+        """Financial year label, e.g. "2026-27" for a year starting in April; "" when off."""
+        if not self.financial_year:
+            return ""
+        start = when.year if when.month >= self.fy_start_month else when.year - 1
+        if self.fy_start_month == 1:
+            return str(start)
+        return f"{start}-{(start + 1) % 100:02d}"
+
+    def format(self, serial: int, when: datetime) -> str:
+        parts = [self.prefix, self.period(when), str(serial).zfill(self.padding)]
+        return self.SEPARATOR.join(p for p in parts if p)
+
+    def next(self, db: Session, when: Optional[datetime] = None) -> str:
+        # same UTC day as the database's now(), which fills invoice_date when it is unset
+        when = when or datetime.now(timezone.utc)
+        period = self.period(when)
+        if self.gapless:
+            serial = db.scalar(self._advance_stmt(period, 1))
+        else:
+            serial = self._next_from_block(db, period)
+        return self.format(serial, when)
+
+    @staticmethod
+    def _advance_stmt(period: str, step: int):
+        """Add step to the period's counter, creating it at step; returns the new value."""
+        stmt = pg_insert(InvoiceNumberCounter).values(
+            id=str_uuid(), period=period, last_value=step
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=["period"],
+            set_={"last_value": InvoiceNumberCounter.last_value + step},
+        ).returning(InvoiceNumberCounter.last_value)
+
+    def _next_from_block(self, db: Session, period: str) -> int:
+        with self._lock:
+            block = self._blocks.setdefault(period, deque())
+            if not block:
+                # committed on its own, so the block survives the caller's rollback
+                with self._reserve_engine(db).begin() as conn:
+                    last = conn.scalar(self._advance_stmt(period, self.block_size))
+                block.extend(range(last - self.block_size + 1, last + 1))
+            return block.popleft()
+
+    def _reserve_engine(self, db: Session) -> Engine:
+        """
+        A one-connection engine on the caller's database. Taking the connection from the
+        request pool could wait on the very requests queued behind this lock.
+        """
+        url = db.get_bind().engine.url
+        if url not in self._reserve_engines:
+            options = engine_options()
+            if "pool_size" in options:
+                options.update(pool_size=1, max_overflow=0)
+            self._reserve_engines[url] = create_engine(url, **options)
+        return self._reserve_engines[url]
+
+
+invoice_number_allocator = InvoiceNumberAllocator(
+    prefix=Config.INVOICE_NUMBER_PREFIX,
+    padding=Config.INVOICE_NUMBER_PADDING,
+    financial_year=Config.INVOICE_NUMBER_FINANCIAL_YEAR,
+    fy_start_month=Config.INVOICE_NUMBER_FY_START_MONTH,
+    block_size=Config.INVOICE_NUMBER_BLOCK_SIZE,
+    gapless=Config.INVOICE_NUMBER_GAPLESS,
+)
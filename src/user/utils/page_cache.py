@@ -0,0 +1,106 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import NamedTuple, Optional
+
+from fastapi import Request
+
+from src.config import Config
+
+
+class CachedPage(NamedTuple):
+    etag: str
+    body: str
+
+
+class PageCache:
+    """
+    LRU of rendered HTML pages by id, bounded by the total size of the stored bodies.
+
+    Each entry remembers the ETag it was rendered for; a lookup with a different ETag is a
+    miss, so an edit that bumps updated_at is never served stale even if invalidate() was
+    not called. invalidate()/clear() just release the memory early.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedPage]" = OrderedDict()
+        self._size = 0
+
+    def get(self, key: str, etag: str) -> Optional[str]:
+        with self._lock:
+            page = self._entries.get(key)
+            if page is None or page.etag != etag:
+                return None
+            self._entries.move_to_end(key)
+            return page.body
+
+    def put(self, key: str, etag: str, body: str):
+        size = len(body.encode())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = CachedPage(etag, body)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body.encode())
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _discard(self, key: str):
+        page = self._entries.pop(key, None)
+        if page is not None:
+            self._size -= len(page.body.encode())
+
+
+invoice_page_cache = PageCache(Config.INVOICE_PAGE_CACHE_BYTES)
+
+
+def page_etag(*versions) -> str:
+    """Strong ETag from the id and updated_at values a page was rendered from."""
+    digest = hashlib.sha1("|".join(str(v) for v in versions).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # timestamp columns are naive UTC (database now() in a UTC session, see utils.db.pool)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime]
+) -> bool:
+    """True when the client's If-None-Match / If-Modified-Since still matches the page."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return _as_utc(last_modified).replace(microsecond=0) <= since
@@ -0,0 +1,77 @@
+import hashlib
+from pathlib import Path
+from string import Template
+from typing import Dict, List, NamedTuple, Tuple
+
+USER_DIR = Path(__file__).resolve().parent.parent
+TEMPLATES_DIR = USER_DIR / "templates"
+STATIC_DIR = USER_DIR / "static"
+# the app mounts api_router at /api
+STATIC_URL_PREFIX = "/api/static"
+# fingerprinted names change with the content, so clients may keep them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class PageTemplate:
+    """
+    string.Template syntax ($name, ${name}, $$), split once into literal chunks and
+    placeholder names: a render is a single "".join, with no re-scan of the page text as
+    Template.substitute() or str.format() would do on every call.
+    Values are inserted as given, so they must already be HTML-escaped.
+    """
+
+    def __init__(self, source: str):
+        self._chunks: List[Tuple[str, str]] = []
+        text = []
+        pos = 0
+        for match in Template.pattern.finditer(source):
+            start = match.start()
+            text.append(source[pos:start])
+            name = match.group("named") or match.group("braced")
+            if name is not None:
+                self._chunks.append(("".join(text), name))
+                text = []
+            elif match.group("escaped") is not None:
+                text.append("$")
+            else:
+                raise ValueError(f"invalid placeholder at offset {match.start()}")
+            pos = match.end()
+        text.append(source[pos:])
+        self._tail = "".join(text)
+
+    def render(self, **values) -> str:
+        parts = []
+        for literal, name in self._chunks:
+            parts.append(literal)
+            parts.append(str(values[name]))
+        parts.append(self._tail)
+        return "".join(parts)
+
+
+class StaticAsset(NamedTuple):
+    body: bytes
+    media_type: str
+    etag: str
+
+
+def _load_template(name: str) -> PageTemplate:
+    return PageTemplate((TEMPLATES_DIR / name).read_text(encoding="utf-8"))
+
+
+def _load_assets() -> Dict[str, str]:
+    """Read every stylesheet once and register it as name.<hash>.css; returns name -> url."""
+    urls = {}
+    for path in sorted(STATIC_DIR.glob("*.css")):
+        body = path.read_bytes()
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        fingerprinted = f"{path.stem}.{digest}{path.suffix}"
+        static_assets[fingerprinted] = StaticAsset(body, "text/css", f'"{digest}"')
+        urls[path.name] = f"{STATIC_URL_PREFIX}/{fingerprinted}"
+    return urls
+
+
+static_assets: Dict[str, StaticAsset] = {}
+asset_urls = _load_assets()
+
+invoice_template = _load_template("invoice.html")
+pay_template = _load_template("pay.html")
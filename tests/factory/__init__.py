@@ -26,7 +26,7 @@ class UserFactory(factory.Factory):
 
     password = factory.LazyFunction(faker.password)
 
-    role = UserRoles.STAFF.value
+    role = UserRoles.USER.value
     email_verified = True
     phone_number_verified = True
 
@@ -0,0 +1,50 @@
+"""
+PUT /bulk_update_order with ids the UPDATE does not match: they are skipped, and only the
+orders it did update get their line items replaced.
+"""
+import json
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.user.models import Order, OrderItem
+from utils.db.session import async_engine
+
+
+@pytest.fixture
+def auth_headers(persisted_user):
+    return {"Authorization": f"Bearer {persisted_user.create_token()}"}
+
+
+def test_bulk_update_order_skips_unknown_and_deleted_ids(
+    client, auth_headers, persistent_db_session: Session
+):
+    live = pytest.persist_object(
+        persistent_db_session, Order(item_list="[]", quantity=1, table_no=1)
+    )
+    deleted = pytest.persist_object(
+        persistent_db_session,
+        Order(item_list="[]", quantity=1, table_no=2, is_deleted=True),
+    )
+    live_id, deleted_id, unknown_id = live.id, deleted.id, str(uuid.uuid4())
+    item_list = json.dumps([{"name": "Dosa", "qty": 2, "price": 80.0}])
+
+    response = client.put(
+        "/api/bulk_update_order",
+        json=[
+            {"order_id": order_id, "item_list": item_list}
+            for order_id in (live_id, deleted_id, unknown_id, "not-a-uuid")
+        ],
+        headers=auth_headers,
+    )
+    # pooled asyncpg connections belong to this TestClient's event loop
+    async_engine.sync_engine.dispose(close=False)
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"updated": 1}
+    persistent_db_session.expire_all()
+    items = persistent_db_session.scalars(select(OrderItem)).all()
+    assert [(i.order_id, i.name, i.qty) for i in items] == [(live_id, "Dosa", 2)]
+    assert persistent_db_session.get(Order, live_id).item_list == item_list
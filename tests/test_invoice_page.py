@@ -0,0 +1,53 @@
+"""
+Revalidation of the printable invoice page: an unchanged invoice answers 304 to its ETag,
+and an edit through PUT /update_invoice gives the page a new one.
+"""
+import pytest
+from sqlalchemy.orm import Session
+
+from src.user.models import Invoice, Order, PaymentStatus
+
+
+@pytest.fixture
+def auth_headers(persisted_user):
+    return {"Authorization": f"Bearer {persisted_user.create_token()}"}
+
+
+@pytest.fixture
+def persisted_invoice(persistent_db_session: Session) -> Invoice:
+    order = pytest.persist_object(
+        persistent_db_session, Order(item_list="[]", quantity=1, table_no=1)
+    )
+    return pytest.persist_object(
+        persistent_db_session,
+        Invoice(
+            order_id=order.id,
+            invoice_number="INV-TEST-000001",
+            total_amount=250.0,
+            payment_status=PaymentStatus.PENDING,
+            customer_name="Asha",
+        ),
+    )
+
+
+def test_update_invoice_changes_page_etag(client, auth_headers, persisted_invoice):
+    invoice_id = persisted_invoice.id
+    page_url = f"/api/invoice/{invoice_id}/view"
+
+    first = client.get(page_url)
+    assert first.status_code == 200, first.text
+    etag = first.headers["ETag"]
+    unchanged = client.get(page_url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    response = client.put(
+        f"/api/update_invoice/{invoice_id}",
+        json={"customer_name": "Ravi", "notes": "table by the window"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+
+    updated = client.get(page_url, headers={"If-None-Match": etag})
+    assert updated.status_code == 200, updated.text
+    assert updated.headers["ETag"] != etag
+    assert "Ravi" in updated.text
@@ -0,0 +1,170 @@
+"""
+Statement counts for the write paths whose round trips were cut down. A change that adds a
+refresh SELECT, a lazy load or a second commit shows up here as a different count.
+"""
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Generator, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine.base import Engine
+from sqlalchemy.orm import Session
+
+from src.user.models import Order, Payment, PaymentStatus, QRCode
+from utils.db.session import async_engine
+from utils.db.session import engine as app_engine
+
+
+@pytest.fixture
+def count_statements(
+    client: TestClient, engine: Engine
+) -> Generator[Callable[[], ContextManager[List[str]]], Any, None]:
+    """
+    Collect the SQL of every statement run inside the block, on the test engine (get_db)
+    and on the app's sync and async engines.
+    """
+    engines = (engine, app_engine, async_engine.sync_engine)
+
+    @contextmanager
+    def _count():
+        recorded: List[str] = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            recorded.append(statement)
+
+        for e in engines:
+            event.listen(e, "before_cursor_execute", _record)
+        try:
+            yield recorded
+        finally:
+            for e in engines:
+                event.remove(e, "before_cursor_execute", _record)
+
+    yield _count
+    # pooled asyncpg connections belong to this TestClient's event loop
+    async_engine.sync_engine.dispose(close=False)
+
+
+@pytest.fixture
+def auth_headers(persisted_user):
+    return {"Authorization": f"Bearer {persisted_user.create_token()}"}
+
+
+@pytest.fixture
+def persisted_order(persistent_db_session: Session) -> Order:
+    return pytest.persist_object(
+        persistent_db_session, Order(item_list="[]", quantity=1, table_no=1)
+    )
+
+
+@pytest.fixture
+def persisted_payment(
+    persistent_db_session: Session, persisted_order: Order
+) -> Payment:
+    payment = pytest.persist_object(
+        persistent_db_session,
+        Payment(
+            order_id=persisted_order.id,
+            amount=250.0,
+            status=PaymentStatus.PENDING,
+            retry_count=0,
+        ),
+    )
+    pytest.persist_object(
+        persistent_db_session,
+        QRCode(payment_id=payment.id, qr_data="upi://pay", is_active=True),
+    )
+    return payment
+
+
+def test_create_menu_statement_count(client, count_statements, auth_headers):
+    with count_statements() as statements:
+        response = client.post(
+            "/api/create_menu",
+            json={
+                "item_list": [{"name": "Dosa", "qty": 1, "price": 80}],
+                "price": 80,
+                "quantity": "1",
+                "category_name": [{"category_id": "1", "category_name": "Breakfast"}],
+            },
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 201, response.text
+    # user lookup, INSERT ... RETURNING
+    assert len(statements) == 2, statements
+
+
+def test_update_order_status_statement_count(
+    client, count_statements, auth_headers, persisted_order
+):
+    order_id = persisted_order.id  # loads the expired fixture row outside the block
+    with count_statements() as statements:
+        response = client.put(
+            f"/api/update_order_status/{order_id}",
+            json={"status": "ready"},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200, response.text
+    # user lookup, order lookup, UPDATE order ... RETURNING, order_status upsert
+    assert len(statements) == 4, statements
+
+
+def test_create_payment_statement_count(client, count_statements, persisted_order):
+    order_id = persisted_order.id
+    with count_statements() as statements:
+        response = client.post(
+            "/api/create_payment",
+            json={
+                "restaurant_name": "Test Restaurant",
+                "order_id": order_id,
+                "amount": 250.0,
+            },
+        )
+
+    assert response.status_code == 201, response.text
+    # order lookup, payment upsert, restaurant lookup, INSERT qr_code ... RETURNING
+    assert len(statements) == 4, statements
+
+
+def test_revive_payment_statement_count(client, count_statements, persisted_payment):
+    payment_id = persisted_payment.id
+    with count_statements() as statements:
+        response = client.post(f"/api/{payment_id}/revive")
+
+    assert response.status_code == 200, response.text
+    # payment lookup, UPDATE qr_code, restaurant lookup, INSERT qr_code ... RETURNING,
+    # UPDATE payment ... RETURNING
+    assert len(statements) == 5, statements
+
+
+def test_mark_paid_statement_count(client, count_statements, persisted_payment):
+    payment_id = persisted_payment.id
+    with count_statements() as statements:
+        response = client.post(f"/api/{payment_id}/mark_paid")
+
+    assert response.status_code == 200, response.text
+    # payment lookup, UPDATE qr_code, UPDATE payment ... RETURNING
+    assert len(statements) == 3, statements
+
+
+def test_get_orders_statement_count_does_not_grow_with_page_size(
+    client, count_statements, persistent_db_session
+):
+    persistent_db_session.add_all(
+        Order(item_list="[]", quantity=1, table_no=n % 5 + 1) for n in range(60)
+    )
+    persistent_db_session.commit()
+
+    counts = {}
+    for per_page in (1, 50):
+        with count_statements() as statements:
+            response = client.get("/api/get_orders", params={"per_page": per_page})
+        assert response.status_code == 200, response.text
+        assert len(response.json()) == per_page
+        counts[per_page] = len(statements)
+
+    # one page query, however many orders it returns
+    assert counts[1] == counts[50] == 1, counts
@@ -1,7 +1,41 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import base64
+import json
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import (
+    any_,
+    bindparam,
+    cast,
+    column,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    text,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.expression import false
 
@@ -12,14 +46,67 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+class UpsertConflictError(Exception):
+    """An upsert hit a conflicting row that was gone by the time it was re-read."""
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # rows per statement for the bulk_* methods
+    BULK_CHUNK_SIZE = 1000
+    # count(mode="auto") trusts the planner estimate at or above this many rows
+    COUNT_ESTIMATE_THRESHOLD = 100_000
+    COUNT_MODES = ("exact", "estimate", "auto")
+    # rows fetched per round trip by iter_all / iter_filtered
+    ITER_BATCH_SIZE = 1000
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
+    def _chunks(self, items: Sequence) -> Iterator[Sequence]:
+        for start in range(0, len(items), self.BULK_CHUNK_SIZE):
+            stop = start + self.BULK_CHUNK_SIZE
+            yield items[start:stop]
+
     @staticmethod
     def calc_offset(page: int, per_page: int) -> int:
         return (page - 1) * per_page
 
+    @staticmethod
+    def encode_cursor(db_obj: ModelType) -> str:
+        """Opaque keyset cursor pointing just past db_obj in (created_at, id) order."""
+        created_at = db_obj.created_at.isoformat() if db_obj.created_at else None
+        raw = json.dumps([created_at, str(db_obj.id)]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            created_at, id = json.loads(raw)
+            return datetime.fromisoformat(created_at), str(id)
+        except (ValueError, TypeError) as e:
+            raise ValueError("Invalid cursor") from e
+
+    def _order_by(self):
+        return (self.model.created_at, self.model.id)
+
+    def _keyset_filters(self, cursor: Optional[str]) -> list:
+        filters = [self.model.is_deleted == false()]
+        if cursor:
+            created_at, id = self.decode_cursor(cursor)
+            filters.append(
+                tuple_(self.model.created_at, self.model.id)
+                > tuple_(
+                    literal(created_at, self.model.created_at.type),
+                    literal(id, self.model.id.type),
+                )
+            )
+        return filters
+
+    def next_cursor(self, rows: List[ModelType], per_page: int) -> Optional[str]:
+        return self.encode_cursor(rows[-1]) if rows and len(rows) == per_page else None
+
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         return (
             db.query(self.model)
@@ -28,7 +115,12 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
 
     def get_deleted_also(self, db: Session, id: Any) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+        return (
+            db.query(self.model)
+            .execution_options(include_deleted=True)
+            .filter(self.model.id == id)
+            .first()
+        )
 
     def get_multi(
         self, db: Session, *, page: int = 1, per_page: int = 10
@@ -36,26 +128,168 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return (
             db.query(self.model)
             .filter(self.model.is_deleted == false())
+            .order_by(*self._order_by())
             .offset(self.calc_offset(page, per_page))
             .limit(per_page)
             .all()
         )
 
+    def get_multi_keyset(
+        self, db: Session, *, cursor: Optional[str] = None, per_page: int = 10
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Page through rows in (created_at, id) order starting after cursor. Cost does not
+        grow with depth, unlike OFFSET. Returns the rows and the cursor for the next page
+        (None on the last page).
+        """
+        rows = (
+            db.query(self.model)
+            .filter(*self._keyset_filters(cursor))
+            .order_by(*self._order_by())
+            .limit(per_page)
+            .all()
+        )
+        return rows, self.next_cursor(rows, per_page)
+
     def get_multi_deleted_also(
         self, db: Session, *, page: int = 1, per_page: int = 10
     ) -> List[ModelType]:
         return (
             db.query(self.model)
+            .execution_options(include_deleted=True)
             .offset(self.calc_offset(page, per_page))
             .limit(per_page)
             .all()
         )
 
-    def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
+    def _rows_stmt(
+        self, columns: Sequence[str], page: int, per_page: int, cursor: Optional[str]
+    ):
+        # id and created_at ride along so next_cursor works on the returned rows
+        names = list(dict.fromkeys([*columns, "id", "created_at"]))
+        stmt = select(*(getattr(self.model, name) for name in names))
+        if cursor:
+            stmt = stmt.where(*self._keyset_filters(cursor))
+        else:
+            stmt = stmt.where(self.model.is_deleted == false()).offset(
+                self.calc_offset(page, per_page)
+            )
+        return stmt.order_by(*self._order_by()).limit(per_page)
+
+    def get_multi_rows(
+        self,
+        db: Session,
+        *,
+        columns: Sequence[str],
+        page: int = 1,
+        per_page: int = 10,
+        cursor: Optional[str] = None,
+    ) -> List[Row]:
+        """
+        Like get_multi / get_multi_keyset but selects only the named columns and returns
+        plain Row tuples, skipping entity construction and the identity map. Use it for
+        read-only lists that go straight into a response model.
+        """
+        return db.execute(self._rows_stmt(columns, page, per_page, cursor)).all()
+
+    def iter_all(
+        self, db: Session, *, batch_size: Optional[int] = None
+    ) -> Iterator[ModelType]:
+        """Every live row, streamed; see iter_filtered."""
+        return self.iter_filtered(db, batch_size=batch_size)
+
+    def iter_filtered(
+        self,
+        db: Session,
+        *filters,
+        columns: Optional[Sequence[str]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """
+        Stream live rows matching filters through a server-side cursor, batch_size rows
+        at a time, so walking a large table never holds all of it in memory. Yields
+        entities, or plain Row tuples when columns are given (cheaper, no identity map).
+        The session must stay open until the iterator is exhausted.
+        """
+        if columns:
+            stmt = select(*(getattr(self.model, name) for name in columns))
+        else:
+            stmt = select(self.model)
+        stmt = stmt.where(self.model.is_deleted == false(), *filters).execution_options(
+            yield_per=batch_size or self.ITER_BATCH_SIZE
+        )
+        result = db.execute(stmt)
+        if columns:
+            yield from result
+        else:
+            yield from result.scalars()
+
+    def _exact_count_stmt(self):
+        return (
+            select(func.count())
+            .select_from(self.model)
+            .where(self.model.is_deleted == false())
+        )
+
+    def _estimate_count_stmt(self):
+        # reltuples is maintained by VACUUM/ANALYZE and is -1 for a never-analyzed table.
+        # It covers soft-deleted rows too, which is fine for the sizes it is used at.
+        return text(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(quote_ident(:name))"
+        ).bindparams(name=self.model.__tablename__)
+
+    def _resolve_count(
+        self, mode: str, estimate: Optional[int], threshold: Optional[int]
+    ):
+        """Return the estimate when it should be used, else None (meaning: count exactly)."""
+        if mode not in self.COUNT_MODES:
+            raise ValueError(f"Unknown count mode: {mode}")
+        if estimate is None or estimate < 0:
+            return None
+        if mode == "estimate":
+            return estimate
+        limit = self.COUNT_ESTIMATE_THRESHOLD if threshold is None else threshold
+        return estimate if estimate >= limit else None
+
+    def count(
+        self, db: Session, *, mode: str = "auto", threshold: Optional[int] = None
+    ) -> Tuple[int, bool]:
+        """
+        Number of live rows. mode="exact" runs COUNT(*); mode="estimate" reads the planner
+        estimate from pg_class; mode="auto" uses the estimate only once the table has at
+        least threshold rows. Returns (total, is_estimate); an unanalyzed table is always
+        counted exactly.
+        """
+        estimate = None
+        if mode != "exact":
+            estimate = db.execute(self._estimate_count_stmt()).scalar()
+        resolved = self._resolve_count(mode, estimate, threshold)
+        if resolved is not None:
+            return resolved, True
+        return db.execute(self._exact_count_stmt()).scalar_one(), False
+
+    @staticmethod
+    def _finish(db: Session, commit: bool):
+        """Commit, or with commit=False just flush so the caller's unit of work commits once."""
+        if commit:
+            db.commit()
+        else:
+            db.flush()
+
+    @staticmethod
+    async def _finish_async(db: AsyncSession, commit: bool):
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
+
+    def create(
+        self, db: Session, *, obj_in: CreateSchemaType, commit: bool = True
+    ) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in, exclude_unset=True)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        db.commit()
+        self._finish(db, commit)
         return db_obj
 
     def update(
@@ -63,7 +297,8 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db: Session,
         *,
         db_obj: ModelType,
-        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        commit: bool = True,
     ) -> ModelType:
         obj_data = jsonable_encoder(db_obj, exclude_unset=True)
         if isinstance(obj_in, dict):
@@ -74,32 +309,363 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         db.add(db_obj)
-        db.commit()
+        self._finish(db, commit)
         return db_obj
 
-    def soft_del(self, db: Session, db_obj: ModelType):
+    def soft_del(self, db: Session, db_obj: ModelType, commit: bool = True):
         db_obj.is_deleted = True
         db.add(db_obj)
-        db.commit()
+        self._finish(db, commit)
         return db_obj
 
-    def hard_del(self, db: Session, db_obj: ModelType) -> bool:
+    def hard_del(self, db: Session, db_obj: ModelType, commit: bool = True) -> bool:
         db.delete(db_obj)
-        db.commit()
+        self._finish(db, commit)
         return True
 
-    def remove_by_id(self, db: Session, *, id: str) -> ModelType:
-        obj = db.query(self.model).get(id)
+    def remove_by_id(self, db: Session, *, id: str, commit: bool = True) -> ModelType:
+        obj = db.get(self.model, id, execution_options={"include_deleted": True})
         db.delete(obj)
-        db.commit()
+        self._finish(db, commit)
         return obj
 
     def add_all(
-        self, db: Session, *, objs_in: List[CreateSchemaType]
+        self, db: Session, *, objs_in: List[CreateSchemaType], commit: bool = True
     ) -> List[ModelType]:
         db_objs = [
             self.model(**jsonable_encoder(c, exclude_unset=True)) for c in objs_in
         ]
         db.add_all(db_objs)
-        db.commit()
-        return db_objs
\ No newline at end of file
+        self._finish(db, commit)
+        return db_objs
+
+    @staticmethod
+    def _group_by_keys(
+        rows: Sequence[Dict[str, Any]]
+    ) -> Dict[Tuple[str, ...], List[int]]:
+        """Positions of rows grouped by the set of keys they carry, in first-seen order."""
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for i, row in enumerate(rows):
+            groups.setdefault(tuple(sorted(row)), []).append(i)
+        return groups
+
+    def bulk_create(
+        self,
+        db: Session,
+        *,
+        objs_in: List[Union[CreateSchemaType, Dict[str, Any]]],
+        commit: bool = True,
+    ) -> List[Row]:
+        """
+        Insert many rows with multi-row INSERT ... RETURNING (one statement per
+        BULK_CHUNK_SIZE rows) and a single commit. Returns the inserted rows as Row
+        objects, which support the same attribute access as the model.
+        """
+        rows = [
+            o if isinstance(o, dict) else jsonable_encoder(o, exclude_unset=True)
+            for o in objs_in
+        ]
+        table = self.model.__table__
+        created: List[Optional[Row]] = [None] * len(rows)
+        # one executemany needs the same keys in every dict; missing keys keep the
+        # column defaults, so rows are grouped rather than padded with None
+        for positions in self._group_by_keys(rows).values():
+            for chunk in self._chunks(positions):
+                inserted = db.execute(
+                    insert(table).returning(*table.c), [rows[i] for i in chunk]
+                ).all()
+                for i, row in zip(chunk, inserted):
+                    created[i] = row
+        if commit:
+            db.commit()
+        return created
+
+    def bulk_update(
+        self, db: Session, *, objs_in: List[Dict[str, Any]], commit: bool = True
+    ) -> List[str]:
+        """
+        Update many live rows by primary key; every dict must carry "id" plus the columns
+        to set. Sent as one UPDATE ... FROM (VALUES ...) RETURNING id per chunk of dicts
+        with the same keys, with one commit. Returns the ids of the rows updated: missing
+        and soft-deleted ids are skipped, so callers can tell which dicts took effect.
+        """
+        table = self.model.__table__
+        updated: List[str] = []
+        for keys, positions in self._group_by_keys(objs_in).items():
+            if "id" not in keys:
+                raise ValueError('bulk_update needs an "id" in every row')
+            for chunk in self._chunks(positions):
+                columns = [column(k, table.c[k].type) for k in keys]
+                data = values(*columns, name="data").data(
+                    [tuple(objs_in[i][k] for k in keys) for i in chunk]
+                )
+                # VALUES columns are untyped, so cast them to the target column types
+                typed = {k: cast(data.c[k], table.c[k].type) for k in keys}
+                result = db.execute(
+                    update(table)
+                    .where(table.c.id == typed["id"], table.c.is_deleted == false())
+                    .values({k: v for k, v in typed.items() if k != "id"})
+                    .returning(table.c.id)
+                )
+                updated.extend(result.scalars())
+        if commit:
+            db.commit()
+        return updated
+
+    def bulk_soft_delete(
+        self, db: Session, *, ids: List[str], commit: bool = True
+    ) -> int:
+        """Soft delete rows with one UPDATE ... WHERE id = ANY(:ids) per chunk."""
+        deleted = 0
+        for chunk in self._chunks(list(ids)):
+            result = db.execute(
+                update(self.model)
+                .where(
+                    self.model.id
+                    == any_(
+                        bindparam("ids", list(chunk), type_=ARRAY(self.model.id.type))
+                    ),
+                    self.model.is_deleted == false(),
+                )
+                .values(is_deleted=True)
+                .execution_options(synchronize_session=False)
+            )
+            deleted += result.rowcount
+        if commit:
+            db.commit()
+        return deleted
+
+    def _upsert_stmt(
+        self,
+        data: Dict[str, Any],
+        conflict_cols: List[str],
+        update_cols: Optional[List[str]],
+        index_where,
+    ):
+        stmt = pg_insert(self.model).values(**data)
+        if update_cols:
+            set_ = {c: stmt.excluded[c] for c in update_cols}
+            if "updated_at" in stmt.excluded:
+                set_.setdefault("updated_at", stmt.excluded.updated_at)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_cols, index_where=index_where, set_=set_
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(
+                index_elements=conflict_cols, index_where=index_where
+            )
+        # xmax is 0 only for a freshly inserted row version
+        return stmt.returning(
+            self.model, literal_column("xmax = 0").label("inserted")
+        ).execution_options(populate_existing=True)
+
+    def _conflict_filters(
+        self, data: Dict[str, Any], conflict_cols: List[str], index_where
+    ):
+        filters = [getattr(self.model, c) == data[c] for c in conflict_cols]
+        if index_where is not None:
+            filters.append(index_where)
+        return filters
+
+    def _check_conflicting_row(self, existing: Optional[ModelType]):
+        # the row that blocked the insert was removed before it could be re-read
+        if existing is None:
+            raise UpsertConflictError(
+                f"Conflicting {self.model.__tablename__} row changed concurrently; retry"
+            )
+
+    def upsert(
+        self,
+        db: Session,
+        *,
+        obj_in: Union[CreateSchemaType, Dict[str, Any]],
+        conflict_cols: List[str],
+        update_cols: Optional[List[str]] = None,
+        index_where=None,
+        commit: bool = True,
+    ) -> Tuple[ModelType, bool]:
+        """
+        INSERT ... ON CONFLICT (conflict_cols) in one statement instead of select-then-insert.
+
+        With update_cols the conflicting row is updated from the new values (DO UPDATE);
+        without them it is left alone (DO NOTHING) and re-read, which only costs a second
+        query on the conflict path. index_where selects a partial unique index and also
+        filters the re-read; without it the re-read includes soft-deleted rows, since a
+        full unique index conflicts with those too. Returns (row, inserted); a conflicting
+        row that is gone by the re-read raises UpsertConflictError.
+        """
+        data = (
+            obj_in
+            if isinstance(obj_in, dict)
+            else obj_in.model_dump(exclude_unset=True)
+        )
+        row = db.execute(
+            self._upsert_stmt(data, conflict_cols, update_cols, index_where)
+        ).first()
+        if row is None:
+            existing = (
+                db.query(self.model)
+                .execution_options(include_deleted=True)
+                .filter(*self._conflict_filters(data, conflict_cols, index_where))
+                .first()
+            )
+            self._check_conflicting_row(existing)
+            if commit:
+                db.commit()
+            return existing, False
+        if commit:
+            db.commit()
+        return row[0], bool(row.inserted)
+
+    # Async variants: same semantics as the sync methods above, for AsyncSession handlers.
+
+    async def get_async(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await db.scalar(
+            select(self.model)
+            .where(self.model.id == id, self.model.is_deleted == false())
+            .limit(1)
+        )
+
+    async def get_multi_async(
+        self, db: AsyncSession, *, page: int = 1, per_page: int = 10
+    ) -> List[ModelType]:
+        result = await db.scalars(
+            select(self.model)
+            .where(self.model.is_deleted == false())
+            .order_by(*self._order_by())
+            .offset(self.calc_offset(page, per_page))
+            .limit(per_page)
+        )
+        return list(result)
+
+    async def get_multi_keyset_async(
+        self, db: AsyncSession, *, cursor: Optional[str] = None, per_page: int = 10
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        result = await db.scalars(
+            select(self.model)
+            .where(*self._keyset_filters(cursor))
+            .order_by(*self._order_by())
+            .limit(per_page)
+        )
+        rows = list(result)
+        return rows, self.next_cursor(rows, per_page)
+
+    async def get_multi_rows_async(
+        self,
+        db: AsyncSession,
+        *,
+        columns: Sequence[str],
+        page: int = 1,
+        per_page: int = 10,
+        cursor: Optional[str] = None,
+    ) -> List[Row]:
+        result = await db.execute(self._rows_stmt(columns, page, per_page, cursor))
+        return result.all()
+
+    async def count_async(
+        self, db: AsyncSession, *, mode: str = "auto", threshold: Optional[int] = None
+    ) -> Tuple[int, bool]:
+        estimate = None
+        if mode != "exact":
+            estimate = (await db.execute(self._estimate_count_stmt())).scalar()
+        resolved = self._resolve_count(mode, estimate, threshold)
+        if resolved is not None:
+            return resolved, True
+        return (await db.execute(self._exact_count_stmt())).scalar_one(), False
+
+    async def create_async(
+        self, db: AsyncSession, *, obj_in: CreateSchemaType, commit: bool = True
+    ) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in, exclude_unset=True)
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        await self._finish_async(db, commit)
+        return db_obj
+
+    async def update_async(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        commit: bool = True,
+    ) -> ModelType:
+        obj_data = jsonable_encoder(db_obj, exclude_unset=True)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        for field in obj_data:
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+        db.add(db_obj)
+        await self._finish_async(db, commit)
+        return db_obj
+
+    async def soft_del_async(
+        self, db: AsyncSession, db_obj: ModelType, commit: bool = True
+    ):
+        db_obj.is_deleted = True
+        db.add(db_obj)
+        await self._finish_async(db, commit)
+        return db_obj
+
+    async def bulk_create_async(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: List[Union[CreateSchemaType, Dict[str, Any]]],
+        commit: bool = True,
+    ) -> List[Row]:
+        return await db.run_sync(
+            lambda s: self.bulk_create(s, objs_in=objs_in, commit=commit)
+        )
+
+    async def bulk_update_async(
+        self, db: AsyncSession, *, objs_in: List[Dict[str, Any]], commit: bool = True
+    ) -> List[str]:
+        return await db.run_sync(
+            lambda s: self.bulk_update(s, objs_in=objs_in, commit=commit)
+        )
+
+    async def bulk_soft_delete_async(
+        self, db: AsyncSession, *, ids: List[str], commit: bool = True
+    ) -> int:
+        return await db.run_sync(
+            lambda s: self.bulk_soft_delete(s, ids=ids, commit=commit)
+        )
+
+    async def upsert_async(
+        self,
+        db: AsyncSession,
+        *,
+        obj_in: Union[CreateSchemaType, Dict[str, Any]],
+        conflict_cols: List[str],
+        update_cols: Optional[List[str]] = None,
+        index_where=None,
+        commit: bool = True,
+    ) -> Tuple[ModelType, bool]:
+        data = (
+            obj_in
+            if isinstance(obj_in, dict)
+            else obj_in.model_dump(exclude_unset=True)
+        )
+        row = (
+            await db.execute(
+                self._upsert_stmt(data, conflict_cols, update_cols, index_where)
+            )
+        ).first()
+        if row is None:
+            existing = await db.scalar(
+                select(self.model)
+                .where(*self._conflict_filters(data, conflict_cols, index_where))
+                .limit(1)
+                .execution_options(include_deleted=True)
+            )
+            self._check_conflicting_row(existing)
+            if commit:
+                await db.commit()
+            return existing, False
+        if commit:
+            await db.commit()
+        return row[0], bool(row.inserted)
@@ -1,24 +1,89 @@
-import datetime
+import os
+import threading
+import time
 import uuid
 
-from sqlalchemy import Boolean, Column, DateTime, String
+from sqlalchemy import Boolean, Column, DateTime, String, func
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import as_declarative, declared_attr
+from sqlalchemy.types import TypeDecorator
 
-str_uuid = lambda: str(uuid.uuid4())
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+_uuid7_lock = threading.Lock()
+_uuid7_last = 0
+
+
+def uuid7() -> uuid.UUID:
+    """RFC 9562 version 7 UUID: 48-bit Unix ms timestamp followed by 74 random bits.
+
+    Keys generated close in time sort next to each other, so inserts append to the right
+    edge of the primary key index instead of landing on random pages. Within a process
+    the keys are strictly increasing (RFC 9562 section 6.2, method 2): a key generated in
+    the same millisecond as the previous one is the previous key plus a random step of up
+    to 2**32, so a batch never splits the index's rightmost pages in the middle, and
+    neighbouring ids are still not consecutive.
+    """
+    global _uuid7_last
+    unix_ms = time.time_ns() // 1_000_000
+    packed = ((unix_ms & ((1 << 48) - 1)) << 74) | int.from_bytes(os.urandom(10), "big")
+    packed &= (1 << 122) - 1
+    with _uuid7_lock:
+        if packed >> 74 <= _uuid7_last >> 74:
+            packed = _uuid7_last + 1 + int.from_bytes(os.urandom(4), "big")
+        _uuid7_last = packed
+    value = (packed >> 74) << 80  # unix_ts_ms
+    value |= 0x7 << 76  # version 7
+    value |= ((packed >> 62) & 0xFFF) << 64  # rand_a
+    value |= 0x2 << 62  # RFC 4122 variant
+    value |= packed & ((1 << 62) - 1)  # rand_b
+    return uuid.UUID(int=value)
+
+
+str_uuid = lambda: str(uuid7())
+
+
+class UUIDStr(TypeDecorator):
+    """
+    Native 16-byte uuid column that reads and writes str, so application code keeps
+    passing ids around as strings. A value that is not a UUID (e.g. a mistyped id in a
+    URL) binds as the nil UUID, which no row has, so lookups miss instead of erroring.
+
+    Values are bound as uuid.UUID, the type both drivers return before result
+    processing; multi-row INSERT ... RETURNING matches returned rows to parameter sets
+    by comparing the two.
+    """
+
+    impl = UUID(as_uuid=False)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value
+        try:
+            return uuid.UUID(str(value))
+        except ValueError:
+            return uuid.UUID(NIL_UUID)
 
 
 @as_declarative()   
 class ModelBase:
     __name__: str
 
-    id = Column(String, primary_key=True, unique=True, nullable=False, default=str_uuid)
-
-    # default values
-    created_at = Column(DateTime, default=datetime.datetime.now)
-    updated_at = Column(
-        DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now
+    id = Column(
+        UUIDStr, primary_key=True, unique=True, nullable=False, default=str_uuid
     )
 
+    # default values; set by the database and read back through INSERT/UPDATE ... RETURNING
+    # (eager_defaults), so no refresh SELECT is needed after a write
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __mapper_args__ = {"eager_defaults": True}
+
     # custom values
     created_by = Column(String, nullable=True)
     updated_by = Column(String, nullable=True)
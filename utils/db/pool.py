@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Counters for one engine's pool, fed by pool events and checkout timing."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checked_out = 0
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.slow_waits = 0
+        self.pool = None
+
+    def record_wait(self, wait_ms: float):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            slow = wait_ms >= Config.DB_POOL_SLOW_WAIT_MS
+            if slow:
+                self.slow_waits += 1
+        if slow:
+            logger.warning(
+                "event=db_pool_slow_checkout pool=%s wait_ms=%.1f checked_out=%d overflow=%s",
+                self.name,
+                wait_ms,
+                self.checked_out,
+                self._overflow(),
+            )
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+        logger.error(
+            "event=db_pool_timeout pool=%s checked_out=%d overflow=%s timeout_s=%s",
+            self.name,
+            self.checked_out,
+            self._overflow(),
+            Config.DB_POOL_TIMEOUT,
+        )
+
+    def _overflow(self):
+        if self.pool is not None and hasattr(self.pool, "overflow"):
+            return max(self.pool.overflow(), 0)
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            data = {
+                "pool": self.name,
+                "pool_class": type(self.pool).__name__ if self.pool else None,
+                "checked_out": self.checked_out,
+                "checkouts_total": self.checkouts,
+                "connects_total": self.connects,
+                "invalidations_total": self.invalidations,
+                "timeouts_total": self.timeouts,
+                "wait_count": self.wait_count,
+                "wait_avg_ms": round(self.wait_total_ms / self.wait_count, 3)
+                if self.wait_count
+                else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "slow_waits_total": self.slow_waits,
+            }
+        if self.pool is not None and hasattr(self.pool, "size"):
+            data["size"] = self.pool.size()
+            data["checked_in"] = self.pool.checkedin()
+            data["overflow"] = self._overflow()
+        return data
+
+
+class _CheckoutTimingMixin:
+    """Times how long callers block waiting for a pooled connection."""
+
+    stats: PoolStats = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.record_timeout()
+            raise
+        finally:
+            if self.stats is not None:
+                self.stats.record_wait((time.perf_counter() - start) * 1000)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting into the same stats
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        if self.stats is not None:
+            self.stats.pool = new_pool
+        return new_pool
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+POOL_STATS: Dict[str, PoolStats] = {}
+
+
+def _connect_args(is_async: bool) -> Dict[str, Any]:
+    # Timestamp columns are naive and filled by now(); pin the session time zone so they
+    # hold UTC whatever the server's TimeZone setting is.
+    if is_async:
+        return {"server_settings": {"timezone": "UTC"}}
+    return {"options": "-c timezone=UTC"}
+
+
+def engine_options(is_async: bool = False) -> Dict[str, Any]:
+    """create_engine kwargs for the pool settings in Config."""
+    if Config.DB_USE_NULL_POOL:
+        return {
+            "poolclass": NullPool,
+            "pool_pre_ping": Config.DB_POOL_PRE_PING,
+            "connect_args": _connect_args(is_async),
+        }
+    return {
+        "connect_args": _connect_args(is_async),
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": Config.DB_POOL_SIZE,
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "pool_timeout": Config.DB_POOL_TIMEOUT,
+        "pool_recycle": Config.DB_POOL_RECYCLE,
+        "pool_pre_ping": Config.DB_POOL_PRE_PING,
+        "pool_use_lifo": Config.DB_POOL_USE_LIFO,
+    }
+
+
+def instrument_pool(engine: Engine, name: str) -> PoolStats:
+    """Attach pool event listeners to a (sync) engine and register its stats."""
+    stats = PoolStats(name)
+    stats.pool = engine.pool
+    if isinstance(engine.pool, _CheckoutTimingMixin):
+        engine.pool.stats = stats
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, conn_record):
+        with stats._lock:
+            stats.connects += 1
+        logger.debug("event=db_pool_connect pool=%s", name)
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_conn, conn_record, conn_proxy):
+        with stats._lock:
+            stats.checkouts += 1
+            stats.checked_out += 1
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_conn, conn_record):
+        with stats._lock:
+            stats.checked_out = max(stats.checked_out - 1, 0)
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_conn, conn_record, exception):
+        with stats._lock:
+            stats.invalidations += 1
+        logger.warning("event=db_pool_invalidate pool=%s error=%s", name, exception)
+
+    POOL_STATS[name] = stats
+    return stats
+
+
+def pool_status() -> Dict[str, Any]:
+    return {name: stats.snapshot() for name, stats in POOL_STATS.items()}
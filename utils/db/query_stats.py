@@ -0,0 +1,247 @@
+import logging
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# "METHOD /path" of the request being served; set by middleware in src.main
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+
+# Response header carrying QueryCounter.count in DEV (set by middleware in src.main)
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+
+
+class QueryCounter:
+    """Statements issued while serving one request (shared with threadpool handlers)."""
+
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+
+current_query_counter: ContextVar[Optional[QueryCounter]] = ContextVar(
+    "current_query_counter", default=None
+)
+
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+MAX_FINGERPRINTS = 1000
+MAX_ROUTES_PER_FINGERPRINT = 20
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|\?")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_ROW_LIST = re.compile(r"(\([?,\s]*\))(?:\s*,\s*\([?,\s]*\))+")
+_WHITESPACE = re.compile(r"\s+")
+# Row locks and function calls have side effects that EXPLAIN ANALYZE would repeat
+# (nextval() burns numbers, FOR UPDATE locks again), so those get a plain EXPLAIN
+_ROW_LOCK = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+|KEY\s+)?(?:UPDATE|SHARE)\b", re.I)
+_CALL = re.compile(r"\b(\w+)\s*\(")
+_PAREN_KEYWORDS = frozenset(
+    """select from where and or not in exists any all on join as values over filter
+    within cast row array lateral using by then else when case is like ilike between
+    limit offset union except intersect distinct""".split()
+)
+_READ_ONLY_FUNCTIONS = frozenset(
+    """count sum min max avg coalesce nullif greatest least lower upper trim length
+    abs round date_trunc extract row_number json_agg jsonb_agg array_agg
+    string_agg""".split()
+)
+_PATH_ID = re.compile(
+    r"/(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)(?=/|$)"
+)
+
+
+def fingerprint(statement: str) -> str:
+    """Normalise a SQL statement so calls differing only in literals/params group together."""
+    fp = _STRING_LITERAL.sub("?", statement)
+    fp = _PLACEHOLDER.sub("?", fp)
+    fp = _NUMBER.sub("?", fp)
+    fp = _IN_LIST.sub("IN (?...)", fp)
+    fp = _ROW_LIST.sub(r"\1, ...", fp)
+    return _WHITESPACE.sub(" ", fp).strip()
+
+
+def route_label(method: str, path: str) -> str:
+    """Collapse ids in the path so routes group as e.g. GET /api/get_order_by_id/{id}."""
+    return f"{method} {_PATH_ID.sub('/{id}', path)}"
+
+
+class _FingerprintStats:
+    __slots__ = (
+        "statement",
+        "count",
+        "total_ms",
+        "max_ms",
+        "slow_count",
+        "histogram",
+        "routes",
+        "explain",
+        "explained_at",
+    )
+
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow_count = 0
+        self.histogram = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.routes: Dict[str, int] = {}
+        self.explain: Optional[str] = None
+        self.explained_at: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"<{b}ms" for b in HISTOGRAM_BUCKETS_MS] + [
+            f">={HISTOGRAM_BUCKETS_MS[-1]}ms"
+        ]
+        return {
+            "fingerprint": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "slow_count": self.slow_count,
+            "histogram": dict(zip(labels, self.histogram)),
+            "routes": dict(sorted(self.routes.items(), key=lambda r: -r[1])),
+            "explain": self.explain,
+            "explained_at": self.explained_at,
+        }
+
+
+class QueryStats:
+    """Per-fingerprint call counts and latency histograms across all instrumented engines."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _FingerprintStats] = {}
+
+    def record(self, fp: str, elapsed_ms: float, route: Optional[str], slow: bool):
+        with self._lock:
+            stats = self._stats.get(fp)
+            if stats is None:
+                if len(self._stats) >= MAX_FINGERPRINTS:
+                    fp = "<other>"
+                    stats = self._stats.get(fp)
+                if stats is None:
+                    stats = self._stats[fp] = _FingerprintStats(fp)
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            if slow:
+                stats.slow_count += 1
+            bucket = len(HISTOGRAM_BUCKETS_MS)
+            for i, upper in enumerate(HISTOGRAM_BUCKETS_MS):
+                if elapsed_ms < upper:
+                    bucket = i
+                    break
+            stats.histogram[bucket] += 1
+            if route and (
+                route in stats.routes or len(stats.routes) < MAX_ROUTES_PER_FINGERPRINT
+            ):
+                stats.routes[route] = stats.routes.get(route, 0) + 1
+
+    def record_explain(self, fp: str, plan: str):
+        with self._lock:
+            stats = self._stats.get(fp)
+            if stats is not None:
+                stats.explain = plan
+                stats.explained_at = time.time()
+
+    def table(
+        self, limit: int = 50, order_by: str = "total_ms"
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [s.as_dict() for s in self._stats.values()]
+        rows.sort(key=lambda r: r.get(order_by, 0), reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStats()
+
+
+def _explain_prefix(statement: str) -> str:
+    """EXPLAIN (ANALYZE, BUFFERS), or plain EXPLAIN when a re-run has side effects."""
+    body = _STRING_LITERAL.sub("''", statement)
+    calls = {name.lower() for name in _CALL.findall(body)}
+    if _ROW_LOCK.search(body) or calls - _PAREN_KEYWORDS - _READ_ONLY_FUNCTIONS:
+        return "EXPLAIN "
+    return "EXPLAIN (ANALYZE, BUFFERS) "
+
+
+def _capture_explain(cursor, statement: str, parameters, fp: str):
+    """Run EXPLAIN for a slow SELECT on the same (psycopg2) connection.
+
+    Wrapped in a savepoint so a failing EXPLAIN cannot abort the caller's transaction.
+    """
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute("SAVEPOINT query_stats_explain")
+        try:
+            explain_cursor.execute(_explain_prefix(statement) + statement, parameters)
+            plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+            explain_cursor.execute("RELEASE SAVEPOINT query_stats_explain")
+        except Exception:
+            explain_cursor.execute("ROLLBACK TO SAVEPOINT query_stats_explain")
+            raise
+        query_stats.record_explain(fp, plan)
+    except Exception as e:
+        logger.warning("event=db_explain_failed fingerprint=%r error=%s", fp, e)
+    finally:
+        explain_cursor.close()
+
+
+def instrument_queries(engine: Engine):
+    """Time every statement on a (sync) engine and log the ones over SLOW_QUERY_MS."""
+    if not Config.QUERY_STATS_ENABLED:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_stats_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        counter = current_query_counter.get()
+        if counter is not None:
+            counter.count += 1
+        fp = fingerprint(statement)
+        route = current_route.get()
+        slow = elapsed_ms >= Config.SLOW_QUERY_MS
+        query_stats.record(fp, elapsed_ms, route, slow)
+        if not slow:
+            return
+        logger.warning(
+            "event=db_slow_query elapsed_ms=%.1f route=%s fingerprint=%r",
+            elapsed_ms,
+            route,
+            fp,
+        )
+        # EXPLAIN ANALYZE executes the statement again, so only ever do it for reads.
+        # The extra cursor is a DB-API one, which the asyncpg adapter cannot provide.
+        if (
+            not executemany
+            and conn.dialect.driver == "psycopg2"
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and random.random() < Config.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+        ):
+            _capture_explain(cursor, statement, parameters, fp)
@@ -0,0 +1,83 @@
+import threading
+import time
+from typing import Dict
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.config import Config
+
+# Set on responses to writes so the client's next reads go to the primary even if they
+# land on another worker; the in-process map covers clients that drop cookies.
+READ_PRIMARY_COOKIE = "db_read_primary_until"
+
+
+class RecentWriters:
+    """Client keys that committed a write within the read-your-writes window."""
+
+    def __init__(self, max_keys: int = 10_000):
+        self._lock = threading.Lock()
+        self._until: Dict[str, float] = {}
+        self.max_keys = max_keys
+
+    def mark(self, key: str, until: float):
+        with self._lock:
+            if len(self._until) >= self.max_keys:
+                now = time.time()
+                self._until = {k: v for k, v in self._until.items() if v > now}
+            self._until[key] = until
+
+    def is_recent(self, key: str) -> bool:
+        with self._lock:
+            until = self._until.get(key)
+        return until is not None and until > time.time()
+
+
+recent_writers = RecentWriters()
+
+
+def client_key(request: Request) -> str:
+    auth = request.headers.get("Authorization")
+    if auth:
+        return auth
+    return request.client.host if request.client else ""
+
+
+def should_read_primary(request: Request) -> bool:
+    """True when the caller wrote recently and must see its own writes."""
+    cookie = request.cookies.get(READ_PRIMARY_COOKIE)
+    if cookie:
+        try:
+            if float(cookie) > time.time():
+                return True
+        except ValueError:
+            pass
+    return recent_writers.is_recent(client_key(request))
+
+
+def write_session_info(request: Request, response: Response) -> dict:
+    """Session.info for a primary session so its commits open the read-your-writes window."""
+    return {"request": request, "response": response}
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_recent_writer(session: Session):
+    request = session.info.get("request")
+    if not Config.POSTGRES_REPLICA_URL:
+        return
+    if request is None or session.info.get("ryw_marked"):
+        return
+    session.info["ryw_marked"] = True
+    window = Config.DB_READ_YOUR_WRITES_SECONDS
+    until = time.time() + window
+    recent_writers.mark(client_key(request), until)
+    response = session.info.get("response")
+    if response is not None:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            str(int(until) + 1),
+            max_age=window,
+            httponly=True,
+            samesite="lax",
+        )
@@ -1,25 +1,76 @@
-from typing import Annotated, Generator
+import logging
+from typing import Annotated, AsyncGenerator, Generator
 
-from fastapi import Depends
+from fastapi import Depends, Request, Response
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import ProgrammingError
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Session, sessionmaker
 
 from src.config import Config
+from utils.db import soft_delete  # noqa: F401  registers the global soft-delete filter
+from utils.db.pool import engine_options, instrument_pool
+from utils.db.query_stats import instrument_queries
+from utils.db.routing import should_read_primary, write_session_info
+
+logger = logging.getLogger(__name__)
 
 # Build database URL from config
 SQLALCHEMY_DB_URL = Config.assemble_db_connection()
+SQLALCHEMY_ASYNC_DB_URL = Config.assemble_db_connection(scheme="postgresql+asyncpg")
+
+engine = create_engine(SQLALCHEMY_DB_URL, **engine_options())
+instrument_pool(engine, "primary")
+instrument_queries(engine)
+
+# Objects stay loaded after commit; server-generated columns come back via RETURNING
+# (ModelBase eager_defaults), so handlers can serialize them without a refresh SELECT.
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+# Async engine for handlers that should not hold a threadpool slot during DB I/O.
+# expire_on_commit is off because lazy attribute refreshes are not allowed on AsyncSession.
+async_engine = create_async_engine(
+    SQLALCHEMY_ASYNC_DB_URL, **engine_options(is_async=True)
+)
+instrument_pool(async_engine.sync_engine, "primary_async")
+instrument_queries(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
 
-engine = create_engine(SQLALCHEMY_DB_URL)
+# Optional read replica; without one the read dependencies hand out primary sessions.
+if Config.POSTGRES_REPLICA_URL:
+    replica_engine = create_engine(Config.POSTGRES_REPLICA_URL, **engine_options())
+    instrument_pool(replica_engine, "replica")
+    instrument_queries(replica_engine)
+    ReplicaSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=replica_engine
+    )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    replica_async_engine = create_async_engine(
+        make_url(Config.POSTGRES_REPLICA_URL).set(drivername="postgresql+asyncpg"),
+        **engine_options(is_async=True),
+    )
+    instrument_pool(replica_async_engine.sync_engine, "replica_async")
+    instrument_queries(replica_async_engine.sync_engine)
+    ReplicaAsyncSessionLocal = async_sessionmaker(
+        bind=replica_async_engine, autoflush=False, expire_on_commit=False
+    )
+else:
+    ReplicaSessionLocal = SessionLocal
+    ReplicaAsyncSessionLocal = AsyncSessionLocal
 
 Base = declarative_base()
 
-def _get_db() -> Generator:
+
+def _get_db(request: Request, response: Response) -> Generator:
     try:
-        db = SessionLocal()
+        db = SessionLocal(info=write_session_info(request, response))
         yield db
 
     except ProgrammingError as pe:
@@ -31,4 +82,91 @@ def _get_db() -> Generator:
         db.close()
 
 
-get_db = Annotated[Session, Depends(_get_db)]
\ No newline at end of file
+def _get_db_read(request: Request) -> Generator:
+    factory = SessionLocal if should_read_primary(request) else ReplicaSessionLocal
+    try:
+        db = factory()
+        yield db
+
+    except ProgrammingError as pe:
+        print("###############################################")
+        print("EITHER DATABASE NOT FOUND OR NO TABLES PRESENT")
+        print("###############################################")
+        return pe
+    finally:
+        db.close()
+
+
+async def _get_async_db(request: Request, response: Response) -> AsyncGenerator:
+    db = AsyncSessionLocal(info=write_session_info(request, response))
+    try:
+        yield db
+
+    except ProgrammingError as pe:
+        # usually a missing database or unmigrated tables; let the request fail loudly
+        logger.error("event=db_programming_error error=%s", pe)
+        raise
+    finally:
+        await db.close()
+
+
+async def _get_async_db_read(request: Request) -> AsyncGenerator:
+    if should_read_primary(request):
+        db = AsyncSessionLocal()
+    else:
+        db = ReplicaAsyncSessionLocal()
+    try:
+        yield db
+
+    except ProgrammingError as pe:
+        # usually a missing database or unmigrated tables; let the request fail loudly
+        logger.error("event=db_programming_error error=%s", pe)
+        raise
+    finally:
+        await db.close()
+
+
+get_db = Annotated[Session, Depends(_get_db)]
+get_db_read = Annotated[Session, Depends(_get_db_read)]
+get_async_db = Annotated[AsyncSession, Depends(_get_async_db)]
+get_async_db_read = Annotated[AsyncSession, Depends(_get_async_db_read)]
+
+
+class UnitOfWork:
+    """
+    One transaction per request. Handlers pass commit=False to CRUDBase writes and call
+    commit() once at the end; whatever is not committed is rolled back when the request's
+    session closes, so a failure halfway leaves nothing behind.
+
+    It wraps the request's get_db session, so it is the same session authenticated_user
+    hands out. Commit explicitly rather than from dependency teardown, which runs only
+    after the response has been sent.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def commit(self):
+        self.session.commit()
+
+
+class AsyncUnitOfWork:
+    """UnitOfWork for AsyncSession handlers; shares the request's get_async_db session."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def commit(self):
+        await self.session.commit()
+
+
+def _get_uow(db: get_db) -> UnitOfWork:
+    return UnitOfWork(db)
+
+
+def _get_async_uow(db: get_async_db) -> AsyncUnitOfWork:
+    return AsyncUnitOfWork(db)
+
+
+get_uow = Annotated[UnitOfWork, Depends(_get_uow)]
+get_async_uow = Annotated[AsyncUnitOfWork, Depends(_get_async_uow)]
@@ -0,0 +1,30 @@
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+from sqlalchemy.sql.expression import false
+
+from utils.db.base import ModelBase
+
+# Pass .execution_options(include_deleted=True) to see soft-deleted rows
+INCLUDE_DELETED = "include_deleted"
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _filter_soft_deleted(execute_state: ORMExecuteState):
+    """
+    Add `is_deleted = false` for every model in an ORM SELECT, including joins and
+    Session.get, so handlers need not repeat it. Refreshes of already-loaded objects and
+    relationship loads are left alone, as are ORM UPDATE/DELETE statements.
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get(INCLUDE_DELETED, False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(
+                ModelBase,
+                lambda cls: cls.is_deleted == false(),
+                include_aliases=True,
+            )
+        )
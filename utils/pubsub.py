@@ -0,0 +1,166 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more; leave room for the envelope
+MAX_NOTIFY_PAYLOAD = 7900
+
+
+class PubSubHub:
+    """
+    Topic fan-out to in-process subscribers (e.g. one asyncio.Queue per SSE client).
+
+    A subscriber that stops reading loses its oldest messages rather than blocking
+    publishers. With the Postgres bridge running, publish() goes through NOTIFY and every
+    worker (this one included) delivers what it receives on LISTEN, so subscribers see
+    events from all workers; without it delivery is local to this process.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._bridge: Optional["PostgresNotifyBridge"] = None
+
+    def subscriber_count(self, topic: str) -> int:
+        return len(self._subscribers.get(topic, ()))
+
+    @asynccontextmanager
+    async def subscribe(self, topic: str) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    async def publish(self, topic: str, message: Dict[str, Any]):
+        if self._bridge is not None and self._bridge.connected:
+            try:
+                await self._bridge.notify(topic, message)
+                return
+            except Exception as e:
+                logger.warning("event=pubsub_notify_failed topic=%s error=%s", topic, e)
+        self.deliver(topic, message)
+
+    def deliver(self, topic: str, message: Dict[str, Any]):
+        """Hand a message to this process's subscribers of topic."""
+        for queue in tuple(self._subscribers.get(topic, ())):
+            if queue.full():
+                queue.get_nowait()
+                logger.debug("event=pubsub_subscriber_lagging topic=%s", topic)
+            queue.put_nowait(message)
+
+    async def start(self):
+        """Connect the Postgres bridge when EVENTS_PG_NOTIFY is on; stay local if it fails."""
+        if not Config.EVENTS_PG_NOTIFY or self._bridge is not None:
+            return
+        self._bridge = PostgresNotifyBridge(
+            self, Config.assemble_db_connection(), Config.EVENTS_PG_CHANNEL
+        )
+        await self._bridge.start()
+
+    async def stop(self):
+        if self._bridge is not None:
+            await self._bridge.stop()
+            self._bridge = None
+
+
+class PostgresNotifyBridge:
+    """
+    One dedicated asyncpg connection per worker that LISTENs on a channel and also sends
+    this worker's NOTIFYs. It lives outside the SQLAlchemy pools so an idle listener never
+    holds a request connection. A dropped connection is retried in the background; until
+    it is back, the hub delivers locally.
+    """
+
+    RECONNECT_SECONDS = 5
+
+    def __init__(self, hub: PubSubHub, dsn: str, channel: str):
+        self.hub = hub
+        self.dsn = dsn
+        self.channel = channel
+        self._conn = None
+        self._lock = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def start(self):
+        try:
+            await self._connect()
+        except Exception as e:
+            logger.warning(
+                "event=pubsub_listen_failed channel=%s error=%s", self.channel, e
+            )
+            self._schedule_reconnect()
+
+    async def stop(self):
+        self._stopped = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self.connected:
+            await self._conn.close()
+        self._conn = None
+
+    async def notify(self, topic: str, message: Dict[str, Any]):
+        payload = json.dumps({"topic": topic, "message": message}, default=str)
+        if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+            raise ValueError(f"payload of {len(payload)} bytes is too large for NOTIFY")
+        # asyncpg allows one operation at a time per connection
+        async with self._lock:
+            await self._conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def _connect(self):
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn)
+        await conn.add_listener(self.channel, self._on_notify)
+        conn.add_termination_listener(self._on_terminated)
+        self._conn = conn
+        logger.info("event=pubsub_listening channel=%s", self.channel)
+
+    def _on_notify(self, conn, pid, channel, payload):
+        try:
+            envelope = json.loads(payload)
+            self.hub.deliver(envelope["topic"], envelope["message"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("event=pubsub_bad_payload channel=%s error=%s", channel, e)
+
+    def _on_terminated(self, conn):
+        if self._stopped:
+            return
+        logger.warning("event=pubsub_connection_lost channel=%s", self.channel)
+        self._conn = None
+        self._schedule_reconnect()
+
+    def _schedule_reconnect(self):
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(
+                self._reconnect()
+            )
+
+    async def _reconnect(self):
+        while not self._stopped and not self.connected:
+            await asyncio.sleep(self.RECONNECT_SECONDS)
+            try:
+                await self._connect()
+            except Exception as e:
+                logger.warning(
+                    "event=pubsub_listen_failed channel=%s error=%s", self.channel, e
+                )
+
+
+hub = PubSubHub(queue_size=Config.EVENTS_SUBSCRIBER_QUEUE_SIZE)